@@ -0,0 +1,96 @@
+"""Synthetic data shared by the benchmarks."""
+import io
+import zipfile
+from collections.abc import Iterable
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+
+PARAMS_XML = """<?xml version="1.0" encoding="UTF-8" ?>
+<params>
+  <system>
+    <title>Title</title>
+{members}
+  </system>
+</params>
+"""
+GENRES = [
+    "女優",
+    "美少女",
+    "中出し",
+    "巨乳",
+    "主観",
+    "ハイクオリティVR",
+    "8KVR",
+]
+
+
+def chapters_xml(scenes: Iterable[str]) -> str:
+    """Return ChapterControl params.xml for the given scene attributes."""
+    lines = "\n".join(f"  <scene {attrs} />" for attrs in scenes)
+    return f"<params>\n{lines}\n</params>\n"
+
+
+def make_vcz(
+    path: Path,
+    members: Mapping[str, bytes],
+    chapters: str | None = None,
+    compression: int = zipfile.ZIP_STORED,
+) -> None:
+    """Write a synthetic VCZ.
+
+    Arguments:
+        path: Output path.
+        members: Member data keyed by VCS param name (i.e. ``Vorze_CycloneSA``).
+        chapters: ChapterControl params.xml, see `chapters_xml`.
+        compression: Member compression.
+    """
+    files = dict(members)
+    if chapters is not None:
+        nested = io.BytesIO()
+        with zipfile.ZipFile(nested, "w") as zipf:
+            zipf.writestr("params.xml", chapters)
+        files["ChapterControl"] = nested.getvalue()
+    params = PARAMS_XML.format(
+        members="\n".join(f"    <{name}>{name}.bin</{name}>" for name in files)
+    )
+    with zipfile.ZipFile(path, "w", compression=compression) as zipf:
+        zipf.writestr("params.xml", params)
+        for name, data in files.items():
+            zipf.writestr(f"{name}.bin", data)
+
+
+def list_entry(i: int, **fields: Any) -> dict[str, Any]:
+    """Return a ps_get_list JSON entry.
+
+    Arguments:
+        i: Entry number.
+        fields: Values to override.
+
+    Returns:
+        Entry dict.
+    """
+    return {
+        "acters": "",
+        "big_img": "",
+        "categories": "",
+        "code": f"st{i}",
+        "comment": "",
+        "dl": 1,
+        "favorite": 0,
+        "file_name": f"FOO-{i:05}_st.mp4",
+        "id": i,
+        "img": "",
+        "maker": "",
+        "quality": "",
+        "release_date": "2023-01-01 00:00:00",
+        "set_num": "0",
+        "signal": 0,
+        "time": 0,
+        "title": "",
+        "title_all": "",
+        "item_id": "",
+        "ai3d": 0,
+        **fields,
+    }
@@ -0,0 +1,83 @@
+"""Benchmark VCZ archive handle sharing during script concatenation.
+
+Runs the ``afesta concat --no-video`` flow (chapters, external file offsets
+and script concatenation for each goods type) over a synthetic multipart
+set, with and without the shared archive cache, and reports the number of
+archive opens and total time.
+
+Usage::
+
+    $ python benchmarks/bench_archive_cache.py [--parts N] [-r REPEAT]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from _common import chapters_xml
+from _common import make_vcz
+
+from afesta_tools.utils import script_concat
+from afesta_tools.vcs import ARCHIVE_CACHE
+from afesta_tools.vcs import VCZArchive
+
+
+MEMBERS = {f"Member{i}": b"\0" * 1024 for i in range(50)}
+
+
+def _chapters_xml(part: int, parts: int) -> str:
+    scenes = []
+    for i in range(parts):
+        attrs = f'time="{i * 60000}" duration="60000"'
+        if i + 1 == part:
+            attrs += f' name="Scene {i}"'
+        else:
+            attrs += f' file="FOO-001-R{i + 1}_sbs" goto="{i}"'
+        scenes.append(attrs)
+    return chapters_xml(scenes)
+
+
+def _make_set(directory: Path, parts: int) -> Path:
+    for part in range(1, parts + 1):
+        path = directory / f"FOO-001-R{part}_sbs.vcz"
+        make_vcz(path, MEMBERS, chapters=_chapters_xml(part, parts))
+    return directory / "FOO-001-R1_sbs.vcz"
+
+
+async def _concat(src: Path, cached: bool) -> None:
+    async with await VCZArchive.open(src, cached=cached) as vcz:
+        chapters = await vcz.chapter_control()
+        assert chapters is not None
+        await script_concat(src, chapters, ["vcsx"], dry_run=True, cached=cached)
+    await ARCHIVE_CACHE.close()
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parts", type=int, default=6, help="Parts per set")
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        src = _make_set(Path(tmp), args.parts)
+        for name, cached in (("uncached", False), ("cached", True)):
+            with mock.patch.object(
+                VCZArchive,
+                "_load_params",
+                autospec=True,
+                side_effect=VCZArchive._load_params,
+            ) as load_params:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    asyncio.run(_concat(src, cached))
+                elapsed = (time.perf_counter() - start) / args.repeat
+            print(
+                f"{name:>9}: {load_params.call_count // args.repeat:3} opens"
+                f"  {elapsed * 1e3:6.1f} ms per concat ({args.parts} parts)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark ChapterControl parsing over multipart VCZs.
+
+Compares the previous chapter parsing (nested zip written to a temporary
+file, re-parsed on every call) with in-memory parsing memoized on the
+archive. Each archive is queried several times, as when running ``concat``
+(chapters + external file offsets) and ``ffmeta`` on the same set.
+
+Usage::
+
+    $ python benchmarks/bench_chapters.py [DIR] [-n SETS] [--parts N] [--calls N]
+
+DIR should contain multipart VCZs (i.e. ``FOO-001-R1_sbs.vcz``,
+``FOO-001-R2_sbs.vcz``). Synthetic archives are generated when DIR is not
+specified.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from _common import chapters_xml
+from _common import make_vcz
+from lxml import etree  # noqa: S410
+
+from afesta_tools.vcs import ChapterControl
+from afesta_tools.vcs import VCZArchive
+
+
+def _chapters_xml(stem: str, part: int, parts: int) -> str:
+    scenes = []
+    for i in range(parts * 10):
+        scene_part = i // 10 + 1
+        attrs = f'time="{i * 60000}" duration="60000"'
+        if scene_part == part:
+            attrs += f' name="Scene {i}"'
+        else:
+            attrs += f' file="{stem}-R{scene_part}_sbs" goto="{i}"'
+        scenes.append(attrs)
+    return chapters_xml(scenes)
+
+
+def _make_set(directory: Path, stem: str, parts: int) -> None:
+    for part in range(1, parts + 1):
+        path = directory / f"{stem}-R{part}_sbs.vcz"
+        make_vcz(path, {}, chapters=_chapters_xml(stem, part, parts))
+
+
+async def _legacy_chapter_control(vcz: VCZArchive) -> ChapterControl | None:
+    if "ChapterControl" not in vcz.namelist():
+        return None
+    parser = etree.XMLParser(resolve_entities=False)
+    with tempfile.TemporaryFile() as f:
+        f.write(await vcz.read("ChapterControl"))
+        f.seek(0)
+        zipf = zipfile.ZipFile(f)
+        data = zipf.read("params.xml")
+    return ChapterControl.from_xml(
+        etree.fromstring(data, parser=parser)  # noqa: S320
+    )
+
+
+async def _run(paths: list[Path], calls: int, legacy: bool) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        async with await VCZArchive.open(path) as vcz:
+            for _ in range(calls):
+                if legacy:
+                    await _legacy_chapter_control(vcz)
+                else:
+                    await vcz.chapter_control()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=Path, help="Multipart VCZ directory")
+    parser.add_argument("-n", type=int, default=50, help="Synthetic sets")
+    parser.add_argument("--parts", type=int, default=3, help="Parts per set")
+    parser.add_argument("--calls", type=int, default=3, help="Calls per archive")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dir:
+            paths = sorted(args.dir.glob("*-R[0-9]*.vcz"))
+        else:
+            for i in range(args.n):
+                _make_set(Path(tmp), f"FOO-{i:03}", args.parts)
+            paths = sorted(Path(tmp).glob("*.vcz"))
+        for name, legacy in (("temp file", True), ("memoized", False)):
+            elapsed = asyncio.run(_run(paths, args.calls, legacy))
+            print(
+                f"{name:>10}: {elapsed * 1e3:7.1f} ms"
+                f"  ({elapsed / len(paths) * 1e3:.2f} ms per archive,"
+                f" {len(paths)} archives x {args.calls} calls)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark ps_get_list page decoding.
+
+Reports decode (JSON parse) and conversion (`PSListEntry.from_dict`) cost per
+1,000 entries for each available JSON backend. Pages containing raw control
+characters are rejected by orjson and decoded again by the standard library
+decoder, so both cases are worth measuring (see ``--clean``). Recorded
+ps_get_list response bodies can be passed as arguments, otherwise synthetic
+pages are used.
+
+Usage::
+
+    $ python benchmarks/bench_decode.py [--clean] [PAGE.json ...]
+"""
+import argparse
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from _common import list_entry
+
+from afesta_tools.lpeg import decode
+from afesta_tools.lpeg.client import PSListEntry
+
+
+def _page(page: int, num: int = 36, raw: bool = True) -> bytes:
+    data = [
+        list_entry(
+            i,
+            acters="女優A, 女優B",
+            big_img=f"https://img.lpeg.jp/big/{i:06}.jpg",
+            categories="女優, 美少女, 主観",
+            code=f"cc{i:08}_0000",
+            # raw control characters, as returned by LPEG
+            comment="詳細&amp;説明\r\n<BR>\t" * 20,
+            file_name=f"ABC-{i:05}-R1_st.mp4",
+            id=i - page * num,
+            img=f"https://img.lpeg.jp/{i:06}.jpg",
+            quality="HQ60",
+            release_date="2023-01-01 10:00:00",
+            set_num="2",
+            signal=1,
+            time=3600,
+            title=f"タイトル{i}",
+            title_all=f"【8KVR】タイトル{i}",
+            item_id=str(i),
+        )
+        for i in range(page * num, (page + 1) * num)
+    ]
+    result = {"page": {"count": 0, "pagecount": 0, "pageindex": page}, "data": data}
+    if not raw:
+        return json.dumps(result, ensure_ascii=False).encode()
+    # emit unescaped control characters
+    return (
+        json.dumps(result, ensure_ascii=False)
+        .replace("\\r", "\r")
+        .replace("\\n", "\n")
+        .replace("\\t", "\t")
+        .encode()
+    )
+
+
+def _run(
+    loads: Callable[[bytes], Any], pages: list[bytes], repeat: int
+) -> tuple[float, float]:
+    n = 0
+    decode_time = convert_time = 0.0
+    for _ in range(repeat):
+        for page in pages:
+            start = time.perf_counter()
+            result = loads(page)
+            decoded = time.perf_counter()
+            entries = [PSListEntry.from_dict(d) for d in result["data"]]
+            convert_time += time.perf_counter() - decoded
+            decode_time += decoded - start
+            n += len(entries)
+    # milliseconds per 1000 entries
+    return decode_time / n * 1e6, convert_time / n * 1e6
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*", type=Path, help="Recorded pages")
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Synthetic pages without raw control characters",
+    )
+    args = parser.parse_args()
+    pages = [path.read_bytes() for path in args.pages] or [
+        _page(i, raw=not args.clean) for i in range(20)
+    ]
+    backends: list[tuple[str, Callable[[bytes], Any]]] = [
+        ("json", decode.loads_stdlib)
+    ]
+    if decode.BACKEND == "orjson":
+        backends.append(("orjson", decode.loads))
+    for name, loads in backends:
+        decode_ms, convert_ms = _run(loads, pages, args.repeat)
+        print(
+            f"{name:>8}: decode {decode_ms:6.2f} ms"
+            f"  from_dict {convert_ms:6.2f} ms  per 1000 entries"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark library listing against a simulated high-latency server.
+
+Compares fetching fixed size ps_get_list pages sequentially (the original
+`get_videos` behavior, equivalent to a window of 1) with concurrent page
+fetching, and with concurrent fetching of negotiated (larger) pages.
+
+Usage::
+
+    $ python benchmarks/bench_list.py [-n TITLES] [--latency SECONDS] [--max-num N]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any
+
+from _common import list_entry
+
+from afesta_tools.lpeg.client import FourDClient
+from afesta_tools.lpeg.credentials import FourDCredentials
+
+
+class _Response:
+    def __init__(self, result: dict[str, Any]) -> None:
+        self.result = result
+
+    async def read(self) -> bytes:
+        return json.dumps(self.result).encode()
+
+
+class _SimulatedClient(FourDClient):
+    count = 0
+    latency = 0.0
+    max_num = 0
+
+    async def _request_list(
+        self, page: int = 0, num: int = 36, **kwargs: Any
+    ) -> _Response:
+        await asyncio.sleep(self.latency)
+        num = min(num, self.max_num)
+        pagecount = -(-self.count // num) - 1
+        data = [
+            list_entry(i, id=i - page * num)
+            for i in range(page * num, min((page + 1) * num, self.count))
+        ]
+        return _Response(
+            {
+                "page": {
+                    "count": self.count,
+                    "pagecount": pagecount,
+                    "pageindex": page,
+                },
+                "data": data,
+            }
+        )
+
+
+async def _run(window: int, sizes: tuple[int, ...]) -> tuple[float, int]:
+    creds = FourDCredentials(uid="bench", st="st", mid="mid", pid="pid")
+    async with _SimulatedClient(creds) as client:
+        client.LIST_WINDOW = window
+        client.LIST_MAX_PAGE_SIZES = sizes
+        start = time.perf_counter()
+        n = sum([1 async for _ in client.get_videos()])
+        return time.perf_counter() - start, n
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=3000, help="Library size")
+    parser.add_argument(
+        "--latency", type=float, default=0.25, help="Round-trip time (seconds)"
+    )
+    parser.add_argument(
+        "--max-num", type=int, default=500, help="Server maximum page size"
+    )
+    args = parser.parse_args()
+    _SimulatedClient.count = args.n
+    _SimulatedClient.latency = args.latency
+    _SimulatedClient.max_num = args.max_num
+    for name, window, sizes in (
+        ("sequential", 1, ()),
+        ("concurrent", FourDClient.LIST_WINDOW, ()),
+        ("negotiated", FourDClient.LIST_WINDOW, FourDClient.LIST_MAX_PAGE_SIZES),
+    ):
+        elapsed, n = asyncio.run(_run(window, sizes))
+        print(f"{name:>12}: {elapsed:6.2f}s  ({n} titles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark PSListEntry memory use and derived value access cost.
+
+Compares the previous (unslotted, eagerly decoded) PSListEntry layout with
+the current one for synthetic libraries.
+
+Usage::
+
+    $ python benchmarks/bench_pslist.py [-n ENTRIES ...]
+"""
+import argparse
+import gc
+import html
+import os
+import re
+import time
+import tracemalloc
+import unicodedata
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+
+from _common import GENRES
+from _common import list_entry
+
+from afesta_tools.lpeg.client import PSListEntry
+
+
+_CLEAN_TITLE_RE = re.compile(r"^(?:(?:【.*】)|(?:\[?.*\]))*\s*(?P<title>.*)$")
+_FID_RE = re.compile(r"^(?P<full>(?P<fid>.*?)(?:(?P<set_suffix>\-(?:R|Part))\d+)?)_st$")
+
+ACTRESSES = [f"女優{i}" for i in range(200)]
+
+
+@dataclass(frozen=True)
+class _LegacyEntry:
+    acters: list[str]
+    big_img: str
+    categories: list[str]
+    code: str | None
+    comment: str
+    dl: bool
+    favorite: bool
+    file_name: str
+    id: int
+    img: str
+    maker: str
+    quality: str
+    release_date: datetime
+    set_num: int | None
+    signal: bool
+    time: int
+    title: str
+    title_all: str
+    item_id: str
+    ai3d: int
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "_LegacyEntry":
+        acters = [actor.strip() for actor in d.pop("acters").split(",")]
+        categories = [cat.strip() for cat in d.pop("categories").split(",")]
+        comment = html.unescape(d.pop("comment")).replace("<BR>", "\n")
+        release_date = datetime.fromisoformat(d.pop("release_date")).replace(
+            tzinfo=timezone(timedelta(hours=9), name="JST")
+        )
+        n = d.pop("set_num")
+        return cls(
+            acters=acters,
+            categories=categories,
+            comment=comment,
+            dl=d.pop("dl") != 0,
+            favorite=d.pop("favorite") != 0,
+            release_date=release_date,
+            set_num=int(n) if n != "0" else None,
+            signal=d.pop("signal") != 0,
+            **d,
+        )
+
+    @property
+    def title_clean(self) -> str:
+        m = _CLEAN_TITLE_RE.match(self.title_all)
+        title = m.group("title") if m else self.title_all
+        return unicodedata.normalize("NFKC", title)
+
+    def get_fid(self) -> str:
+        stem, _ = os.path.splitext(self.file_name)
+        m = _FID_RE.match(stem)
+        return m.group("full") if m else stem
+
+
+def _entry(i: int) -> dict[str, Any]:
+    return list_entry(
+        i,
+        # build strings at runtime so that they are not shared constants
+        acters=", ".join(ACTRESSES[(i * k) % len(ACTRESSES)] for k in (1, 7)),
+        big_img=f"https://img.lpeg.jp/big/{i:06}.jpg",
+        categories=", ".join(GENRES[: 2 + i % 5]),
+        code=f"cc{i:08}_0000",
+        comment="詳細&amp;説明<BR>" * 20 + str(i),
+        file_name=f"ABC-{i:05}-R1_st.mp4",
+        id=i % 36,
+        img=f"https://img.lpeg.jp/{i:06}.jpg",
+        maker="".join(["", ""]),
+        quality="".join(["HQ", "60"]),
+        release_date="2023-01-01 10:00:00",
+        set_num=str(i % 3),
+        signal=i % 2,
+        time=3600,
+        title=f"タイトル{i}",
+        title_all=f"【8KVR】ＴＩＴＬＥ　タイトル{i}",
+        item_id=str(i),
+    )
+
+
+def _memory(cls: Callable[[dict[str, Any]], Any], n: int) -> tuple[list[Any], int]:
+    data = [_entry(i) for i in range(n)]
+    gc.collect()
+    tracemalloc.start()
+    entries = [cls(d) for d in data]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entries, size
+
+
+def _access(entries: list[Any], func: Callable[[Any], Any]) -> tuple[float, float]:
+    """Return (first, repeated) access cost in ns."""
+    times = []
+    for _ in range(2):
+        start = time.perf_counter()
+        for entry in entries:
+            func(entry)
+        times.append((time.perf_counter() - start) / len(entries) * 1e9)
+    return times[0], times[1]
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n", type=int, nargs="+", default=[10_000, 100_000], help="Entries"
+    )
+    args = parser.parse_args()
+    for n in args.n:
+        print(f"{n} entries:")
+        for name, cls in (
+            ("legacy", _LegacyEntry.from_dict),
+            ("PSListEntry", PSListEntry.from_dict),
+        ):
+            entries, size = _memory(cls, n)
+            fid = _access(entries, lambda e: e.get_fid())
+            title = _access(entries, lambda e: e.title_clean)
+            print(
+                f"  {name:>12}: {size / n:7.0f} B/entry"
+                f"  get_fid {fid[0]:5.0f}/{fid[1]:5.0f} ns"
+                f"  title_clean {title[0]:5.0f}/{title[1]:5.0f} ns (first/repeat)"
+            )
+            del entries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark offline catalog search.
+
+Reports index build time and per-query latency for synthetic libraries,
+compared with a linear scan over the listing.
+
+Usage::
+
+    $ python benchmarks/bench_search.py [-n ENTRIES ...]
+"""
+import argparse
+import time
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+from _common import GENRES
+from _common import list_entry
+
+from afesta_tools.lpeg.client import PSListEntry
+from afesta_tools.lpeg.search import CatalogIndex
+from afesta_tools.lpeg.search import SearchQuery
+from afesta_tools.lpeg.search import normalize
+
+
+ACTRESSES = [f"女優{i}" for i in range(2000)]
+WORDS = ["ハーレム", "密着", "囁き", "同棲", "温泉", "看護師", "先生", "後輩"]
+
+QUERIES = {
+    "actress": SearchQuery(actresses=["女優42"]),
+    "genre+goods": SearchQuery(genres=["巨乳"], signal=True),
+    "title": SearchQuery(title="温泉 看護師"),
+    "date range": SearchQuery(
+        released_after=date(2022, 1, 1), released_before=date(2022, 3, 31)
+    ),
+    "combined": SearchQuery(
+        genres=["主観"], min_duration=7200, parts=2, title="密着"
+    ),
+}
+
+
+def _entry(i: int) -> dict[str, Any]:
+    return list_entry(
+        i,
+        acters=", ".join(ACTRESSES[(i * k) % len(ACTRESSES)] for k in (1, 7)),
+        categories=", ".join(GENRES[i % 3 : 3 + i % 5]),
+        code=f"cc{i:08}_0000",
+        file_name=f"ABC-{i:05}-R1_st.mp4",
+        id=i % 36,
+        quality="HQ60",
+        release_date=f"{2018 + i % 7}-{1 + i % 12:02}-{1 + i % 28:02} 10:00:00",
+        set_num=str(i % 3),
+        signal=i % 4 == 0,
+        time=1800 * (1 + i % 6),
+        title_all=f"【8KVR】{WORDS[i % 8]} {WORDS[i // 8 % 8]} タイトル{i}",
+        item_id=str(i),
+    )
+
+
+def _scan(videos: list[PSListEntry], query: SearchQuery) -> list[PSListEntry]:
+    def match(video: PSListEntry) -> bool:
+        checks: list[Callable[[], bool]] = [
+            lambda: all(a in video.acters for a in query.actresses),
+            lambda: all(g in video.categories for g in query.genres),
+            lambda: not query.title
+            or normalize(query.title) in normalize(video.title_all),
+            lambda: query.released_after is None
+            or video.release_date.date() >= query.released_after,
+            lambda: query.released_before is None
+            or video.release_date.date() <= query.released_before,
+            lambda: query.min_duration is None or video.time >= query.min_duration,
+            lambda: query.signal is None or video.signal == query.signal,
+            lambda: query.parts is None or (video.num_parts or 1) == query.parts,
+        ]
+        return all(check() for check in checks)
+
+    return [video for video in videos if match(video)]
+
+
+def _time(func: Callable[[], Any], repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n", type=int, nargs="+", default=[10_000, 50_000], help="Entries"
+    )
+    args = parser.parse_args()
+    for n in args.n:
+        videos = [PSListEntry.from_dict(_entry(i)) for i in range(n)]
+        start = time.perf_counter()
+        index = CatalogIndex(videos)
+        build = (time.perf_counter() - start) * 1e3
+        print(f"{n} entries: index build {build:.0f} ms")
+        for name, query in QUERIES.items():
+            results = index.search(query)
+            assert results == _scan(videos, query)
+            indexed = _time(lambda: index.search(query))
+            scan = _time(lambda: _scan(videos, query), repeat=1)
+            print(
+                f"  {name:>12}: {indexed:7.2f} ms indexed"
+                f"  {scan:8.2f} ms scan  ({len(results)} results)"
+            )
+
+
+if __name__ == "__main__":
+    main()
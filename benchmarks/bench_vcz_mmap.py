@@ -0,0 +1,97 @@
+"""Benchmark memory-mapped VCZ reads over a VCZ library.
+
+Opens every archive in a library and reads its chapters, goods scripts and
+other members (as when scanning or extracting a library), with and without
+memory-mapped archives, and reports the total time and peak allocated
+memory. ``--no-scripts`` skips VCSX parsing, which otherwise dominates.
+
+Usage::
+
+    $ python benchmarks/bench_vcz_mmap.py [DIR] [-n ARCHIVES] [--commands N]
+        [--no-scripts]
+
+DIR should contain VCZ files. Synthetic archives with stored members are
+generated when DIR is not specified.
+"""
+import argparse
+import asyncio
+import io
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from _common import chapters_xml
+from _common import make_vcz
+from a10sa_script.command.vorze import VorzeRotateCommand
+from a10sa_script.script import VCSXCycloneScript
+from a10sa_script.script.vorze import VorzeScriptCommand
+
+from afesta_tools.vcs import GoodsType
+from afesta_tools.vcs import VCZArchive
+
+
+def _make(path: Path, commands: int) -> None:
+    rand = random.Random(path.name)
+    script = io.BytesIO()
+    VCSXCycloneScript(
+        VorzeScriptCommand(i * 100, VorzeRotateCommand(rand.randrange(100), False))
+        for i in range(commands)
+    ).dump(script)
+    members = {
+        "Vorze_CycloneSA": script.getvalue(),
+        "HeadKey": rand.randbytes(64 * 1024),
+        "image": rand.randbytes(256 * 1024),
+    }
+    chapters = chapters_xml(['time="0" duration="60000" name="Scene 1"'])
+    make_vcz(path, members, chapters=chapters)
+
+
+async def _scan(paths: list[Path], mmap: bool, scripts: bool) -> int:
+    total = 0
+    for path in paths:
+        async with await VCZArchive.open(path, mmap=mmap) as vcz:
+            await vcz.chapter_control()
+            if scripts and "Vorze_CycloneSA" in vcz.namelist():
+                total += len(await vcz.read_script(GoodsType.CYCLONE))
+            for name in ("image", "HeadKey"):
+                if name in vcz.namelist():
+                    total += len(await vcz.read_buffer(name))
+    return total
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=Path, help="VCZ directory")
+    parser.add_argument("-n", type=int, default=300, help="Synthetic archives")
+    parser.add_argument(
+        "--commands", type=int, default=2000, help="Script commands per archive"
+    )
+    parser.add_argument("--no-scripts", action="store_true", help="Skip scripts")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dir:
+            paths = sorted(args.dir.glob("*.vcz"))
+        else:
+            for i in range(args.n):
+                _make(Path(tmp) / f"FOO-{i:04}.vcz", args.commands)
+            paths = sorted(Path(tmp).glob("*.vcz"))
+        for name, mmap in (("read", False), ("mmap", True)):
+            start = time.perf_counter()
+            asyncio.run(_scan(paths, mmap, not args.no_scripts))
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            asyncio.run(_scan(paths, mmap, not args.no_scripts))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{name:>5}: {elapsed * 1e3:8.1f} ms"
+                f"  ({elapsed / len(paths) * 1e3:.2f} ms per archive,"
+                f" {len(paths)} archives), peak {peak / 1024:8.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark concurrent VCZ archive opens.
+
+Opens many synthetic VCZ archives concurrently, either with the blocking
+constructor (the previous ``async with VCZArchive(path)`` usage) or with
+``await VCZArchive.open(path)``, and reports total time and the longest
+event loop stall measured by a ticker task.
+
+Usage::
+
+    $ python benchmarks/bench_vcz_open.py [-n ARCHIVES] [--members N] [DIR]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from _common import make_vcz
+
+from afesta_tools.vcs import VCZArchive
+
+
+def _make(path: Path, members: int) -> None:
+    make_vcz(path, {f"Member{i}": b"\0" * 1024 for i in range(members)})
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.001) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _open_blocking(path: Path) -> None:
+    async with VCZArchive(path) as vcz:
+        await vcz.read("Member0")
+
+
+async def _open_async(path: Path) -> None:
+    async with await VCZArchive.open(path) as vcz:
+        await vcz.read("Member0")
+
+
+async def _run(paths: list[Path], blocking: bool) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    opener = _open_blocking if blocking else _open_async
+    await asyncio.gather(*(opener(path) for path in paths))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ticker
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=Path, help="Working directory")
+    parser.add_argument("-n", type=int, default=200, help="Archives")
+    parser.add_argument("--members", type=int, default=50, help="Archive members")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        paths = [Path(tmp) / f"{i}.vcz" for i in range(args.n)]
+        for path in paths:
+            _make(path, args.members)
+        for name, blocking in (("blocking", True), ("open()", False)):
+            elapsed, stall = asyncio.run(_run(paths, blocking))
+            print(
+                f"{name:>9}: {elapsed * 1e3:7.1f} ms total"
+                f"  {stall * 1e3:7.1f} ms max event loop stall"
+            )
+
+
+if __name__ == "__main__":
+    main()
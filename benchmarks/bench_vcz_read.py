@@ -0,0 +1,108 @@
+"""Benchmark concurrent VCZ member reads.
+
+Reads all members of large synthetic VCZs concurrently, either through the
+locked `zipfile` path (the previous behavior) or through the lock-free
+member reader. Slow storage can be simulated with ``--latency``, which adds
+a delay to every file read, or by placing the archives on slow storage with
+DIR.
+
+Usage::
+
+    $ python benchmarks/bench_vcz_read.py [DIR] [-n ARCHIVES] [--size MB]
+        [--latency SECONDS]
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from _common import make_vcz
+
+from afesta_tools.vcs import VCZArchive
+
+
+MEMBERS = [
+    "Vorze_CycloneSA",
+    "Vorze_Piston",
+    "Vorze_OnaRhythm",
+    "ChapterControl",
+    "HeadKey",
+    "image",
+]
+
+
+def _make(path: Path, size: int) -> None:
+    rand = random.Random(path.name)
+    members = {}
+    for name in MEMBERS:
+        # compressible but not trivially so
+        words = [rand.randbytes(8) for _ in range(256)]
+        members[name] = b"".join(rand.choices(words, k=size // 8))
+    make_vcz(path, members, compression=zipfile.ZIP_DEFLATED)
+
+
+class _SlowFile(io.BufferedReader):
+    latency = 0.0
+
+    def read(self, size: int | None = -1) -> bytes:
+        time.sleep(self.latency)
+        return super().read(size)
+
+
+async def _read_all(paths: list[Path], locked: bool) -> int:
+    total = 0
+
+    async def _read(path: Path) -> None:
+        nonlocal total
+        async with await VCZArchive.open(path) as vcz:
+            if locked:
+                vcz._reader = None
+            for data in await asyncio.gather(*(vcz.read(name) for name in MEMBERS)):
+                total += len(data)
+
+    await asyncio.gather(*(_read(path) for path in paths))
+    return total
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dir", nargs="?", type=Path, help="Working directory")
+    parser.add_argument("-n", type=int, default=4, help="Archives")
+    parser.add_argument("--size", type=int, default=8, help="Member size (MB)")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Simulated per-read latency"
+    )
+    args = parser.parse_args()
+    _SlowFile.latency = args.latency
+    real_open = io.open
+
+    def _open(file: Any, mode: str = "r", *a: Any, **kw: Any) -> Any:
+        if mode == "rb" and os.fspath(file).endswith(".vcz"):
+            return _SlowFile(io.FileIO(file, "rb"))
+        return real_open(file, mode, *a, **kw)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        paths = [Path(tmp) / f"{i}.vcz" for i in range(args.n)]
+        for path in paths:
+            _make(path, args.size * 1024 * 1024)
+        with mock.patch("io.open", _open), mock.patch("builtins.open", _open):
+            for name, locked in (("locked", True), ("reader", False)):
+                start = time.perf_counter()
+                total = asyncio.run(_read_all(paths, locked))
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{name:>7}: {elapsed * 1e3:7.1f} ms"
+                    f"  ({total / elapsed / 1024**2:7.1f} MB/s)"
+                )
+
+
+if __name__ == "__main__":
+    main()
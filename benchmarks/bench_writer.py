@@ -0,0 +1,84 @@
+"""Benchmark concurrent downloads writing to a throttled disk.
+
+Compares writing each network chunk synchronously on the event loop (the
+previous `_download` behavior) with `AsyncFileWriter`.
+
+Usage::
+
+    $ python benchmarks/bench_writer.py [-n DOWNLOADS] [--size MIB]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO
+
+from afesta_tools.lpeg.writer import AsyncFileWriter
+
+
+CHUNK = 64 * 1024
+NET_RATE = 200 * 1024 * 1024  # simulated per-connection network throughput
+DISK_LATENCY = 0.002  # simulated per-write NAS latency (seconds)
+
+
+async def _network(size: int) -> AsyncIterator[bytes]:
+    data = bytes(CHUNK)
+    for _ in range(size // CHUNK):
+        await asyncio.sleep(CHUNK / NET_RATE)
+        yield data
+
+
+def _slow_write(fp: BinaryIO, data: bytes) -> None:
+    time.sleep(DISK_LATENCY)
+    fp.write(data)
+
+
+async def _blocking(path: Path, size: int) -> None:
+    with open(path, "r+b") as fp:
+        async for chunk in _network(size):
+            _slow_write(fp, chunk)
+
+
+class _ThrottledWriter(AsyncFileWriter):
+    def _write_at(self, offset: int, chunks: list[bytes]) -> None:
+        time.sleep(DISK_LATENCY)
+        super()._write_at(offset, chunks)
+
+
+async def _buffered(path: Path, size: int) -> None:
+    async with _ThrottledWriter(path) as writer:
+        async for chunk in _network(size):
+            await writer.write(chunk)
+
+
+async def _run(
+    func: Callable[[Path, int], Awaitable[None]], paths: list[Path], size: int
+) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(func(path, size) for path in paths))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--size", type=int, default=32, help="MiB per download")
+    args = parser.parse_args()
+    size = args.size * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"{i}.bin" for i in range(args.n)]
+        for path in paths:
+            path.write_bytes(b"")
+        for name, func in (("blocking", _blocking), ("AsyncFileWriter", _buffered)):
+            elapsed = asyncio.run(_run(func, paths, size))
+            rate = args.n * size / elapsed / 1024 / 1024
+            print(f"{name:>16}: {elapsed:6.2f}s  {rate:8.1f} MiB/s aggregate")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,54 @@
 """Command-line interface."""
 import asyncio
 import os
-from contextlib import aclosing
+from contextlib import AbstractContextManager
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Literal
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Sequence
+from typing import IO
 from typing import Any
 from typing import cast
 
 import click
 from tqdm.asyncio import tqdm
 
+from .config import default_cache_path
 from .config import dump_credentials
 from .config import load_credentials
 from .exceptions import AfestaError
+from .exceptions import CacheError
 from .exceptions import NoCredentialsError
+from .export import DEFAULT_FIELDS
+from .export import FIELDS
+from .export import ExportFormat
+from .export import export_entries
+from .lpeg.cache import CacheMode
+from .lpeg.cache import MetadataCache
 from .lpeg.client import BaseLpegClient
 from .lpeg.client import FourDClient
+from .lpeg.client import PSListEntry
 from .lpeg.client import VideoQuality
 from .lpeg.credentials import BaseCredentials
 from .lpeg.credentials import FourDCredentials
+from .lpeg.ratelimit import parse_rate
+from .lpeg.resolver import FIDResolver
+from .lpeg.retry import RetryPolicy
+from .lpeg.search import CatalogIndex
+from .lpeg.search import SearchQuery
+from .manifest import Manifest
+from .manifest import VerifyStatus
+from .progress import LazyProgressCallback
 from .progress import ProgressCallback
+from .sync import LibrarySync
+from .sync import SyncItem
 
 
 @click.group()
@@ -29,6 +57,12 @@ def cli() -> None:
     """Afesta Tools."""
 
 
+_QUALITIES = {
+    "h264": VideoQuality.H264,
+    "h265": VideoQuality.H265,
+}
+
+
 def _load_credentials() -> BaseCredentials:
     """Try to load default credentials.
 
@@ -92,6 +126,168 @@ async def _login(username: str, password: str) -> BaseCredentials:
         return await client.register_player(username, password)
 
 
+class _RateType(click.ParamType):
+    name = "rate"
+
+    def convert(
+        self, value: Any, param: click.Parameter | None, ctx: click.Context | None
+    ) -> float | None:
+        if value is None or isinstance(value, (int, float)):
+            return value
+        try:
+            return parse_rate(value)
+        except ValueError as exc:
+            self.fail(str(exc), param, ctx)
+
+
+def _transfer_options(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Add common file transfer options to a download command."""
+    for option in reversed(
+        [
+            click.option(
+                "-j",
+                "--jobs",
+                type=click.IntRange(min=1),
+                default=None,
+                help="Maximum number of concurrent file transfers.",
+            ),
+            click.option(
+                "--host-jobs",
+                type=click.IntRange(min=1),
+                default=None,
+                help=(
+                    "Maximum number of concurrent file transfers per download"
+                    " endpoint (video and vcz downloads are capped separately)."
+                ),
+            ),
+            click.option(
+                "--limit-rate",
+                type=_RateType(),
+                default=None,
+                help="Maximum total download rate in bytes/s (i.e. 500K, 10M).",
+            ),
+            click.option(
+                "--file-limit-rate",
+                type=_RateType(),
+                default=None,
+                help="Maximum download rate in bytes/s for each file.",
+            ),
+            click.option(
+                "--rate-file",
+                type=click.Path(dir_okay=False, path_type=Path),
+                default=None,
+                help=(
+                    "Control file containing the total rate limit. The limit is"
+                    " updated whenever the file changes (empty or 0 for unlimited)."
+                ),
+            ),
+            click.option(
+                "--min-rate",
+                type=_RateType(),
+                default=None,
+                help=(
+                    "Reconnect when a transfer stays below this rate in bytes/s"
+                    " for --stall-timeout seconds."
+                ),
+            ),
+            click.option(
+                "--stall-timeout",
+                type=click.FloatRange(min=1),
+                default=None,
+                help="Stall detection period in seconds (defaults to 60).",
+            ),
+            click.option(
+                "--retries",
+                type=click.IntRange(min=1),
+                default=None,
+                help="Maximum attempts for failed requests and transfers.",
+            ),
+            click.option(
+                "--adopt/--no-adopt",
+                default=True,
+                help=(
+                    "Record existing files with the size reported by the server"
+                    " in the download manifest instead of downloading them again."
+                ),
+            ),
+        ]
+    ):
+        func = option(func)
+    return func
+
+
+def _cache_options(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Add metadata cache options to a command."""
+    for option in reversed(
+        [
+            click.option(
+                "--refresh",
+                "cache_mode",
+                flag_value=CacheMode.REFRESH.value,
+                default=None,
+                help="Re-fetch the full video listing instead of using the cache.",
+            ),
+            click.option(
+                "--offline",
+                "cache_mode",
+                flag_value=CacheMode.OFFLINE.value,
+                help="Only use the cached video listing.",
+            ),
+        ]
+    ):
+        func = option(func)
+    return func
+
+
+def _new_client(
+    creds: BaseCredentials, cache_mode: str | None = None, **kwargs: Any
+) -> BaseLpegClient:
+    return FourDClient(
+        creds,
+        cache=MetadataCache(default_cache_path()),
+        cache_mode=CacheMode(cache_mode) if cache_mode else CacheMode.DEFAULT,
+        **kwargs,
+    )
+
+
+@asynccontextmanager
+async def _transfer_client(
+    creds: BaseCredentials,
+    jobs: int | None = None,
+    host_jobs: int | None = None,
+    limit_rate: float | None = None,
+    file_limit_rate: float | None = None,
+    rate_file: Path | None = None,
+    min_rate: float | None = None,
+    stall_timeout: float | None = None,
+    retries: int | None = None,
+    adopt: bool = True,
+    cache_mode: str | None = None,
+) -> AsyncIterator[BaseLpegClient]:
+    async with _new_client(
+        creds,
+        cache_mode=cache_mode,
+        max_jobs=jobs,
+        max_jobs_per_host=host_jobs,
+        rate_limit=limit_rate,
+        transfer_rate_limit=file_limit_rate,
+        min_rate=min_rate,
+        stall_timeout=stall_timeout,
+        retry_policy=RetryPolicy(max_attempts=retries) if retries else None,
+        adopt=adopt,
+    ) as client:
+        watcher = (
+            asyncio.create_task(client.rate_limiter.watch(rate_file))
+            if rate_file
+            else None
+        )
+        try:
+            yield client
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
 @cli.command()
 @click.option("-q", "--quality", type=click.Choice(["h264", "h265"]), default=None)
 @click.option(
@@ -106,12 +302,32 @@ async def _login(username: str, password: str) -> BaseCredentials:
     type=click.Choice(["jp", "en"], case_sensitive=False),
     default="jp",
 )
+@click.option(
+    "-s",
+    "--segments",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Download each file over up to this many parallel connections.",
+)
+@_transfer_options
+@_cache_options
 @click.argument("code_or_fid", nargs=-1)
 def dl(
     code_or_fid: Sequence[str],
     quality: str | None,
     code: bool,
     lang: Literal["jp", "en"],
+    segments: int | None,
+    cache_mode: str | None,
+    jobs: int | None,
+    host_jobs: int | None,
+    limit_rate: float | None,
+    file_limit_rate: float | None,
+    rate_file: Path | None,
+    min_rate: float | None,
+    stall_timeout: float | None,
+    retries: int | None,
+    adopt: bool,
 ) -> int:  # noqa: DAR101
     """Download an afesta video.
 
@@ -121,49 +337,123 @@ def dl(
     If 4D Media Player is installed and the current user is logged in via the
     player, the existing 4D Media Player credentials will be used. Otherwise,
     the 'afesta login' command must be run before downloading.
+
+    If CODE_OR_FID is '-', codes or FIDs are read from standard input (one
+    per line, i.e. 'afesta search' or 'afesta list' output).
     """
     try:
         creds = _load_credentials()
     except NoCredentialsError:
         click.echo("No credentials found. Did you forget to run 'afesta login'?")
+    if _is_stdin(code_or_fid):
+        code_or_fid = _read_ids(click.get_text_stream("stdin"))
     try:
-        kwargs = {}
+        kwargs: dict[str, Any] = {}
         if quality:
-            kwargs["quality"] = {
-                "h264": VideoQuality.H264,
-                "h265": VideoQuality.H265,
-            }[quality.lower()]
-        asyncio.run(_dl(code_or_fid, creds, code=code, lang=lang.upper(), **kwargs))
+            kwargs["quality"] = _QUALITIES[quality.lower()]
+        if segments:
+            kwargs["segments"] = segments
+        transfer = {
+            "jobs": jobs,
+            "host_jobs": host_jobs,
+            "limit_rate": limit_rate,
+            "file_limit_rate": file_limit_rate,
+            "rate_file": rate_file,
+            "min_rate": min_rate,
+            "stall_timeout": stall_timeout,
+            "retries": retries,
+            "adopt": adopt,
+            "cache_mode": cache_mode,
+        }
+        asyncio.run(
+            _dl(code_or_fid, creds, transfer, code=code, lang=lang.upper(), **kwargs)
+        )
     except AfestaError as exc:  # pragma: no cover
         click.echo(f"Download failed: {exc}", err=True)
         return 1
     return 0
 
 
-async def _dl(video_ids: Sequence[str], creds: BaseCredentials, **kwargs: Any) -> None:
-    async with FourDClient(creds) as client:
+def _is_stdin(args: Sequence[str]) -> bool:
+    return tuple(args) == ("-",)
+
+
+def _read_ids(stream: IO[str]) -> tuple[str, ...]:
+    """Return video IDs from listing output.
+
+    The first field of each unindented line is used (so that both plain and
+    detailed listing output can be read) and duplicates are skipped.
+
+    Arguments:
+        stream: Input stream.
+
+    Returns:
+        Video IDs in input order.
+    """
+    ids: dict[str, None] = {}
+    for line in stream:
+        if not line.strip() or line[0].isspace():
+            continue
+        ids[line.split()[0].rstrip(":")] = None
+    return tuple(ids)
+
+
+async def _dl(
+    video_ids: Sequence[str],
+    creds: BaseCredentials,
+    transfer: dict[str, Any] | None = None,
+    **kwargs: Any,
+) -> None:
+    async with _transfer_client(creds, **(transfer or {})) as client:
+        if not kwargs.get("code") and len(video_ids) > 1:
+            # resolve all FIDs from one (cached) listing pass instead of
+            # searching for each FID
+            resolver = await FIDResolver.from_client(
+                client, lang=kwargs.get("lang", "JP")
+            )
+            kwargs["resolved"] = resolver.resolve_all(video_ids)
         await asyncio.gather(
             *(_dl_one(client, video_id, **kwargs) for video_id in video_ids)
         )
 
 
+@contextmanager
+def _lazy_progress() -> Iterator[ProgressCallback]:
+    # transfers wait on the client's scheduler, only show a pbar once
+    # transferring
+    callback = LazyProgressCallback(partial(tqdm, unit="B", unit_scale=True))
+    try:
+        yield callback
+    finally:
+        callback.close()
+
+
 async def _dl_one(
     client: BaseLpegClient, video_id: str, code: bool = False, **kwargs: Any
 ) -> None:
-    with tqdm(unit="B", unit_scale=True) as pbar:
+    with _lazy_progress() as progress:
         if code:
             kwargs["code"] = video_id
         else:
             kwargs["fid"] = video_id
-        await client.download_video(
-            progress=ProgressCallback(pbar),
-            **kwargs,
-        )
+        await client.download_video(progress=progress, **kwargs)
 
 
 @cli.command()
+@_transfer_options
 @click.argument("video_id", nargs=-1)
-def dl_vcz(video_id: Sequence[str]) -> int:  # noqa: DAR101
+def dl_vcz(
+    video_id: Sequence[str],
+    jobs: int | None,
+    host_jobs: int | None,
+    limit_rate: float | None,
+    file_limit_rate: float | None,
+    rate_file: Path | None,
+    min_rate: float | None,
+    stall_timeout: float | None,
+    retries: int | None,
+    adopt: bool,
+) -> int:  # noqa: DAR101
     """Download vcz files for an afesta video.
 
     Requires an account with permissions to download the video (either via
@@ -178,25 +468,37 @@ def dl_vcz(video_id: Sequence[str]) -> int:  # noqa: DAR101
     except NoCredentialsError:
         click.echo("No credentials found. Did you forget to run 'afesta login'?")
     try:
-        asyncio.run(_dl_vczs(video_id, creds))
+        transfer = {
+            "jobs": jobs,
+            "host_jobs": host_jobs,
+            "limit_rate": limit_rate,
+            "file_limit_rate": file_limit_rate,
+            "rate_file": rate_file,
+            "min_rate": min_rate,
+            "stall_timeout": stall_timeout,
+            "retries": retries,
+            "adopt": adopt,
+        }
+        asyncio.run(_dl_vczs(video_id, creds, transfer))
     except AfestaError as exc:  # pragma: no cover
         click.echo(f"Download failed: {exc}", err=True)
         return 1
     return 0
 
 
-async def _dl_vczs(video_ids: Sequence[str], creds: BaseCredentials) -> None:
-    async with FourDClient(creds) as client:
+async def _dl_vczs(
+    video_ids: Sequence[str],
+    creds: BaseCredentials,
+    transfer: dict[str, Any] | None = None,
+) -> None:
+    async with _transfer_client(creds, **(transfer or {})) as client:
         await asyncio.gather(*(_dl_vcz(client, video_id) for video_id in video_ids))
 
 
 async def _dl_vcz(client: BaseLpegClient, video_id: str) -> None:
-    with tqdm(unit="B", unit_scale=True) as pbar:
+    with _lazy_progress() as progress:
         video_id, ext = os.path.splitext(os.path.basename(video_id))
-        await client.download_vcz(
-            video_id,
-            progress=ProgressCallback(pbar),
-        )
+        await client.download_vcz(video_id, progress=progress)
 
 
 @cli.command()
@@ -240,7 +542,7 @@ async def _extract_one(
     from .vcs import GoodsType
     from .vcs import VCZArchive
 
-    async with VCZArchive(filename) as vcz:
+    async with await VCZArchive.open(filename, mmap=True) as vcz:
         for typ in (
             GoodsType.CYCLONE,
             GoodsType.PISTON,
@@ -254,6 +556,18 @@ async def _extract_one(
                     pass
 
 
+def _parse_fields(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> tuple[str, ...] | None:
+    if value is None:
+        return None
+    fields = tuple(name.strip() for name in value.split(",") if name.strip())
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise click.BadParameter(f"unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
 @cli.command()
 @click.option(
     "-l",
@@ -263,7 +577,33 @@ async def _extract_one(
 )
 @click.option("-d", "--detail", is_flag=True, help="List detailed video information.")
 @click.option("--tv", is_flag=True, help="List AfestaTV/2D videos (defaults to VR).")
-def list(tv: bool, detail: bool, lang: Literal["JP", "EN"]) -> int:
+@click.option(
+    "-f",
+    "--format",
+    "fmt",
+    type=click.Choice([fmt.value for fmt in ExportFormat]),
+    default=None,
+    help="Stream machine-readable records instead of text.",
+)
+@click.option(
+    "--fields",
+    callback=_parse_fields,
+    default=None,
+    help=(
+        "Comma separated fields for --format output "
+        f"(defaults to {','.join(DEFAULT_FIELDS)}). "
+        f"Available fields: {','.join(FIELDS)}."
+    ),
+)
+@_cache_options
+def list(
+    tv: bool,
+    detail: bool,
+    lang: Literal["JP", "EN"],
+    fmt: str | None,
+    fields: Sequence[str] | None,
+    cache_mode: str | None,
+) -> int:  # noqa: DAR101
     """List available afesta video downloads.
 
     Requires an account with permissions to download the video (either via
@@ -272,13 +612,27 @@ def list(tv: bool, detail: bool, lang: Literal["JP", "EN"]) -> int:
     If 4D Media Player is installed and the current user is logged in via the
     player, the existing 4D Media Player credentials will be used. Otherwise,
     the 'afesta login' command must be run before downloading.
+
+    With --format, one record is written per video as listing pages are
+    received from the server, without using the metadata cache (unless
+    --offline is specified).
     """
     try:
         creds = _load_credentials()
     except NoCredentialsError:
         click.echo("No credentials found. Did you forget to run 'afesta login'?")
     try:
-        asyncio.run(_list(creds, tv, detail, cast(Literal["JP", "EN"], lang.upper())))
+        asyncio.run(
+            _list(
+                creds,
+                tv,
+                detail,
+                cast(Literal["JP", "EN"], lang.upper()),
+                cache_mode=cache_mode,
+                fmt=ExportFormat(fmt) if fmt else None,
+                fields=fields,
+            )
+        )
     except AfestaError as exc:  # pragma: no cover
         click.echo(f"Listing failed: {exc}", err=True)
         return 1
@@ -286,29 +640,184 @@ def list(tv: bool, detail: bool, lang: Literal["JP", "EN"]) -> int:
 
 
 async def _list(
-    creds: BaseCredentials, tv: bool, detail: bool, lang: Literal["JP", "EN"]
+    creds: BaseCredentials,
+    tv: bool,
+    detail: bool,
+    lang: Literal["JP", "EN"],
+    cache_mode: str | None = None,
+    fmt: ExportFormat | None = None,
+    fields: Sequence[str] | None = None,
+) -> None:
+    async with _new_client(creds, cache_mode=cache_mode) as client:
+        if fmt is None:
+            for video in await client.list_videos(vr=not tv, lang=lang):
+                _echo_video(video, detail)
+            return
+        if cache_mode == CacheMode.OFFLINE.value:
+            videos = _aiter(await client.list_videos(vr=not tv, lang=lang))
+        else:
+            videos = client.get_videos(vr=not tv, lang=lang)
+        await export_entries(
+            videos, click.get_text_stream("stdout"), fmt=fmt, fields=fields
+        )
+
+
+async def _aiter(videos: Iterable[PSListEntry]) -> AsyncIterator[PSListEntry]:
+    for video in videos:
+        yield video
+
+
+def _echo_video(video: PSListEntry, detail: bool = False) -> None:
+    if detail:
+        lines = [
+            f"{video.get_fid()}:",
+            f"  {video.title_all}",
+        ]
+        if video.num_parts is not None:
+            lines.append(f"  Parts: {video.num_parts}")
+        lines.extend(
+            [
+                f"  Actresses: {', '.join(a for a in video.acters)}",
+                f"  Genres: {', '.join(c for c in video.categories)}",
+                f"  Release date: {video.release_date:%x %X} JST",
+                f"  Duration: {video.duration}",
+            ]
+        )
+        click.echo(os.linesep.join(lines))
+    else:
+        click.echo(f"{video.get_fid()}: {video.title}")
+
+
+@cli.command()
+@click.option(
+    "-a", "--actress", "actresses", multiple=True, help="Actress (repeatable)."
+)
+@click.option("-g", "--genre", "genres", multiple=True, help="Genre tag (repeatable).")
+@click.option("-t", "--title", default=None, help="Title substring.")
+@click.option(
+    "--after",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Released on or after this date.",
+)
+@click.option(
+    "--before",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Released on or before this date.",
+)
+@click.option(
+    "--min-duration",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Minimum duration in minutes.",
+)
+@click.option(
+    "--max-duration",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Maximum duration in minutes.",
+)
+@click.option(
+    "--goods/--no-goods", default=None, help="Only videos with/without goods support."
+)
+@click.option("--ai/--no-ai", default=None, help="Only AI/non-AI generated videos.")
+@click.option("--parts", type=click.IntRange(min=1), default=None, help="Part count.")
+@click.option(
+    "--vr/--tv", default=None, help="Only search VR or AfestaTV/2D videos."
+)
+@click.option(
+    "-l",
+    "--lang",
+    type=click.Choice(["jp", "en"], case_sensitive=False),
+    default="JP",
+)
+@click.option("-d", "--detail", is_flag=True, help="List detailed video information.")
+@click.option(
+    "--refresh",
+    "cache_mode",
+    flag_value=CacheMode.REFRESH.value,
+    default=None,
+    help="Re-fetch the full video listing before searching.",
+)
+@click.option(
+    "--update",
+    "cache_mode",
+    flag_value=CacheMode.DEFAULT.value,
+    help="Fetch new entries for the cached video listing.",
+)
+def search(
+    actresses: Sequence[str],
+    genres: Sequence[str],
+    title: str | None,
+    after: datetime | None,
+    before: datetime | None,
+    min_duration: int | None,
+    max_duration: int | None,
+    goods: bool | None,
+    ai: bool | None,
+    parts: int | None,
+    vr: bool | None,
+    lang: Literal["JP", "EN"],
+    detail: bool,
+    cache_mode: str | None,
+) -> int:  # noqa: DAR101
+    """Search the cached video listing.
+
+    Searches are made against the locally cached listing (see 'afesta list')
+    without making any network requests unless --refresh or --update is
+    specified. Results can be piped into 'afesta dl -'.
+    """
+    try:
+        creds = _load_credentials()
+    except NoCredentialsError:
+        click.echo("No credentials found. Did you forget to run 'afesta login'?")
+    query = SearchQuery(
+        actresses=actresses,
+        genres=genres,
+        title=title,
+        released_after=after.date() if after else None,
+        released_before=before.date() if before else None,
+        min_duration=min_duration * 60 if min_duration is not None else None,
+        max_duration=max_duration * 60 if max_duration is not None else None,
+        signal=goods,
+        ai3d=ai,
+        parts=parts,
+    )
+    try:
+        asyncio.run(
+            _search(
+                creds,
+                query,
+                vr,
+                detail,
+                cast(Literal["JP", "EN"], lang.upper()),
+                cache_mode=cache_mode or CacheMode.OFFLINE.value,
+            )
+        )
+    except CacheError:
+        click.echo(
+            "No cached video listing, run with --refresh to fetch it.", err=True
+        )
+        return 1
+    except AfestaError as exc:  # pragma: no cover
+        click.echo(f"Search failed: {exc}", err=True)
+        return 1
+    return 0
+
+
+async def _search(
+    creds: BaseCredentials,
+    query: SearchQuery,
+    vr: bool | None,
+    detail: bool,
+    lang: Literal["JP", "EN"],
+    cache_mode: str | None = None,
 ) -> None:
-    async with FourDClient(creds) as client:
-        async with aclosing(client.get_videos(vr=not tv, lang=lang)) as results:  # type: ignore[type-var]
-            async for video in results:
-                if detail:
-                    lines = [
-                        f"{video.get_fid()}:",
-                        f"  {video.title_all}",
-                    ]
-                    if video.num_parts is not None:
-                        lines.append(f"  Parts: {video.num_parts}")
-                    lines.extend(
-                        [
-                            f"  Actresses: {', '.join(a for a in video.acters)}",
-                            f"  Genres: {', '.join(c for c in video.categories)}",
-                            f"  Release date: {video.release_date:%x %X} JST",
-                            f"  Duration: {video.duration}",
-                        ]
-                    )
-                    click.echo(os.linesep.join(lines))
-                else:
-                    click.echo(f"{video.get_fid()}: {video.title}")
+    async with _new_client(creds, cache_mode=cache_mode) as client:
+        index = await CatalogIndex.from_client(client, lang=lang, vr=vr)
+    for video in index.search(query):
+        _echo_video(video, detail)
 
 
 @cli.command()
@@ -360,13 +869,18 @@ def concat(
     Video and/or VCZ files for all parts of the video must be present in the same
     directory as <filename>.
     """
-    for path in filename:
-        try:
-            asyncio.run(
-                _concat_one(path, force, dry_run, script, video, fmt, output_dir)
-            )
-        except (AfestaError, OSError) as exc:
-            click.echo(str(exc), err=True)
+    from .vcs import ARCHIVE_CACHE
+
+    try:
+        for path in filename:
+            try:
+                asyncio.run(
+                    _concat_one(path, force, dry_run, script, video, fmt, output_dir)
+                )
+            except (AfestaError, OSError) as exc:
+                click.echo(str(exc), err=True)
+    finally:
+        asyncio.run(ARCHIVE_CACHE.close())
     return 0
 
 
@@ -382,7 +896,7 @@ async def _concat_one(
     from .utils import ffmpeg_concat, script_concat
     from .vcs import VCZArchive
 
-    async with VCZArchive(filename) as vcz:
+    async with await VCZArchive.open(filename, cached=True, mmap=True) as vcz:
         chapters = await vcz.chapter_control()
         if not chapters:
             click.echo(f"{filename} is not a multipart VCZ")
@@ -408,6 +922,8 @@ async def _concat_one(
                     dry_run=dry_run,
                     force=force,
                     output_dir=output_dir,
+                    cached=True,
+                    mmap=True,
                 )
                 click.echo("Concatenated scripts")
             except (AfestaError, FileExistsError, ValueError) as e:
@@ -436,7 +952,7 @@ def ffmeta(
 async def _ffmeta_one(filename: Path, force: bool) -> None:
     from .vcs import VCZArchive
 
-    async with VCZArchive(filename) as vcz:
+    async with await VCZArchive.open(filename, mmap=True) as vcz:
         chapters = await vcz.chapter_control()
         if not chapters:
             return
@@ -447,5 +963,150 @@ async def _ffmeta_one(filename: Path, force: bool) -> None:
             click.echo(f"Dumped ffmpeg metadata to {output}")
 
 
+@cli.command()
+@click.option("-q", "--quality", type=click.Choice(["h264", "h265"]), default=None)
+@click.option(
+    "-l",
+    "--lang",
+    type=click.Choice(["jp", "en"], case_sensitive=False),
+    default="jp",
+)
+@click.option(
+    "--vcz/--no-vcz",
+    default=True,
+    show_default=True,
+    help="Sync vcz files for videos which support linked goods.",
+)
+@click.option(
+    "-n",
+    "--dry-run",
+    is_flag=True,
+    help="List missing files without downloading them.",
+)
+@_transfer_options
+@_cache_options
+@click.argument(
+    "directory",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=".",
+)
+def sync(
+    directory: Path,
+    quality: str | None,
+    lang: Literal["jp", "en"],
+    vcz: bool,
+    dry_run: bool,
+    cache_mode: str | None,
+    jobs: int | None,
+    host_jobs: int | None,
+    limit_rate: float | None,
+    file_limit_rate: float | None,
+    rate_file: Path | None,
+    min_rate: float | None,
+    stall_timeout: float | None,
+    retries: int | None,
+    adopt: bool,
+) -> int:  # noqa: DAR101
+    """Mirror the purchase library into a directory.
+
+    All downloadable VR and 2D videos (and vcz files) are compared against the
+    download manifest in DIRECTORY, and only missing files are downloaded.
+    Defaults to the current working dir. Files already in DIRECTORY which are
+    not in the manifest are hashed into it instead of being downloaded again
+    when their size matches (see --no-adopt).
+    """
+    try:
+        creds = _load_credentials()
+    except NoCredentialsError:
+        click.echo("No credentials found. Did you forget to run 'afesta login'?")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        transfer = {
+            "jobs": jobs,
+            "host_jobs": host_jobs,
+            "limit_rate": limit_rate,
+            "file_limit_rate": file_limit_rate,
+            "rate_file": rate_file,
+            "min_rate": min_rate,
+            "stall_timeout": stall_timeout,
+            "retries": retries,
+            "adopt": adopt,
+            "cache_mode": cache_mode,
+        }
+        return asyncio.run(
+            _sync(
+                directory,
+                creds,
+                transfer,
+                quality=_QUALITIES[quality] if quality else None,
+                vcz=vcz,
+                lang=cast(Literal["JP", "EN"], lang.upper()),
+                dry_run=dry_run,
+            )
+        )
+    except (AfestaError, OSError) as exc:  # pragma: no cover
+        click.echo(f"Sync failed: {exc}", err=True)
+        return 1
+
+
+async def _sync(
+    directory: Path,
+    creds: BaseCredentials,
+    transfer: dict[str, Any] | None = None,
+    dry_run: bool = False,
+    **kwargs: Any,
+) -> int:
+    async with _transfer_client(creds, **(transfer or {})) as client:
+        library = LibrarySync(client, directory, **kwargs)
+        items = await library.plan()
+        if dry_run or not items:
+            for item in items:
+                click.echo(f"Missing {item}")
+            click.echo(f"{len(items)} file(s) to download")
+            return 0
+        result = await library.run(items, progress=_sync_progress)
+        for key, exc in result.failed.items():
+            click.echo(f"Failed to download {key}: {exc}", err=True)
+        click.echo(f"Downloaded {len(result.succeeded)}/{len(items)} file(s)")
+        return 0 if result.ok else 1
+
+
+def _sync_progress(item: SyncItem) -> AbstractContextManager[ProgressCallback]:
+    return _lazy_progress()
+
+
+@cli.command()
+@click.argument(
+    "directory",
+    nargs=-1,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of files to hash at once.",
+)
+def verify(directory: Sequence[Path], jobs: int) -> int:  # noqa: DAR101
+    """Verify downloaded files against their download manifest.
+
+    Files are re-hashed and compared against the checksums recorded when they
+    were downloaded. Defaults to the current working dir.
+    """
+    failed = 0
+    for path in directory or [Path.cwd()]:
+        manifest = Manifest.load(path)
+        for entry, status in asyncio.run(manifest.verify(max_workers=jobs)):
+            click.echo(f"{status.value}: {path / entry.filename}")
+            if status != VerifyStatus.OK:
+                failed += 1
+    if failed:
+        click.echo(f"{failed} file(s) failed verification", err=True)
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
     cli(prog_name="afesta")  # pragma: no cover
@@ -11,6 +11,7 @@ from .lpeg.credentials import BaseCredentials
 
 APP_NAME = "afesta-tools"
 CREDENTIALS_FILE = "credentials.json"
+CACHE_FILE = "metadata.sqlite3"
 
 
 def dump_credentials(creds: BaseCredentials) -> None:
@@ -39,3 +40,8 @@ def load_credentials() -> BaseCredentials:
             return BaseCredentials(**json.load(f))
     except (OSError, json.JSONDecodeError) as exc:
         raise NoCredentialsError("Failed to load default credentials.") from exc
+
+
+def default_cache_path() -> str:
+    """Return the default metadata cache path."""
+    return os.path.join(platformdirs.user_cache_dir(APP_NAME), CACHE_FILE)
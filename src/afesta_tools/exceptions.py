@@ -1,4 +1,9 @@
 """Afesta Tools exceptions."""
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from .lpeg.download import DownloadResult
 
 
 class AfestaError(Exception):
@@ -15,3 +20,25 @@ class AuthenticationError(AfestaError):
 
 class BadFIDError(AfestaError):
     """Invalid FID."""
+
+
+class CacheError(AfestaError):
+    """Metadata cache error."""
+
+
+class StallError(AfestaError):
+    """Transfer throughput fell below the minimum rate."""
+
+
+class DownloadError(AfestaError):
+    """One or more file downloads failed."""
+
+    def __init__(self, msg: str, result: "DownloadResult") -> None:
+        """Construct a download error.
+
+        Arguments:
+            msg: Error message.
+            result: Per-file download results.
+        """
+        super().__init__(msg)
+        self.result = result
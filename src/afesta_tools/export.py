@@ -0,0 +1,150 @@
+"""Video listing export module."""
+import asyncio
+import csv
+import enum
+import json
+from collections.abc import AsyncIterable
+from collections.abc import Callable
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from typing import TextIO
+
+from .lpeg.client import PSListEntry
+
+
+class ExportFormat(enum.Enum):
+    """Listing export format."""
+
+    JSONL = "jsonl"
+    CSV = "csv"
+    TSV = "tsv"
+
+
+FIELDS: dict[str, Callable[[PSListEntry], Any]] = {
+    "fid": lambda entry: entry.get_fid(),
+    "code": lambda entry: entry.code,
+    "title": lambda entry: entry.title,
+    "title_all": lambda entry: entry.title_all,
+    "title_clean": lambda entry: entry.title_clean,
+    "acters": lambda entry: entry.acters,
+    "categories": lambda entry: entry.categories,
+    "release_date": lambda entry: entry.release_date,
+    "time": lambda entry: entry.time,
+    "num_parts": lambda entry: entry.num_parts,
+    "quality": lambda entry: entry.quality,
+    "dl": lambda entry: entry.dl,
+    "favorite": lambda entry: entry.favorite,
+    "signal": lambda entry: entry.signal,
+    "ai3d": lambda entry: entry.ai3d,
+    "item_id": lambda entry: entry.item_id,
+    "file_name": lambda entry: entry.file_name,
+    "img": lambda entry: entry.img,
+    "big_img": lambda entry: entry.big_img,
+    "comment": lambda entry: entry.comment,
+}
+
+DEFAULT_FIELDS = ("fid", "code", "title", "release_date", "time", "num_parts")
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, tuple):
+        # LPEG returns an empty string for unset actresses/genres
+        return [v for v in value if v]
+    return value
+
+
+def _text_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, tuple):
+        return ", ".join(v for v in value if v)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+class _Writer:
+    def __init__(
+        self, stream: TextIO, fmt: ExportFormat, fields: Sequence[str]
+    ) -> None:
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+        self._getters = [FIELDS[name] for name in fields]
+        if fmt == ExportFormat.JSONL:
+            self._csv = None
+        else:
+            self._csv = csv.writer(
+                stream,
+                dialect="excel-tab" if fmt == ExportFormat.TSV else "excel",
+                lineterminator="\n",
+            )
+            self._csv.writerow(fields)
+
+    def write(self, entry: PSListEntry) -> None:
+        values = [getter(entry) for getter in self._getters]
+        if self._csv is None:
+            record = {
+                name: _json_value(value) for name, value in zip(self.fields, values)
+            }
+            self.stream.write(json.dumps(record, ensure_ascii=False))
+            self.stream.write("\n")
+        else:
+            self._csv.writerow([_text_value(value) for value in values])
+
+
+async def export_entries(
+    entries: AsyncIterable[PSListEntry],
+    stream: TextIO,
+    fmt: ExportFormat = ExportFormat.JSONL,
+    fields: Sequence[str] | None = None,
+) -> int:
+    """Write entries to a stream as they are received.
+
+    Entries are written one record per line (after a header row for CSV and
+    TSV) without being collected in memory. The stream is flushed whenever
+    `entries` has to wait for more data (i.e. after each ps_get_list page)
+    and on completion.
+
+    Arguments:
+        entries: Entries to export.
+        stream: Output text stream.
+        fmt: Output format.
+        fields: Fields to export, in order. Defaults to `DEFAULT_FIELDS`.
+
+    Returns:
+        Number of exported entries.
+
+    Raises:
+        ValueError: Unknown field name.
+    """
+    fields = DEFAULT_FIELDS if fields is None else tuple(fields)
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown export field(s): {', '.join(unknown)}")
+    writer = _Writer(stream, fmt, fields)
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Handle | None = None
+
+    def _flush() -> None:
+        nonlocal pending
+        pending = None
+        stream.flush()
+
+    count = 0
+    try:
+        async for entry in entries:
+            writer.write(entry)
+            count += 1
+            # runs once control returns to the event loop, which only happens
+            # when the source blocks on I/O
+            if pending is None:
+                pending = loop.call_soon(_flush)
+    finally:
+        if pending is not None:
+            pending.cancel()
+        stream.flush()
+    return count
@@ -0,0 +1,333 @@
+"""Persistent ps_get_list metadata cache module."""
+import enum
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import aclosing
+from contextlib import closing
+from dataclasses import fields
+from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Literal
+
+from ..exceptions import CacheError
+from ..types import PathLike
+from ..utils import to_thread
+
+
+if TYPE_CHECKING:
+    from .client import BaseLpegClient
+    from .client import PSListEntry
+    from .client import PSListType
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    uid TEXT NOT NULL,
+    typ INTEGER NOT NULL,
+    lang TEXT NOT NULL,
+    vr INTEGER NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (uid, typ, lang, vr)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    uid TEXT NOT NULL,
+    typ INTEGER NOT NULL,
+    lang TEXT NOT NULL,
+    vr INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (uid, typ, lang, vr, seq)
+);
+"""
+
+
+class CacheMode(enum.Enum):
+    """Metadata cache mode.
+
+    Attributes:
+        DEFAULT: Refresh cached listings incrementally (only new entries
+            are fetched).
+        REFRESH: Always re-fetch the full listing.
+        OFFLINE: Only use cached listings, regardless of age.
+    """
+
+    DEFAULT = "default"
+    REFRESH = "refresh"
+    OFFLINE = "offline"
+
+
+def _dump_entry(entry: "PSListEntry") -> str:
+    d = {f.name: getattr(entry, f.name) for f in fields(entry) if f.init}
+    d["release_date"] = entry.release_date.isoformat()
+    return json.dumps(d, ensure_ascii=False)
+
+
+def _load_entry(data: str) -> "PSListEntry":
+    from .client import PSListEntry
+
+    d: dict[str, Any] = json.loads(data)
+    d["acters"] = tuple(sys.intern(v) for v in d["acters"])
+    d["categories"] = tuple(sys.intern(v) for v in d["categories"])
+    d["release_date"] = datetime.fromisoformat(d["release_date"])
+    return PSListEntry(**d)
+
+
+def _entry_key(entry: "PSListEntry") -> tuple[str | None, str]:
+    return entry.code, entry.file_name
+
+
+class MetadataCache:
+    """SQLite backed cache of ps_get_list results.
+
+    Listings are keyed by user, list type, language and VR/2D. Cached
+    listings are refreshed incrementally: new entries are fetched from the
+    start of the listing until an already cached entry is reached, which
+    usually costs a single page request.
+
+    Incremental refreshes assume that ps_get_list is ordered newest purchase
+    first and that existing entries do not change. Cached entries are never
+    updated or pruned by an incremental refresh, instead the full listing is
+    re-fetched whenever the server side count no longer matches the cached
+    listing (i.e. after a video was removed from the library).
+    """
+
+    TTL = 0
+
+    def __init__(self, path: PathLike, ttl: float | None = None) -> None:
+        """Construct a cache.
+
+        Arguments:
+            path: SQLite database path. Parent directories are created as
+                needed.
+            ttl: Time in seconds a cached listing is used as-is without
+                contacting the server. Defaults to `TTL` (always refresh
+                incrementally).
+        """
+        self.path = path
+        self.ttl = self.TTL if ttl is None else ttl
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def load(
+        self, uid: str, typ: "PSListType", lang: str, vr: bool
+    ) -> tuple[list["PSListEntry"], float] | None:
+        """Return a cached listing.
+
+        Arguments:
+            uid: User ID.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+
+        Returns:
+            Tuple of (entries, last update timestamp) or None if the listing
+            is not cached or was cached in an incompatible format.
+        """
+        key = (uid, typ.value, lang, int(vr))
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT updated FROM listings"
+                " WHERE uid = ? AND typ = ? AND lang = ? AND vr = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM entries"
+                " WHERE uid = ? AND typ = ? AND lang = ? AND vr = ? ORDER BY seq",
+                key,
+            ).fetchall()
+        try:
+            return [_load_entry(data) for (data,) in rows], row[0]
+        except (KeyError, TypeError, ValueError):
+            # incompatible entry format, re-fetch the listing
+            return None
+
+    def store(
+        self,
+        uid: str,
+        typ: "PSListType",
+        lang: str,
+        vr: bool,
+        entries: list["PSListEntry"],
+    ) -> None:
+        """Replace a cached listing.
+
+        Arguments:
+            uid: User ID.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+            entries: Listing entries in listing order.
+        """
+        key = (uid, typ.value, lang, int(vr))
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM entries WHERE uid = ? AND typ = ? AND lang = ? AND vr = ?",
+                key,
+            )
+            conn.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (*key, seq, _dump_entry(entry))
+                    for seq, entry in enumerate(entries)
+                ),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?)",
+                (*key, time.time()),
+            )
+
+    def touch(self, uid: str, typ: "PSListType", lang: str, vr: bool) -> None:
+        """Mark a cached listing as up to date.
+
+        Arguments:
+            uid: User ID.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE listings SET updated = ?"
+                " WHERE uid = ? AND typ = ? AND lang = ? AND vr = ?",
+                (time.time(), uid, typ.value, lang, int(vr)),
+            )
+
+    def clear(self) -> None:
+        """Remove all cached listings."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM listings")
+
+    async def get_videos(
+        self,
+        client: "BaseLpegClient",
+        typ: "PSListType",
+        lang: Literal["EN", "JP"] = "JP",
+        vr: bool = True,
+        mode: CacheMode = CacheMode.DEFAULT,
+    ) -> list["PSListEntry"]:
+        """Return a listing, fetching it from `client` as needed.
+
+        Arguments:
+            client: Authenticated LPEG client.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+            mode: Cache mode.
+
+        Returns:
+            Listing entries.
+
+        Raises:
+            CacheError: No cached listing is available in offline mode.
+        """
+        assert client.creds is not None
+        uid = client.creds.uid
+        cached = (
+            None
+            if mode == CacheMode.REFRESH
+            else await to_thread(self.load, uid, typ, lang, vr)
+        )
+        if mode == CacheMode.OFFLINE:
+            if cached is None:
+                raise CacheError("No cached video listing available offline.")
+            return cached[0]
+        if cached is not None:
+            entries, updated = cached
+            if time.time() - updated < self.ttl:
+                return entries
+            new, count = await self._fetch(client, typ, lang, vr, entries)
+            if count is None or count == len(new) + len(entries):
+                if new:
+                    entries = new + entries
+                    await to_thread(self.store, uid, typ, lang, vr, entries)
+                else:
+                    await to_thread(self.touch, uid, typ, lang, vr)
+                return entries
+            # entries were removed or the listing was reordered, re-fetch it
+        entries, _ = await self._fetch(client, typ, lang, vr)
+        await to_thread(self.store, uid, typ, lang, vr, entries)
+        return entries
+
+    @classmethod
+    async def _fetch(
+        cls,
+        client: "BaseLpegClient",
+        typ: "PSListType",
+        lang: Literal["EN", "JP"],
+        vr: bool,
+        cached: list["PSListEntry"] | None = None,
+    ) -> tuple[list["PSListEntry"], int | None]:
+        """Fetch listing entries which precede the first cached entry.
+
+        When there are cached entries, a single `LIST_PAGE_SIZE` page is
+        checked first, since an incremental refresh usually only finds a few
+        new entries. The listing is only fetched in full pages when the small
+        page does not reach a cached entry.
+
+        Arguments:
+            client: Authenticated LPEG client.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+            cached: Cached entries. Defaults to fetching the full listing.
+
+        Returns:
+            Tuple of (new entries, server side listing count).
+        """
+        known = {_entry_key(entry) for entry in cached or []}
+        if known:
+            new, count, done = await cls._fetch_new(
+                client, typ, lang, vr, known, limit=client.LIST_PAGE_SIZE
+            )
+            if done:
+                return new, count
+        new, count, _ = await cls._fetch_new(client, typ, lang, vr, known)
+        return new, count
+
+    @staticmethod
+    async def _fetch_new(
+        client: "BaseLpegClient",
+        typ: "PSListType",
+        lang: Literal["EN", "JP"],
+        vr: bool,
+        known: set[tuple[str | None, str]],
+        limit: int | None = None,
+    ) -> tuple[list["PSListEntry"], int | None, bool]:
+        """Fetch up to `limit` listing entries which are not `known`.
+
+        Arguments:
+            client: Authenticated LPEG client.
+            typ: List type.
+            lang: Metadata language.
+            vr: True for VR listing, False for 2D.
+            known: Keys of cached entries (see `_entry_key`).
+            limit: Maximum number of entries to fetch. Defaults to the full
+                listing.
+
+        Returns:
+            Tuple of (new entries, server side listing count, True if a known
+            entry or the end of the listing was reached).
+        """
+        counts: list[int] = []
+        new: list["PSListEntry"] = []
+        videos = client.get_videos(
+            typ=typ, lang=lang, vr=vr, limit=limit, on_count=counts.append
+        )
+        async with aclosing(videos) as it:  # type: ignore[type-var]
+            async for entry in it:
+                if _entry_key(entry) in known:
+                    return new, counts[0] if counts else None, True
+                new.append(entry)
+        count = counts[0] if counts else None
+        return new, count, limit is None or len(new) < limit
@@ -2,13 +2,17 @@
 import asyncio
 import enum
 import html
-import json
+import math
 import os
 import re
+import sys
+import time
 import unicodedata
 from abc import abstractmethod
+from collections import deque
 from contextlib import AsyncExitStack
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -19,9 +23,11 @@ from collections.abc import AsyncIterator
 from collections.abc import Awaitable
 from collections.abc import Callable
 from collections.abc import Iterable
+from collections.abc import Mapping
 from typing import cast
 from typing import Literal
 from typing import Optional
+from urllib.parse import urlsplit
 
 import aiohttp
 from funcy import wraps
@@ -29,10 +35,31 @@ from funcy import wraps
 from ..exceptions import AfestaError
 from ..exceptions import AuthenticationError
 from ..exceptions import BadFIDError
+from ..exceptions import DownloadError
+from ..exceptions import StallError
+from ..manifest import ManifestEntry
+from ..manifest import ManifestStore
+from ..manifest import hash_file
 from ..progress import ProgressCallback
 from ..types import PathLike
+from ..utils import to_thread
+from . import decode
+from .cache import CacheMode
+from .cache import MetadataCache
 from .credentials import BaseCredentials
 from .credentials import FourDCredentials
+from .download import ByteRange
+from .download import DownloadJournal
+from .download import DownloadResult
+from .download import PartFile
+from .download import split_ranges
+from .ratelimit import RateLimiter
+from .resolver import FIDResolver
+from .resolver import ResolvedFID
+from .retry import RetryPolicy
+from .retry import retry
+from .scheduler import DownloadScheduler
+from .singleflight import SingleFlight
 
 
 AP_STATUS_CHK_URL = "https://www.lpeg.jp/manage/ap_status_chk.php"
@@ -77,16 +104,37 @@ _CLEAN_TITLE_RE = re.compile(r"^(?:(?:【.*】)|(?:\[?.*\]))*\s*(?P<title>.*)$")
 _FID_RE = re.compile(r"^(?P<full>(?P<fid>.*?)(?:(?P<set_suffix>\-(?:R|Part))\d+)?)_st$")
 
 
-@dataclass(frozen=True)
+_AUTH_ERRORS = (401, 403)
+_JST = timezone(timedelta(hours=9), name="JST")
+_UNSET: Any = object()
+
+
+def _split_interned(value: str) -> tuple[str, ...]:
+    return tuple(sys.intern(v.strip()) for v in value.split(","))
+
+
+@dataclass(frozen=True, slots=True, init=False)
 class PSListEntry:
     """PS Video list entry.
 
+    Entries are slotted and repeated strings (actresses, genres) are interned
+    so that whole libraries can be kept in memory. The description is only
+    decoded and derived values (FID, clean title) are only computed on first
+    access.
+
+    Note:
+        The description is stored raw as `comment_html` and decoded on access
+        (`comment`). For compatibility with previous versions, the constructor
+        also accepts a decoded description as `comment`, and any iterable for
+        `acters` and `categories` (stored as tuples). Fields after `code`
+        must be passed by keyword, except for `comment_html`.
+
     Attributes:
         acters: Actresses.
         big_img: Main cover image URL.
         categories: Genre tags.
         code: Purchase code. Only applicable when `dl` is True.
-        comment: Video description.
+        comment_html: Raw (HTML escaped) video description.
         dl: True if video can be downloaded.
         favorite: True if video is favorited.
         file_name: Streaming playlist filename.
@@ -105,11 +153,11 @@ class PSListEntry:
         ai3d: Video is AI generated.
     """
 
-    acters: list[str]
+    acters: tuple[str, ...]
     big_img: str
-    categories: list[str]
+    categories: tuple[str, ...]
     code: str | None
-    comment: str
+    comment_html: str
     dl: bool
     favorite: bool
     file_name: str
@@ -125,33 +173,140 @@ class PSListEntry:
     title_all: str
     item_id: str
     ai3d: int
+    _comment: str = field(default=_UNSET, init=False, repr=False, compare=False)
+    _title_clean: str = field(default=_UNSET, init=False, repr=False, compare=False)
+    _fid_parts: tuple[str, str, str | None] | None = field(
+        default=_UNSET, init=False, repr=False, compare=False
+    )
+
+    def __init__(
+        self,
+        acters: Iterable[str],
+        big_img: str,
+        categories: Iterable[str],
+        code: str | None,
+        comment_html: str | None = None,
+        *,
+        dl: bool,
+        favorite: bool,
+        file_name: str,
+        id: int,
+        img: str,
+        maker: str,
+        quality: str,
+        release_date: datetime,
+        set_num: int | None,
+        signal: bool,
+        time: int,
+        title: str,
+        title_all: str,
+        item_id: str,
+        ai3d: int,
+        comment: str | None = None,
+    ) -> None:
+        """Construct an entry.
+
+        Arguments:
+            acters: Actresses.
+            big_img: Main cover image URL.
+            categories: Genre tags.
+            code: Purchase code.
+            comment_html: Raw (HTML escaped) video description.
+            dl: True if video can be downloaded.
+            favorite: True if video is favorited.
+            file_name: Streaming playlist filename.
+            id: Page entry ID.
+            img: First preview/gallery image URL.
+            maker: Video maker.
+            quality: Quality abbreviation.
+            release_date: Release timestamp.
+            set_num: 0-indexed number of parts for this video set.
+            signal: True if video supports linked goods.
+            time: Total video duration in seconds.
+            title: Abbreviated video title.
+            title_all: Full video title.
+            item_id: Item ID.
+            ai3d: Video is AI generated.
+            comment: Decoded video description, used when `comment_html` is
+                not given (deprecated).
+
+        Raises:
+            TypeError: Neither `comment_html` nor `comment` was given.
+        """
+        decoded = _UNSET
+        if comment_html is None:
+            if comment is None:
+                raise TypeError("Missing required argument: 'comment_html'")
+            comment_html = html.escape(comment, quote=False).replace("\n", "<BR>")
+            decoded = comment
+        values = {
+            "acters": tuple(acters),
+            "big_img": big_img,
+            "categories": tuple(categories),
+            "code": code,
+            "comment_html": comment_html,
+            "dl": dl,
+            "favorite": favorite,
+            "file_name": file_name,
+            "id": id,
+            "img": img,
+            "maker": maker,
+            "quality": quality,
+            "release_date": release_date,
+            "set_num": set_num,
+            "signal": signal,
+            "time": time,
+            "title": title,
+            "title_all": title_all,
+            "item_id": item_id,
+            "ai3d": ai3d,
+            "_comment": decoded,
+            "_title_clean": _UNSET,
+            "_fid_parts": _UNSET,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
 
     @classmethod
-    def from_dict(cls, d: dict[str, Any]) -> "PSListEntry":
+    def from_dict(cls, d: Mapping[str, Any]) -> "PSListEntry":
         """Return an entry from an LPEG API JSON dict."""
-        acters = [actor.strip() for actor in d.pop("acters").split(",")]
-        categories = [cat.strip() for cat in d.pop("categories").split(",")]
-        comment = html.unescape(d.pop("comment")).replace("<BR>", "\n")
-        dl = d.pop("dl") != 0
-        favorite = d.pop("favorite") != 0
-        release_date = datetime.fromisoformat(d.pop("release_date")).replace(
-            tzinfo=timezone(timedelta(hours=9), name="JST")
-        )
-        n = d.pop("set_num")
-        set_num = int(n) if n != "0" else None
-        signal = d.pop("signal") != 0
+        set_num = d["set_num"]
         return cls(
-            acters=acters,
-            categories=categories,
-            comment=comment,
-            dl=dl,
-            favorite=favorite,
-            release_date=release_date,
-            set_num=set_num,
-            signal=signal,
-            **d,
+            acters=_split_interned(d["acters"]),
+            big_img=d["big_img"],
+            categories=_split_interned(d["categories"]),
+            code=d["code"],
+            comment_html=d["comment"],
+            dl=d["dl"] != 0,
+            favorite=d["favorite"] != 0,
+            file_name=d["file_name"],
+            id=d["id"],
+            img=d["img"],
+            maker=sys.intern(d["maker"]),
+            quality=sys.intern(d["quality"]),
+            release_date=datetime.fromisoformat(d["release_date"]).replace(
+                tzinfo=_JST
+            ),
+            set_num=int(set_num) if set_num != "0" else None,
+            signal=d["signal"] != 0,
+            time=d["time"],
+            title=d["title"],
+            title_all=d["title_all"],
+            item_id=d["item_id"],
+            ai3d=d["ai3d"],
         )
 
+    @property
+    def comment(self) -> str:
+        """Return video description."""
+        if self._comment is _UNSET:
+            object.__setattr__(
+                self,
+                "_comment",
+                html.unescape(self.comment_html).replace("<BR>", "\n"),
+            )
+        return self._comment
+
     @property
     def title_clean(self) -> str:
         """Return clean title.
@@ -159,9 +314,13 @@ class PSListEntry:
         Any quality prefix blocks (i.e. 【4K匠】) will be stripped and unicode
         characters will be normalized in the NFKC form.
         """
-        m = _CLEAN_TITLE_RE.match(self.title_all)
-        title = m.group("title") if m else self.title_all
-        return unicodedata.normalize("NFKC", title)
+        if self._title_clean is _UNSET:
+            m = _CLEAN_TITLE_RE.match(self.title_all)
+            title = m.group("title") if m else self.title_all
+            object.__setattr__(
+                self, "_title_clean", unicodedata.normalize("NFKC", title)
+            )
+        return self._title_clean
 
     def get_fid(self, part: int | None = None) -> str:
         """Return Afesta FID.
@@ -178,17 +337,51 @@ class PSListEntry:
         if part is not None:
             if part < 1 or (self.num_parts is not None and part > self.num_parts):
                 raise ValueError("Invalid part number")
-        stem, _ = os.path.splitext(self.file_name)
-        m = _FID_RE.match(stem)
-        if m:
-            if self.num_parts is None:
-                return m.group("full")
-            fid = m.group("fid")
-            if part is None:
-                return fid
-            set_suffix = m.group("set_suffix")
-            return f"{fid}{set_suffix}{part}"
-        return stem
+        if self._fid_parts is _UNSET:
+            stem, _ = os.path.splitext(self.file_name)
+            m = _FID_RE.match(stem)
+            object.__setattr__(
+                self,
+                "_fid_parts",
+                (m.group("full"), m.group("fid"), m.group("set_suffix"))
+                if m
+                else None,
+            )
+        if self._fid_parts is None:
+            stem, _ = os.path.splitext(self.file_name)
+            return stem
+        full, fid, set_suffix = self._fid_parts
+        if self.num_parts is None:
+            return full
+        if part is None:
+            return fid
+        return f"{fid}{set_suffix}{part}"
+
+    def get_codes(self, parts: Iterable[int] | None = None) -> list[str]:
+        """Return download codes for this video.
+
+        Arguments:
+            parts: Specific parts to return codes for. Defaults to all parts.
+                Invalid part numbers are ignored.
+
+        Returns:
+            Purchase codes, one per downloadable file.
+        """
+        if not self.code:
+            return []
+        if self.num_parts is None:
+            return [self.code]
+        codes = []
+        for part in parts or range(1, self.num_parts + 1):
+            # NOTE: multipart download codes are 0-indexed
+            # i.e. <code>_1 corresponds to video part <fid>-R2
+            if part > self.num_parts:
+                pass
+            elif part == 1:
+                codes.append(self.code)
+            else:
+                codes.append(f"{self.code}_{part - 1}")
+        return codes
 
     @property
     def num_parts(self) -> int | None:
@@ -203,6 +396,51 @@ class PSListEntry:
         return timedelta(seconds=self.time)
 
 
+def _effective_page_size(result: dict[str, Any], num: int) -> int | None:
+    """Return the page size used by the server for a ps_get_list page.
+
+    Arguments:
+        result: First (index 0) ps_get_list page requested with `num` entries.
+        num: Requested page size.
+
+    Returns:
+        Effective page size, or None if the page is inconsistent with any
+        page size (i.e. `num` was rejected).
+    """
+    count = result["page"]["count"]
+    pagecount = result["page"]["pagecount"]
+    n = len(result.get("data") or [])
+    if result["page"]["pageindex"] != 0 or n > num:
+        return None
+    if n < min(count, num):
+        # clamped by the server
+        num = n
+    if num <= 0:
+        return None
+    pages = max(-(-count // num), 1)
+    # pagecount may either be the number of pages or the last page index
+    return num if pagecount in (pages - 1, pages) else None
+
+
+def _page_size_confirmed(result: dict[str, Any], num: int) -> bool:
+    """Return True if a ps_get_list page confirms the effective page size.
+
+    Only a full page or a page the server clamped below both `num` and the
+    listing count shows the server's page size. A listing which fits on one
+    page says nothing about how larger listings would be paginated.
+
+    Arguments:
+        result: First (index 0) ps_get_list page requested with `num` entries.
+        num: Requested page size.
+
+    Returns:
+        True if the page size used for `result` can be reused for other
+        listings.
+    """
+    n = len(result.get("data") or [])
+    return n == num or n < result["page"]["count"]
+
+
 def require_auth(coroutine: Callable[..., Awaitable[Any]]) -> Any:
     """Decorator for API calls which require authentication.
 
@@ -234,20 +472,99 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
     `close` will be called automatically on exit.
     """
 
-    CHUNK_SIZE = 4096
+    CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 4 * 1024 * 1024
+    MIN_SEGMENT_SIZE = 16 * 1024 * 1024
     DEFAULT_VIDEO_QUALITY = VideoQuality.PC_SBS
+    MAX_JOBS = 4
+    LIST_PAGE_SIZE = 36
+    LIST_MAX_PAGE_SIZES: tuple[int, ...] = (1000, 200)
+    LIST_WINDOW = 4
+    COALESCE_TTL = 2.0
+    STATUS_TTL = 10 * 60
+    MAX_JOBS_PER_HOST: int | None = None
+    MAX_RECONNECTS = 5
+    STALL_TIMEOUT = 60
     _CLIENT_TIMEOUT = 5 * 60
 
-    def __init__(self, creds: BaseCredentials | None = None) -> None:
+    def __init__(
+        self,
+        creds: BaseCredentials | None = None,
+        max_jobs: int | None = None,
+        max_jobs_per_host: int | None = None,
+        rate_limit: float | None = None,
+        transfer_rate_limit: float | None = None,
+        min_rate: float | None = None,
+        stall_timeout: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+        cache: MetadataCache | None = None,
+        cache_mode: CacheMode = CacheMode.DEFAULT,
+        coalesce_ttl: float | None = None,
+        status_ttl: float | None = None,
+        adopt: bool = True,
+    ) -> None:
         """Construct a new client.
 
         Arguments:
             creds: LPEG API credentials. Required to make authenticated API calls.
                 Public (unauthenticated) API calls can still be made when `creds`
                 is not set.
+            max_jobs: Maximum number of concurrent file transfers. Defaults to
+                `MAX_JOBS`.
+            max_jobs_per_host: Maximum number of concurrent file transfers per
+                API download endpoint (video and vcz downloads are counted
+                separately). The cap is keyed on the endpoint host before any
+                redirect, not on the CDN host serving the file. Defaults to
+                `MAX_JOBS_PER_HOST` (no per-endpoint limit).
+            rate_limit: Maximum total download rate in bytes per second across all
+                transfers. Can be changed later via `rate_limiter`.
+            transfer_rate_limit: Maximum download rate in bytes per second for
+                each individual file.
+            min_rate: Minimum download rate in bytes per second. Connections
+                which stay below `min_rate` for `stall_timeout` seconds are
+                dropped and the remaining data is re-requested. Defaults to no
+                stall detection.
+            stall_timeout: Stall detection period in seconds. Defaults to
+                `STALL_TIMEOUT`.
+            retry_policy: Retry policy for API requests and interrupted
+                transfers. Defaults to `RetryPolicy()`.
+            cache: Optional persistent metadata cache for video listings.
+            cache_mode: Metadata cache mode.
+            coalesce_ttl: Time in seconds that idempotent API results
+                (ap_status_chk and ps_get_list pages) are shared for. Identical
+                concurrent calls are always coalesced. Defaults to
+                `COALESCE_TTL`.
+            status_ttl: Time in seconds a successful ap_status_chk is reused
+                for before vcz downloads. Defaults to `STATUS_TTL`.
+            adopt: True if existing files which are not in the download
+                directory manifest (i.e. from downloads made before manifests
+                were recorded) should be hashed into the manifest instead of
+                being downloaded again, when their size matches the size
+                reported by the server.
         """
         super().__init__()
         self.creds = creds
+        self.scheduler = DownloadScheduler(
+            max_jobs or self.MAX_JOBS, max_jobs_per_host or self.MAX_JOBS_PER_HOST
+        )
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.transfer_rate_limit = transfer_rate_limit
+        self.min_rate = min_rate
+        self.stall_timeout = stall_timeout or self.STALL_TIMEOUT
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.cache_mode = cache_mode
+        self.manifests = ManifestStore()
+        self.adopt = adopt
+        self._list_page_size: int | None = None
+        self.singleflight: SingleFlight[dict[str, Any]] = SingleFlight(
+            self.COALESCE_TTL if coalesce_ttl is None else coalesce_ttl
+        )
+        self.status_ttl = self.STATUS_TTL if status_ttl is None else status_ttl
+        # FID resolvers for the current purchase listing snapshots, by
+        # (lang, vr)
+        self._resolvers: SingleFlight[FIDResolver] = SingleFlight(math.inf)
+        self._status_checked: float | None = None
         self._exit_stack = AsyncExitStack()
         self._session = aiohttp.ClientSession(
             headers={"User-Agent": self.user_agent},
@@ -287,16 +604,54 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
     async def _post(self, url: str, **kwargs: Any) -> aiohttp.ClientResponse:
         return await self._session.post(url, **kwargs)
 
-    @require_auth
-    async def status_chk(self) -> dict[str, Any]:
-        """Run ap_status_chk API request."""
+    @staticmethod
+    def _coalesce_key(url: str, payload: dict[str, Any]) -> tuple[Any, ...]:
+        return url, tuple(sorted(payload.items()))
+
+    async def _coalesce(
+        self, url: str, payload: dict[str, Any], func: Callable[[], Awaitable[Any]]
+    ) -> dict[str, Any]:
+        """Return `func` result, shared between identical idempotent requests."""
+        return await self.singleflight.do(self._coalesce_key(url, payload), func)
+
+    def _status_payload(self) -> dict[str, Any]:
         assert self.creds is not None
-        payload = {
+        return {
             "st": self.creds.st,
             "mid": self.creds.mid,
             "pid": self.creds.pid,
             "type": "dpvr",
         }
+
+    @require_auth
+    async def status_chk(self) -> dict[str, Any]:
+        """Run ap_status_chk API request.
+
+        Concurrent calls share one request (see `singleflight`).
+        """
+        payload = self._status_payload()
+        return await self._coalesce(
+            AP_STATUS_CHK_URL, payload, partial(self._status_chk, payload)
+        )
+
+    async def _check_status(self) -> None:
+        """Run ap_status_chk unless it succeeded within `status_ttl`."""
+        checked = self._status_checked
+        if checked is not None and time.monotonic() - checked < self.status_ttl:
+            return
+        await self.status_chk()
+        self._status_checked = time.monotonic()
+
+    def _invalidate_status(self) -> None:
+        """Force the next `_check_status` to make a new request."""
+        self._status_checked = None
+        if self.creds is not None:
+            self.singleflight.forget(
+                self._coalesce_key(AP_STATUS_CHK_URL, self._status_payload())
+            )
+
+    @retry
+    async def _status_chk(self, payload: dict[str, Any]) -> dict[str, Any]:
         resp = await self._post(AP_STATUS_CHK_URL, data=payload)
         return cast(dict[str, Any], await resp.json())
 
@@ -305,6 +660,9 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         response: aiohttp.ClientResponse,
         download_dir: PathLike | None = None,
         progress: ProgressCallback | None = None,
+        segments: int = 1,
+        key: str | None = None,
+        quality: VideoQuality | None = None,
     ) -> None:
         if response.content_disposition:
             filename: str | None = response.content_disposition.filename
@@ -314,14 +672,272 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
             raise AfestaError("Not a valid file download URL")
         if download_dir:
             filename = os.path.join(download_dir, filename)
+        length = self._decoded_length(response)
+        key = key or os.path.basename(filename)
+        quality_value = quality.value if quality else None
+        if await self._is_downloaded(download_dir, key, quality_value, size=length):
+            response.release()
+            return
+        if (
+            self.adopt
+            and length is not None
+            and await self._adopt(filename, download_dir, key, quality_value, length)
+        ):
+            response.release()
+            return
+        journal = DownloadJournal(
+            key=key,
+            quality=quality_value,
+            length=length,
+            validator=response.headers.get("ETag")
+            or response.headers.get("Last-Modified"),
+        )
+        part = PartFile(
+            filename,
+            journal,
+            resumable=response.headers.get("Accept-Ranges") == "bytes",
+            chunk_size=self.CHUNK_SIZE,
+            max_chunk_size=self.MAX_CHUNK_SIZE,
+            limiters=self._transfer_limiters(),
+            min_rate=self.min_rate,
+            stall_timeout=self.stall_timeout,
+        )
         if progress:
-            if "Content-Length" in response.headers:  # pragma: no cover
-                progress.set_total(int(response.headers["Content-Length"]))
-        with open(filename, mode="wb") as fp:
-            async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
-                fp.write(chunk)
-                if progress is not None:
-                    progress.update(len(chunk))
+            if length is not None:  # pragma: no cover
+                progress.set_total(length)
+            if part.journal.bytes_completed:
+                progress.update(part.journal.bytes_completed)
+        if length is None:
+            await part.write_stream(response.content, progress=progress)
+        else:
+            await self._download_ranges(response, part, segments, progress=progress)
+        digest = await part.commit()
+        await self.manifests.record(
+            download_dir,
+            ManifestEntry(
+                filename=os.path.basename(filename),
+                size=os.path.getsize(filename),
+                blake2b=digest,
+                code=key,
+                quality=quality_value,
+            ),
+        )
+
+    @staticmethod
+    def _decoded_length(response: aiohttp.ClientResponse) -> int | None:
+        """Return the length of the decoded response body if it is known.
+
+        aiohttp transparently decodes content-encoded (i.e. gzip) bodies, in
+        which case Content-Length is the encoded size and byte ranges do not
+        map to the decoded file, so the length is treated as unknown.
+        """
+        encoding = response.headers.get("Content-Encoding", "identity")
+        if encoding.strip().lower() not in ("", "identity"):
+            return None
+        return response.content_length
+
+    async def _is_downloaded(
+        self,
+        download_dir: PathLike | None,
+        key: str,
+        quality: str | None = None,
+        size: int | None = None,
+    ) -> bool:
+        """Return True if the manifest has an intact download for `key`."""
+        manifest = await self.manifests.get(download_dir)
+        entry = manifest.find(key, quality)
+        return entry is not None and manifest.is_present(entry, size=size)
+
+    async def _adopt(
+        self,
+        filename: str,
+        download_dir: PathLike | None,
+        key: str,
+        quality: str | None,
+        size: int,
+    ) -> bool:
+        """Record an existing complete file in the manifest.
+
+        Returns True if `filename` exists with the expected size and was
+        recorded.
+        """
+        try:
+            if os.path.getsize(filename) != size:
+                return False
+        except OSError:
+            return False
+        digest = await to_thread(hash_file, filename)
+        await self.manifests.record(
+            download_dir,
+            ManifestEntry(
+                filename=os.path.basename(filename),
+                size=size,
+                blake2b=digest,
+                code=key,
+                quality=quality,
+            ),
+        )
+        return True
+
+    def _transfer_limiters(self) -> list[RateLimiter]:
+        limiters = [self.rate_limiter]
+        if self.transfer_rate_limit:
+            limiters.append(RateLimiter(self.transfer_rate_limit))
+        return limiters
+
+    async def _download_ranges(
+        self,
+        response: aiohttp.ClientResponse,
+        part: PartFile,
+        segments: int = 1,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Download all remaining byte ranges for `part`.
+
+        When nothing has been downloaded yet, the first range is read from
+        `response` and the remaining ranges are requested in parallel from the
+        (post-redirect) response URL.
+        """
+        ranges = part.journal.remaining()
+        if len(ranges) == 1 and part.resumable:
+            r = ranges[0]
+            segments = min(segments, len(r) // self.MIN_SEGMENT_SIZE)
+            ranges = split_ranges(r.start, r.end, segments)
+        url = str(response.url)
+        if ranges and ranges[0].start == 0:
+            first, *rest = ranges
+            coros = [self._fetch_range(url, part, first, progress, response=response)]
+        else:
+            response.release()
+            rest = ranges
+            coros = []
+        coros.extend(self._fetch_range(url, part, r, progress) for r in rest)
+        try:
+            results = await asyncio.gather(*coros, return_exceptions=True)
+        finally:
+            response.release()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise AfestaError("Download failed") from result
+
+    async def _fetch_range(
+        self,
+        url: str,
+        part: PartFile,
+        byte_range: ByteRange,
+        progress: ProgressCallback | None = None,
+        response: aiohttp.ClientResponse | None = None,
+    ) -> None:
+        """Download `byte_range`, resuming after stalls and transient errors.
+
+        Stalled transfers are resumed immediately and other transient errors
+        are retried according to `retry_policy`, continuing from the last
+        written offset.
+
+        Arguments:
+            url: Download URL.
+            part: Destination part file.
+            byte_range: Range to download.
+            progress: Optional progress callback.
+            response: Existing response to read `byte_range` from. A new range
+                request will be made when not set.
+
+        Raises:
+            Exception: The transfer failed with a fatal error, stalled more than
+                `MAX_RECONNECTS` times or ran out of retry attempts.
+        """
+        stalls = attempts = 0
+        delay: float | None = None
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                await self._write_range(url, part, byte_range, progress, response)
+                return
+            except Exception as exc:
+                response = None
+                remaining = part.resume_range(byte_range)
+                if remaining is None:
+                    return
+                if isinstance(exc, StallError):
+                    stalls += 1
+                else:
+                    attempts += 1
+                delay = self._resume_delay(
+                    exc, part, remaining, stalls, attempts, progress
+                )
+                if delay is None:
+                    raise
+                byte_range = remaining
+
+    async def _write_range(
+        self,
+        url: str,
+        part: PartFile,
+        byte_range: ByteRange,
+        progress: ProgressCallback | None = None,
+        response: aiohttp.ClientResponse | None = None,
+    ) -> None:
+        if response is None:
+            response = await self._request_range(url, part, byte_range)
+        try:
+            await part.write_range(response.content, byte_range, progress=progress)
+        finally:
+            response.release()
+
+    def _resume_delay(
+        self,
+        exc: BaseException,
+        part: PartFile,
+        remaining: ByteRange,
+        stalls: int,
+        attempts: int,
+        progress: ProgressCallback | None = None,
+    ) -> float | None:
+        """Return the delay before resuming a failed transfer.
+
+        Arguments:
+            exc: Transfer error.
+            part: Destination part file.
+            remaining: Remaining range to be resumed.
+            stalls: Number of stalls so far.
+            attempts: Number of other failed attempts so far.
+            progress: Optional progress callback.
+
+        Returns:
+            Delay in seconds or None if the transfer should not be resumed.
+        """
+        if not part.resumable:
+            return None
+        if isinstance(exc, StallError):
+            if progress is not None:
+                progress.stalled(str(exc))
+            delay: float | None = 0 if stalls <= self.MAX_RECONNECTS else None
+        elif (
+            self.retry_policy.is_retryable(exc)
+            and attempts < self.retry_policy.max_attempts
+        ):
+            delay = self.retry_policy.delay(attempts)
+        else:
+            delay = None
+        if delay is not None and progress is not None:
+            progress.reconnecting(remaining.start, stalls + attempts)
+        return delay
+
+    async def _request_range(
+        self,
+        url: str,
+        part: PartFile,
+        byte_range: ByteRange,
+    ) -> aiohttp.ClientResponse:
+        headers = {"Range": byte_range.header}
+        if part.journal.validator:
+            headers["If-Range"] = part.journal.validator
+        resp = await self._get(url, headers=headers, timeout=self._dl_timeout)
+        if resp.status != 206:
+            resp.release()
+            raise AfestaError("Server did not return requested byte range")
+        return resp
 
     @require_auth
     async def download_video(  # noqa: C901
@@ -334,7 +950,10 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         vr: bool = True,
         parts: Iterable[int] | None = None,
         lang: Literal["JP", "EN"] = "JP",
-    ) -> None:
+        segments: int = 1,
+        priority: int = 0,
+        resolved: Mapping[str, ResolvedFID] | None = None,
+    ) -> DownloadResult:
         """Download a video.
 
         Arguments:
@@ -349,17 +968,30 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
             parts: Specific parts to download. Defaults to downloading all parts. Only
                 applicable when using `fid`.
             lang: Metadata language for returned videos when using `fid`.
+            segments: Maximum number of parallel connections to use for each
+                downloaded file. Segmented downloads are only used for large files
+                when the server supports byte range requests.
+            priority: Scheduler priority for this video's file transfers. Lower
+                values are started first.
+            resolved: Optional pre-resolved FIDs (i.e. from
+                `FIDResolver.resolve_all`). When `fid` is present, no listing
+                request is made.
 
         Either `code` or `fid` must be set.
 
         Note:
             Actual download quality may be worse than the requested value
-            depending on the video.
+            depending on the video. Parts which are already recorded as
+            complete in the download directory manifest are skipped.
+
+        Returns:
+            Per-part download results (by purchase code).
 
         Raises:
             ValueError: Both `code` and `fid` were not set.
             BadFIDError: The specified `fid` was invalid or ambiguous.
-            AfestaError: An unexpected error occurred while downloading.
+            DownloadError: One or more parts failed to download. Other parts
+                are still downloaded and the error includes per-part results.
         """
         if code:
             codes = [code]
@@ -367,50 +999,50 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         else:
             if not fid:
                 raise ValueError("Either code or fid must be set.")
-            videos = [
-                video async for video in self.get_videos(vr=vr, words=fid, lang=lang)
-            ]
-            if not videos:
-                raise BadFIDError(f"Could not find any video matching FID {fid}.")
-            if len(videos) > 1:
-                matches = [v.get_fid() for v in videos]
-                raise BadFIDError(
-                    f"Got multiple possible matches for FID: {', '.join(matches)}"
-                )
-            video = videos[0]
-            assert video.code
-            if video.set_num is None:
-                codes = [video.code]
-                desc_parts = ""
+            if resolved is not None and fid in resolved:
+                match = resolved[fid]
             else:
-                codes = []
-                assert video.num_parts is not None
-                for part in parts or range(1, video.num_parts + 1):
-                    # NOTE: multipart download codes are 0-indexed
-                    # i.e. <code>_1 corresponds to video part <fid>-R2
-                    if part > video.num_parts:
-                        pass
-                    elif part == 1:
-                        codes.append(video.code)
-                    else:
-                        codes.append(f"{video.code}_{part - 1}")
-                desc_parts = f" ({len(codes)} parts)"
+                match = await self._resolve_fid(fid, vr=vr, lang=lang)
+            video = match.video
+            assert video.code
+            codes = video.get_codes(parts or match.parts)
+            desc_parts = "" if video.set_num is None else f" ({len(codes)} parts)"
             desc = f"Downloading {video.get_fid()}: {video.title}{desc_parts}"
 
         if progress is not None:
             progress.set_desc(desc)
         results = await asyncio.gather(
             *(
-                self._download_code(
-                    code, download_dir=download_dir, quality=quality, progress=progress
+                self.scheduler.submit(
+                    partial(
+                        self._download_code,
+                        code,
+                        download_dir=download_dir,
+                        quality=quality,
+                        progress=progress,
+                        segments=segments,
+                    ),
+                    host=urlsplit(DL_URL).hostname,
+                    priority=priority,
                 )
                 for code in codes
             ),
             return_exceptions=True,
         )
-        for r in results:
+        result = DownloadResult()
+        for code, r in zip(codes, results):
             if isinstance(r, BaseException):
-                raise AfestaError("File download failed") from r
+                result.failed[code] = r
+            else:
+                result.succeeded.append(code)
+        if result.failed:
+            failed = ", ".join(result.failed)
+            raise DownloadError(
+                f"File download failed for {len(result.failed)}/{len(codes)}"
+                f" parts ({failed})",
+                result,
+            ) from next(iter(result.failed.values()))
+        return result
 
     async def _download_code(
         self,
@@ -418,10 +1050,22 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         download_dir: PathLike | None = None,
         quality: VideoQuality | None = None,
         progress: ProgressCallback | None = None,
+        segments: int = 1,
     ) -> None:
+        quality = quality or self.DEFAULT_VIDEO_QUALITY
+        if await self._is_downloaded(download_dir, code, quality.value):
+            return
         resp = await self._request_video(code, quality=quality)
-        await self._download(resp, download_dir=download_dir, progress=progress)
+        await self._download(
+            resp,
+            download_dir=download_dir,
+            progress=progress,
+            segments=segments,
+            key=code,
+            quality=quality,
+        )
 
+    @retry
     async def _request_video(
         self,
         code: str,
@@ -443,19 +1087,54 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         fid: str,
         download_dir: PathLike | None = None,
         progress: Optional["ProgressCallback"] = None,
+        priority: int = 0,
     ) -> None:
         """Download a vcz.
 
+        The download is skipped if the vcz is already recorded as complete in
+        the download directory manifest. A successful player status check is
+        reused for `status_ttl` seconds, so bulk downloads only make one
+        ap_status_chk request.
+
         Arguments:
             fid: Video FID.
             download_dir: Directory for downloaded files. Defaults to the
                 current working dir.
             progress: Optional progress callback.
+            priority: Scheduler priority for this transfer. Lower values are
+                started first.
         """
-        await self.status_chk()
-        resp = await self._request_vcz(fid)
-        await self._download(resp, download_dir=download_dir, progress=progress)
+        await self._check_status()
+        await self.scheduler.submit(
+            partial(
+                self._download_vcz, fid, download_dir=download_dir, progress=progress
+            ),
+            host=urlsplit(VCS_DL_URL).hostname,
+            priority=priority,
+        )
 
+    async def _download_vcz(
+        self,
+        fid: str,
+        download_dir: PathLike | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        if await self._is_downloaded(download_dir, fid):
+            return
+        try:
+            resp = await self._request_vcz(fid)
+        except aiohttp.ClientResponseError as exc:
+            if exc.status not in _AUTH_ERRORS:
+                raise
+            # the reused player status may have expired server side
+            self._invalidate_status()
+            await self._check_status()
+            resp = await self._request_vcz(fid)
+        await self._download(
+            resp, download_dir=download_dir, progress=progress, key=fid
+        )
+
+    @retry
     async def _request_vcz(self, fid: str) -> aiohttp.ClientResponse:
         assert self.creds is not None
         params = {
@@ -529,48 +1208,183 @@ class BaseLpegClient(AsyncContextManager["BaseLpegClient"]):
         vr: bool = True,
         words: str | None = None,
         limit: int | None = None,
+        on_count: Callable[[int], None] | None = None,
     ) -> AsyncIterator[PSListEntry]:
         """Iterate over videos returned by ps_get_list.
 
+        After the first page, up to `LIST_WINDOW` remaining pages are fetched
+        concurrently. Videos are still yielded in listing order.
+
         Arguments:
             typ: List type (either purchases or favorites).
             lang: Metadata language for returned videos.
             vr: True for VR listing, False for 2D.
             words: Optional search string for filtering returned videos.
             limit: Maximum number of results to yield.
+            on_count: Optional callback for the total number of listed videos
+                (as reported by the server), called once the first page has
+                been fetched.
 
         Yields:
             Video results.
         """
-        _loads = partial(
-            json.loads,
-            cls=cast(type[json.JSONDecoder], partial(json.JSONDecoder, strict=False)),
+        if limit is not None and limit <= 0:
+            return
+        fetch = partial(self._get_list_page, typ=typ, lang=lang, vr=vr, words=words)
+        result, num = await self._get_first_list_page(fetch, limit=limit)
+        fetch = partial(fetch, num=num)
+        count = result["page"]["count"]
+        if on_count is not None:
+            on_count(count)
+        limit = count if limit is None else min(count, limit)
+        last_page = min(result["page"]["pagecount"], -(-limit // num) - 1)
+        next_page = result["page"]["pageindex"] + 1
+        pending: deque[asyncio.Task[dict[str, Any]]] = deque()
+        try:
+            while True:
+                # keep up to LIST_WINDOW page requests in flight while the
+                # current page is consumed
+                while next_page <= last_page and len(pending) < self.LIST_WINDOW:
+                    pending.append(asyncio.create_task(fetch(next_page)))
+                    next_page += 1
+                page = result["page"]["pageindex"]
+                for d in result.get("data", []):
+                    entry = PSListEntry.from_dict(d)
+                    yield entry
+                    if num * page + entry.id + 1 >= limit:
+                        return
+                if not pending:
+                    return
+                result = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _get_first_list_page(
+        self,
+        fetch: Callable[..., Awaitable[dict[str, Any]]],
+        limit: int | None = None,
+    ) -> tuple[dict[str, Any], int]:
+        """Return the first ps_get_list page and the page size to use.
+
+        Requests for at most `LIST_PAGE_SIZE` results always use
+        `LIST_PAGE_SIZE`. Otherwise, unless a page size has already been
+        negotiated for this session, the first page is requested with each of
+        `LIST_MAX_PAGE_SIZES` in turn, largest first. A page size is accepted when the returned `page` block
+        is consistent with it (or with a smaller size the server clamped it
+        to), so an accepted probe costs a single round trip. Probes are not
+        retried: any error or inconsistent page falls back to the next size
+        and finally to `LIST_PAGE_SIZE`. Accepted sizes are only remembered
+        for the session once a full or clamped page confirms them.
+        """
+        if limit is not None and limit <= self.LIST_PAGE_SIZE:
+            sizes: tuple[int, ...] = (self.LIST_PAGE_SIZE,)
+        elif self._list_page_size is not None:
+            sizes = (self._list_page_size,)
+        else:
+            sizes = (*self.LIST_MAX_PAGE_SIZES, self.LIST_PAGE_SIZE)
+        for num in sizes[:-1]:
+            try:
+                result = await fetch(0, num=num, probe=True)
+                effective = _effective_page_size(result, num)
+            except (aiohttp.ClientError, KeyError, TypeError, ValueError):
+                effective = None
+            if effective is not None and effective >= self.LIST_PAGE_SIZE:
+                if _page_size_confirmed(result, num):
+                    self._list_page_size = effective
+                return result, effective
+        num = sizes[-1]
+        if len(sizes) > 1:
+            self._list_page_size = num
+        return await fetch(0, num=num), num
+
+    @require_auth
+    async def list_videos(
+        self,
+        typ: PSListType = PSListType.PURCHASES,
+        lang: Literal["EN", "JP"] = "JP",
+        vr: bool = True,
+    ) -> list[PSListEntry]:
+        """Return all videos returned by ps_get_list.
+
+        The metadata cache is used when available.
+
+        Arguments:
+            typ: List type (either purchases or favorites).
+            lang: Metadata language for returned videos.
+            vr: True for VR listing, False for 2D.
+
+        Returns:
+            Video results.
+        """
+        if self.cache is None:
+            return [
+                video async for video in self.get_videos(typ=typ, lang=lang, vr=vr)
+            ]
+        videos = await self.cache.get_videos(
+            self, typ, lang=lang, vr=vr, mode=self.cache_mode
         )
-        i = page = -1
-        num = 36
-        while limit is None or (i + 1 < limit):
-            resp = await self._request_list(
-                typ=typ,
-                lang=lang,
-                vr=vr,
-                words=words,
-                page=page + 1,
-                num=num,
+        if typ == PSListType.PURCHASES:
+            self._resolvers.forget((lang, vr))
+        return videos
+
+    async def _resolve_fid(
+        self, fid: str, vr: bool = True, lang: Literal["EN", "JP"] = "JP"
+    ) -> ResolvedFID:
+        """Return the video matching `fid`.
+
+        The FID is looked up in the metadata cache when available, otherwise a
+        ps_get_list search is made. The cached listing is loaded and indexed
+        once, and the resolver is shared by later lookups until `list_videos`
+        returns a new listing.
+        """
+        if self.cache is not None:
+            resolver = await self._resolvers.do(
+                (lang, vr), partial(self._listing_resolver, lang, vr)
+            )
+            if fid in resolver or self.cache_mode == CacheMode.OFFLINE:
+                return resolver.resolve(fid)
+        videos = [video async for video in self.get_videos(vr=vr, words=fid, lang=lang)]
+        if not videos:
+            raise BadFIDError(f"Could not find any video matching FID {fid}.")
+        if len(videos) > 1:
+            matches = [v.get_fid() for v in videos]
+            raise BadFIDError(
+                f"Got multiple possible matches for FID: {', '.join(matches)}"
             )
-            result = await resp.json(loads=_loads)
-            count = result["page"]["count"]
-            pagecount = result["page"]["pagecount"]
-            page = result["page"]["pageindex"]
-            limit = count if limit is None else min(count, limit)
-            assert limit is not None
-            for d in result.get("data", []):
-                entry = PSListEntry.from_dict(d)
-                i = num * page + entry.id
-                yield entry
-                if i + 1 >= limit:
-                    break
-            if page >= pagecount:
-                break
+        return ResolvedFID(videos[0])
+
+    async def _listing_resolver(
+        self, lang: Literal["EN", "JP"], vr: bool
+    ) -> FIDResolver:
+        return FIDResolver(await self.list_videos(lang=lang, vr=vr))
+
+    async def _get_list_page(
+        self, page: int, probe: bool = False, **kwargs: Any
+    ) -> dict[str, Any]:
+        """Return a parsed ps_get_list results page.
+
+        Identical concurrent page requests share one request. Failed requests
+        are retried according to `retry_policy` unless `probe` is set.
+        """
+        assert self.creds is not None
+        payload = {"st": self.creds.st, "page": page, **kwargs}
+        return await self._coalesce(
+            PS_GET_LIST_URL,
+            payload,
+            partial(self._fetch_list_page, page, probe=probe, **kwargs),
+        )
+
+    async def _fetch_list_page(
+        self, page: int, probe: bool = False, **kwargs: Any
+    ) -> dict[str, Any]:
+        request = partial(self._request_list, page=page, **kwargs)
+        if probe:
+            resp = await request()
+        else:
+            resp = await self.retry_policy.call(request)
+        return cast(dict[str, Any], decode.loads(await resp.read()))
 
     @require_auth
     async def _request_list(
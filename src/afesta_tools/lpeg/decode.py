@@ -0,0 +1,51 @@
+"""LPEG API JSON decoding module.
+
+`orjson` is used when it is installed (``pip install afesta-tools[fast]``).
+LPEG responses may contain raw control characters in strings, which are
+rejected by strict JSON decoders, so any payload which `orjson` cannot decode
+falls back to the (non-strict) standard library decoder.
+"""
+import json
+from typing import Any
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+_DECODER = json.JSONDecoder(strict=False)
+
+BACKEND = "json" if orjson is None else "orjson"
+
+
+def loads_stdlib(data: str | bytes) -> Any:
+    """Decode JSON allowing control characters in strings.
+
+    Arguments:
+        data: JSON document.
+
+    Returns:
+        Decoded object.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return _DECODER.decode(data)
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode an LPEG API JSON response.
+
+    Arguments:
+        data: JSON document.
+
+    Returns:
+        Decoded object.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return loads_stdlib(data)
@@ -0,0 +1,480 @@
+"""LPEG download helpers."""
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import aiohttp
+
+from ..exceptions import AfestaError
+from ..exceptions import StallError
+from ..manifest import hash_file
+from ..manifest import new_hash
+from ..progress import ProgressCallback
+from ..types import PathLike
+from ..utils import to_thread
+from .ratelimit import RateLimiter
+from .writer import AsyncFileWriter
+
+
+PART_SUFFIX = ".part"
+JOURNAL_SUFFIX = ".json"
+
+
+class ByteRange(NamedTuple):
+    """Half-open byte range ``[start, end)`` within a download."""
+
+    start: int
+    end: int
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    @property
+    def header(self) -> str:
+        """Return an HTTP Range header value for this range."""
+        return f"bytes={self.start}-{self.end - 1}"
+
+
+def split_ranges(start: int, end: int, n: int) -> list[ByteRange]:
+    """Split a byte range into (at most) `n` contiguous ranges.
+
+    Arguments:
+        start: Range start offset.
+        end: Range end offset (exclusive).
+        n: Number of ranges.
+
+    Returns:
+        List of non-empty ranges in offset order.
+    """
+    length = end - start
+    n = max(1, min(n, length))
+    size, extra = divmod(length, n)
+    ranges = []
+    offset = start
+    for i in range(n):
+        next_offset = offset + size + (1 if i < extra else 0)
+        ranges.append(ByteRange(offset, next_offset))
+        offset = next_offset
+    return ranges
+
+
+class StreamHasher:
+    """Incremental checksum over data as it is written.
+
+    Data is hashed in the same pass it is written as long as it arrives in file
+    order. Out of order data (i.e. from later segments of a segmented or
+    resumed download) is hashed from disk by `finish`, starting from the first
+    offset which could not be hashed in-stream.
+    """
+
+    def __init__(self) -> None:
+        """Construct a hasher."""
+        self.offset = 0
+        self._hash = new_hash()
+        self._lock = threading.Lock()
+
+    def update(self, offset: int, data: bytes) -> None:
+        """Hash data written at `offset` if it is contiguous with hashed data.
+
+        Arguments:
+            offset: File offset of `data`.
+            data: Written data.
+        """
+        with self._lock:
+            if offset == self.offset:
+                self._hash.update(data)
+                self.offset += len(data)
+
+    def finish(self, path: PathLike) -> str:
+        """Return the hex digest for the completed file at `path`."""
+        with self._lock:
+            return hash_file(path, self.offset, self._hash)
+
+
+class StallWatchdog:
+    """Read throughput watchdog.
+
+    Only time spent waiting on the connection is measured, so transfers which
+    are intentionally throttled by a rate limiter are not considered stalled.
+    """
+
+    def __init__(self, min_rate: float, period: float) -> None:
+        """Construct a watchdog.
+
+        Arguments:
+            min_rate: Minimum throughput in bytes per second.
+            period: Number of seconds throughput may stay below `min_rate`
+                before the transfer is considered stalled.
+        """
+        self.min_rate = min_rate
+        self.period = period
+        self._elapsed = 0.0
+        self._bytes = 0
+
+    async def read(self, content: aiohttp.StreamReader, n: int) -> bytes:
+        """Read up to `n` bytes from `content`.
+
+        Arguments:
+            content: Response content stream.
+            n: Maximum number of bytes to read.
+
+        Returns:
+            Data read from `content`.
+
+        Raises:
+            StallError: Throughput fell below `min_rate` for `period` seconds.
+        """
+        while True:
+            start = time.monotonic()
+            try:
+                chunk = await asyncio.wait_for(
+                    content.read(n), timeout=self.period - self._elapsed
+                )
+            except asyncio.TimeoutError as exc:
+                # the period ended while waiting, data received earlier in the
+                # period may still have met min_rate
+                self._elapsed = self.period
+                reason = self._end_period()
+                if reason is not None:
+                    raise StallError(reason) from exc
+                continue
+            self._elapsed += time.monotonic() - start
+            self._bytes += len(chunk)
+            if self._elapsed >= self.period:
+                reason = self._end_period()
+                if reason is not None:
+                    raise StallError(reason)
+            return chunk
+
+    def _end_period(self) -> str | None:
+        """Start a new period, returning the stall reason for the last one."""
+        if not self._bytes:
+            return f"No data received for {self.period:.0f}s"
+        rate = self._bytes / self._elapsed
+        if rate < self.min_rate:
+            return f"Transfer rate fell to {rate:.0f} B/s"
+        self._elapsed = 0.0
+        self._bytes = 0
+        return None
+
+
+async def iter_adaptive(
+    content: aiohttp.StreamReader,
+    min_size: int,
+    max_size: int,
+    limit: int | None = None,
+    watchdog: StallWatchdog | None = None,
+) -> AsyncIterator[bytes]:
+    """Iterate over a response stream in adaptively sized chunks.
+
+    The read size doubles (up to `max_size`) while each read is completely
+    filled from already buffered data, and shrinks again when reads come up
+    well short, so fast connections are consumed in a few large reads instead
+    of many small ones.
+
+    Arguments:
+        content: Response content stream.
+        min_size: Minimum (initial) read size.
+        max_size: Maximum read size.
+        limit: Maximum total number of bytes to read.
+        watchdog: Optional stall watchdog.
+
+    Yields:
+        Data chunks.
+    """
+    size = min_size
+    remaining = limit
+    while remaining is None or remaining > 0:
+        n = size if remaining is None else min(size, remaining)
+        if watchdog is None:
+            chunk = await content.read(n)
+        else:
+            chunk = await watchdog.read(content, n)
+        if not chunk:
+            return
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+        if len(chunk) >= size:
+            size = min(size * 2, max_size)
+        elif len(chunk) < size // 4:
+            size = max(size // 2, min_size)
+
+
+@dataclass
+class DownloadResult:
+    """Per-file download results.
+
+    Attributes:
+        succeeded: Download keys (purchase codes or FIDs) which completed.
+        failed: Errors for download keys which failed.
+    """
+
+    succeeded: list[str] = field(default_factory=list)
+    failed: dict[str, BaseException] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Return True if all downloads succeeded."""
+        return not self.failed
+
+
+@dataclass
+class DownloadJournal:
+    """Resume journal for a partial download.
+
+    Attributes:
+        key: Download key (purchase code or FID).
+        quality: Requested video quality, if applicable.
+        length: Expected file length.
+        validator: Server ETag or Last-Modified value, if one was sent.
+        completed: Completed byte ranges.
+    """
+
+    key: str
+    quality: str | None = None
+    length: int | None = None
+    validator: str | None = None
+    completed: list[ByteRange] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: PathLike) -> "DownloadJournal | None":
+        """Load a journal file.
+
+        Arguments:
+            path: Journal path.
+
+        Returns:
+            Loaded journal or None if `path` is missing or invalid.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                d = json.load(f)
+            completed = [ByteRange(*r) for r in d.pop("completed")]
+            return cls(completed=completed, **d)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def dump(self, path: PathLike) -> None:
+        """Atomically write this journal to `path`."""
+        tmp = f"{path}.tmp"
+        with open(tmp, mode="w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp, path)
+
+    def matches(self, other: "DownloadJournal") -> bool:
+        """Return True if `other` refers to the same remote file."""
+        return (self.key, self.quality, self.length, self.validator) == (
+            other.key,
+            other.quality,
+            other.length,
+            other.validator,
+        )
+
+    def add(self, byte_range: ByteRange) -> None:
+        """Mark `byte_range` as completed."""
+        if not len(byte_range):
+            return
+        merged: list[ByteRange] = []
+        for r in sorted([*self.completed, byte_range]):
+            if merged and r.start <= merged[-1].end:
+                last = merged.pop()
+                r = ByteRange(last.start, max(last.end, r.end))
+            merged.append(r)
+        self.completed = merged
+
+    @property
+    def bytes_completed(self) -> int:
+        """Return the total number of completed bytes."""
+        return sum(len(r) for r in self.completed)
+
+    def remaining(self) -> list[ByteRange]:
+        """Return byte ranges which still need to be downloaded."""
+        assert self.length is not None
+        ranges = []
+        offset = 0
+        for r in self.completed:
+            if r.start > offset:
+                ranges.append(ByteRange(offset, r.start))
+            offset = max(offset, r.end)
+        if offset < self.length:
+            ranges.append(ByteRange(offset, self.length))
+        return ranges
+
+
+class PartFile:
+    """Partial (``.part``) download file with an on-disk resume journal.
+
+    Data is written to ``<filename>.part`` and progress is recorded in
+    ``<filename>.part.json``. The part file is only renamed to `filename` once
+    all expected data has been written.
+    """
+
+    JOURNAL_INTERVAL = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        filename: str,
+        journal: DownloadJournal,
+        resumable: bool = True,
+        chunk_size: int = 64 * 1024,
+        max_chunk_size: int = 4 * 1024 * 1024,
+        limiters: Sequence[RateLimiter] = (),
+        min_rate: float | None = None,
+        stall_timeout: float = 60,
+    ) -> None:
+        """Open a part file, resuming a previous download if possible.
+
+        Arguments:
+            filename: Final download path.
+            journal: Journal for the requested download.
+            resumable: True if the server supports byte range requests.
+            chunk_size: Minimum (initial) read size.
+            max_chunk_size: Maximum read size.
+            limiters: Rate limiters to consult for each read chunk.
+            min_rate: Minimum transfer rate in bytes per second. Reads will raise
+                `StallError` when throughput stays below `min_rate` for
+                `stall_timeout` seconds.
+            stall_timeout: Stall detection period in seconds.
+        """
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.limiters = limiters
+        self.min_rate = min_rate
+        self.stall_timeout = stall_timeout
+        self.hasher = StreamHasher()
+        self.path = f"{filename}{PART_SUFFIX}"
+        self.journal_path = f"{self.path}{JOURNAL_SUFFIX}"
+        self.resumable = resumable and journal.length is not None
+        saved = DownloadJournal.load(self.journal_path) if self.resumable else None
+        if saved is not None and saved.matches(journal) and os.path.exists(self.path):
+            self.journal = saved
+        else:
+            self.journal = journal
+            with open(self.path, mode="wb") as fp:
+                if journal.length is not None:
+                    fp.truncate(journal.length)
+
+    def save(self) -> None:
+        """Save the resume journal."""
+        if self.resumable:
+            self.journal.dump(self.journal_path)
+
+    def _watchdog(self) -> StallWatchdog | None:
+        if self.min_rate is None:
+            return None
+        return StallWatchdog(self.min_rate, self.stall_timeout)
+
+    def resume_range(self, byte_range: ByteRange) -> ByteRange | None:
+        """Return the first incomplete part of `byte_range`.
+
+        Arguments:
+            byte_range: Requested range.
+
+        Returns:
+            Remaining range or None if `byte_range` has been fully downloaded.
+        """
+        for r in self.journal.remaining():
+            if r.start < byte_range.end and r.end > byte_range.start:
+                return ByteRange(
+                    max(r.start, byte_range.start), min(r.end, byte_range.end)
+                )
+        return None
+
+    async def _throttle(self, n: int) -> None:
+        for limiter in self.limiters:
+            await limiter.acquire(n)
+
+    async def write_stream(
+        self,
+        content: aiohttp.StreamReader,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Write a full (unranged) response body."""
+        async with AsyncFileWriter(self.path, on_write=self.hasher.update) as writer:
+            async for chunk in iter_adaptive(
+                content,
+                self.chunk_size,
+                self.max_chunk_size,
+                watchdog=self._watchdog(),
+            ):
+                await self._throttle(len(chunk))
+                await writer.write(chunk)
+                if progress is not None:
+                    progress.update(len(chunk))
+
+    async def write_range(
+        self,
+        content: aiohttp.StreamReader,
+        byte_range: ByteRange,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        """Write `byte_range` from `content` at its offset in the part file.
+
+        Data which has been written to disk is periodically recorded in the
+        resume journal.
+
+        Arguments:
+            content: Response content stream, starting at `byte_range.start`.
+            byte_range: Range to write.
+            progress: Optional progress callback.
+
+        Raises:
+            AfestaError: `content` ended before the full range was written.
+            StallError: The transfer stalled.
+        """
+        pos = saved = byte_range.start
+        writer = AsyncFileWriter(self.path, offset=pos, on_write=self.hasher.update)
+        try:
+            async with writer:
+                async for chunk in iter_adaptive(
+                    content,
+                    self.chunk_size,
+                    self.max_chunk_size,
+                    len(byte_range),
+                    watchdog=self._watchdog(),
+                ):
+                    await self._throttle(len(chunk))
+                    await writer.write(chunk)
+                    pos += len(chunk)
+                    if progress is not None:
+                        progress.update(len(chunk))
+                    if writer.offset - saved >= self.JOURNAL_INTERVAL:
+                        saved = writer.offset
+                        self.journal.add(ByteRange(byte_range.start, saved))
+                        self.save()
+        finally:
+            self.journal.add(ByteRange(byte_range.start, writer.offset))
+            self.save()
+        if pos < byte_range.end:
+            raise AfestaError("Download ended early")
+
+    async def commit(self) -> str:
+        """Verify the downloaded data and rename it to the final filename.
+
+        Returns:
+            BLAKE2b hex digest of the downloaded file.
+
+        Raises:
+            AfestaError: Downloaded data is incomplete.
+        """
+        if self.journal.length is not None:
+            if (
+                self.journal.remaining()
+                or os.path.getsize(self.path) != self.journal.length
+            ):
+                raise AfestaError(f"Incomplete download for {self.filename}")
+        digest = await to_thread(self.hasher.finish, self.path)
+        os.replace(self.path, self.filename)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        return digest
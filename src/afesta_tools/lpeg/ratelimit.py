@@ -0,0 +1,126 @@
+"""Bandwidth rate limiting module."""
+import asyncio
+import os
+import re
+import time
+
+from loguru import logger
+
+from ..types import PathLike
+
+
+_RATE_RE = re.compile(r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[kmg]?)i?b?\s*$", re.I)
+_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_rate(value: str) -> float | None:
+    """Parse a human readable transfer rate.
+
+    Arguments:
+        value: Rate in bytes per second with an optional binary unit suffix
+            (i.e. ``500K``, ``10M``, ``1.5GiB``). An empty string or ``0``
+            means unlimited.
+
+    Returns:
+        Rate in bytes per second or None for unlimited.
+
+    Raises:
+        ValueError: `value` is not a valid rate.
+    """
+    if not value.strip():
+        return None
+    m = _RATE_RE.match(value)
+    if not m:
+        raise ValueError(f"Invalid rate: {value}")
+    rate = float(m.group("value")) * _UNITS[m.group("unit").lower()]
+    return rate or None
+
+
+class RateLimiter:
+    """Token bucket rate limiter.
+
+    Callers are served in FIFO order, at most `burst` bytes at a time, so that
+    concurrent transfers sharing a limiter get a fair share of the bandwidth.
+    The rate can be changed at any time.
+    """
+
+    MIN_BURST = 64 * 1024
+
+    def __init__(self, rate: float | None = None) -> None:
+        """Construct a limiter.
+
+        Arguments:
+            rate: Maximum rate in bytes per second. Defaults to unlimited.
+        """
+        self._rate = rate
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float | None:
+        """Return the maximum rate in bytes per second."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float | None) -> None:
+        self._refill()
+        self._rate = rate or None
+        self._tokens = min(self._tokens, self.burst)
+
+    @property
+    def burst(self) -> float:
+        """Return the maximum number of bytes which can be sent at once."""
+        if self._rate is None:
+            return float("inf")
+        return max(self._rate, self.MIN_BURST)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._rate is not None:
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self._rate, self.burst
+            )
+        self._updated = now
+
+    async def acquire(self, n: int) -> None:
+        """Wait until `n` bytes may be transferred.
+
+        Arguments:
+            n: Number of bytes.
+        """
+        while n > 0 and self._rate is not None:
+            async with self._lock:
+                take = min(n, self.burst)
+                while self._rate is not None:
+                    self._refill()
+                    if self._tokens >= take:
+                        self._tokens -= take
+                        break
+                    await asyncio.sleep(min((take - self._tokens) / self._rate, 1))
+            n -= int(take)
+
+    async def watch(self, path: PathLike, interval: float = 1) -> None:
+        """Update the rate whenever a control file changes.
+
+        The control file should contain a rate in the format accepted by
+        `parse_rate`. Runs until cancelled.
+
+        Arguments:
+            path: Control file path.
+            interval: Poll interval in seconds.
+        """
+        mtime = None
+        while True:
+            try:
+                st_mtime = os.stat(path).st_mtime
+                if st_mtime != mtime:
+                    mtime = st_mtime
+                    with open(path, encoding="utf-8") as f:
+                        self.rate = parse_rate(f.read())
+                    logger.info(f"Rate limit set to {self.rate}")
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Failed to read rate control file: {exc}")
+            await asyncio.sleep(interval)
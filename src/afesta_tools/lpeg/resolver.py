@@ -0,0 +1,132 @@
+"""FID resolution module."""
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Literal
+
+from ..exceptions import BadFIDError
+
+
+if TYPE_CHECKING:
+    from .client import BaseLpegClient
+    from .client import PSListEntry
+
+
+SET_SUFFIXES = ("-R", "-Part")
+
+
+@dataclass(frozen=True)
+class ResolvedFID:
+    """A video matching a resolved FID.
+
+    Attributes:
+        video: Matching video.
+        parts: Matching parts. None if the FID matches the whole video.
+    """
+
+    video: "PSListEntry"
+    parts: tuple[int, ...] | None = None
+
+    @property
+    def codes(self) -> list[str]:
+        """Return purchase codes for the matching parts."""
+        return self.video.get_codes(self.parts)
+
+
+class FIDResolver:
+    """In-memory FID index built from a video listing.
+
+    Each video is indexed by its FID and, for multipart videos, by the FID of
+    each part (with either the ``-R`` or ``-Part`` set suffix). Lookups are
+    case-insensitive.
+    """
+
+    def __init__(self, videos: Iterable["PSListEntry"]) -> None:
+        """Construct a resolver.
+
+        Arguments:
+            videos: Videos to index.
+        """
+        # None marks FIDs which match more than one video
+        self._index: dict[str, ResolvedFID | None] = {}
+        for video in videos:
+            self._add(video.get_fid(), ResolvedFID(video))
+            if video.num_parts is None:
+                continue
+            base = video.get_fid()
+            for part in range(1, video.num_parts + 1):
+                resolved = ResolvedFID(video, (part,))
+                self._add(video.get_fid(part), resolved)
+                for suffix in SET_SUFFIXES:
+                    self._add(f"{base}{suffix}{part}", resolved)
+
+    def _add(self, fid: str, resolved: ResolvedFID) -> None:
+        key = fid.lower()
+        if key in self._index:
+            existing = self._index[key]
+            if existing is None or existing != resolved:
+                self._index[key] = None
+        else:
+            self._index[key] = resolved
+
+    @classmethod
+    async def from_client(
+        cls,
+        client: "BaseLpegClient",
+        lang: Literal["EN", "JP"] = "JP",
+        vr: bool | None = None,
+    ) -> "FIDResolver":
+        """Return a resolver for a client's purchase library.
+
+        The client's metadata cache is used when available.
+
+        Arguments:
+            client: Authenticated LPEG client.
+            lang: Metadata language.
+            vr: True to only index VR videos, False to only index 2D videos.
+                Defaults to indexing both.
+
+        Returns:
+            New resolver.
+        """
+        videos = []
+        for listing_vr in (True, False) if vr is None else (vr,):
+            videos.extend(await client.list_videos(lang=lang, vr=listing_vr))
+        return cls(videos)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, fid: object) -> bool:
+        return isinstance(fid, str) and self._index.get(fid.lower()) is not None
+
+    def resolve(self, fid: str) -> ResolvedFID:
+        """Return the video matching `fid`.
+
+        Arguments:
+            fid: FID.
+
+        Returns:
+            Matching video and parts.
+
+        Raises:
+            BadFIDError: `fid` is unknown or ambiguous.
+        """
+        key = fid.lower()
+        if key not in self._index:
+            raise BadFIDError(f"Could not find any video matching FID {fid}.")
+        resolved = self._index[key]
+        if resolved is None:
+            raise BadFIDError(f"Got multiple possible matches for FID: {fid}")
+        return resolved
+
+    def resolve_all(self, fids: Iterable[str]) -> dict[str, ResolvedFID]:
+        """Return matches for all resolvable FIDs.
+
+        Arguments:
+            fids: FIDs to resolve.
+
+        Returns:
+            Matches by FID. Unknown and ambiguous FIDs are omitted.
+        """
+        return {fid: self.resolve(fid) for fid in fids if fid in self}
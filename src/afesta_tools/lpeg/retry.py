@@ -0,0 +1,101 @@
+"""Request retry module."""
+import asyncio
+import random
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+from funcy import wraps
+
+from ..exceptions import StallError
+
+
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry policy for LPEG requests.
+
+    Attributes:
+        max_attempts: Maximum number of attempts (including the first one).
+        base_delay: Delay in seconds before the first retry.
+        max_delay: Maximum delay in seconds between attempts.
+        jitter: Fraction of each delay which is randomized.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1
+    max_delay: float = 60
+    jitter: float = 0.5
+
+    def delay(self, attempt: int) -> float:
+        """Return the backoff delay after `attempt` failed attempts."""
+        delay = min(self.base_delay * 2.0 ** (attempt - 1), self.max_delay)
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+    @staticmethod
+    def is_retryable(exc: BaseException) -> bool:
+        """Return True if `exc` is a transient error.
+
+        Connection errors, resets, truncated payloads, timeouts, stalls and
+        5xx/429 responses are retryable. Other HTTP errors (i.e. 4xx auth
+        failures) are fatal.
+        """
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status in RETRYABLE_STATUS
+        return isinstance(
+            exc,
+            (
+                aiohttp.ClientPayloadError,
+                aiohttp.ClientConnectionError,
+                asyncio.TimeoutError,
+                ConnectionError,
+                StallError,
+            ),
+        )
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `func()`, retrying transient errors.
+
+        Arguments:
+            func: Callable returning the awaitable to retry.
+
+        Returns:
+            Result of `func`.
+
+        Raises:
+            Exception: The last error raised by `func` once it is not retryable
+                or `max_attempts` has been reached.
+        """
+        attempt = 1
+        while True:
+            try:
+                return await func()
+            except Exception as exc:
+                if attempt >= self.max_attempts or not self.is_retryable(exc):
+                    raise
+            await asyncio.sleep(self.delay(attempt))
+            attempt += 1
+
+
+def retry(coroutine: Callable[..., Awaitable[Any]]) -> Any:
+    """Decorator for client API calls which should be retried.
+
+    The client's `retry_policy` is used.
+
+    Arguments:
+        coroutine: Coroutine to decorate.
+
+    Returns:
+        Decorated function.
+    """
+
+    @wraps(coroutine)  # type: ignore[misc]
+    async def wrapper(obj: Any, *args: Any, **kwargs: Any) -> Any:
+        policy: RetryPolicy = obj.retry_policy
+        return await policy.call(lambda: coroutine(obj, *args, **kwargs))
+
+    return wrapper
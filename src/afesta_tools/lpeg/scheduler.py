@@ -0,0 +1,149 @@
+"""Download scheduler module."""
+import asyncio
+import heapq
+import itertools
+from collections import Counter
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TypeVar
+
+
+_T = TypeVar("_T")
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    host: str | None = field(compare=False)
+    future: "asyncio.Future[None]" = field(compare=False)
+
+
+class DownloadScheduler:
+    """Bounded-concurrency scheduler for file transfers.
+
+    Jobs are started in priority order (lower values first, FIFO within the
+    same priority) while both the global and per-host caps on active jobs
+    allow it.
+    """
+
+    def __init__(
+        self, max_jobs: int = 4, max_jobs_per_host: int | None = None
+    ) -> None:
+        """Construct a scheduler.
+
+        Arguments:
+            max_jobs: Maximum number of active jobs.
+            max_jobs_per_host: Maximum number of active jobs per host. Defaults
+                to no per-host limit.
+        """
+        self.max_jobs = max_jobs
+        self.max_jobs_per_host = max_jobs_per_host
+        self._active = 0
+        self._active_hosts: Counter[str | None] = Counter()
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """Return the number of active jobs."""
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        """Return the number of queued jobs."""
+        return sum(1 for w in self._waiters if not w.future.done())
+
+    async def submit(
+        self,
+        job: Callable[[], Awaitable[_T]],
+        host: str | None = None,
+        priority: int = 0,
+    ) -> _T:
+        """Queue a job and wait for its result.
+
+        Arguments:
+            job: Callable returning the awaitable to run once a slot is free.
+            host: Host used for per-host limits.
+            priority: Job priority. Lower values are started first.
+
+        Returns:
+            Job result.
+        """
+        async with self.slot(host=host, priority=priority):
+            return await job()
+
+    @asynccontextmanager
+    async def slot(
+        self, host: str | None = None, priority: int = 0
+    ) -> AsyncIterator[None]:
+        """Wait for and hold an active job slot.
+
+        Arguments:
+            host: Host used for per-host limits.
+            priority: Job priority. Lower values are started first.
+
+        Yields:
+            None once the slot has been acquired.
+        """
+        await self._acquire(host, priority)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def _can_start(self, host: str | None) -> bool:
+        if self._active >= self.max_jobs:
+            return False
+        return (
+            self.max_jobs_per_host is None
+            or self._active_hosts[host] < self.max_jobs_per_host
+        )
+
+    async def _acquire(self, host: str | None, priority: int) -> None:
+        if not self._waiters and self._can_start(host):
+            self._start(host)
+            return
+        waiter = _Waiter(
+            priority, next(self._seq), host, asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._wake()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # slot was granted before cancellation was delivered
+                self._release(host)
+            else:
+                waiter.future.cancel()
+                self._wake()
+            raise
+
+    def _start(self, host: str | None) -> None:
+        self._active += 1
+        self._active_hosts[host] += 1
+
+    def _release(self, host: str | None) -> None:
+        self._active -= 1
+        self._active_hosts[host] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant free slots to queued jobs in priority order."""
+        waiting = []
+        while self._waiters and self._active < self.max_jobs:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.future.done():
+                continue
+            if self._can_start(waiter.host):
+                self._start(waiter.host)
+                waiter.future.set_result(None)
+            else:
+                waiting.append(waiter)
+        for waiter in waiting:
+            heapq.heappush(self._waiters, waiter)
@@ -0,0 +1,229 @@
+"""Offline video catalog search module."""
+import unicodedata
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import TypeVar
+
+from ..exceptions import CacheError
+
+
+if TYPE_CHECKING:
+    from .client import BaseLpegClient
+    from .client import PSListEntry
+
+
+_K = TypeVar("_K", date, int)
+
+
+def normalize(text: str) -> str:
+    """Return `text` normalized for case-insensitive matching.
+
+    Arguments:
+        text: Text to normalize.
+
+    Returns:
+        NFKC normalized, casefolded text.
+    """
+    return unicodedata.normalize("NFKC", text).casefold().strip()
+
+
+def _bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """Catalog search query.
+
+    All specified criteria must match. Text criteria are matched
+    case-insensitively after NFKC normalization.
+
+    Attributes:
+        actresses: Actresses which must all appear in a video.
+        genres: Genre tags which must all be set on a video.
+        title: Substring of the full video title.
+        released_after: Earliest release date (inclusive, JST).
+        released_before: Latest release date (inclusive, JST).
+        min_duration: Minimum total duration in seconds.
+        max_duration: Maximum total duration in seconds.
+        signal: Match videos with (True) or without (False) linked goods
+            support.
+        ai3d: Match AI generated (True) or non AI generated (False) videos.
+        parts: Number of parts. Single part videos have 1 part.
+    """
+
+    actresses: Sequence[str] = ()
+    genres: Sequence[str] = ()
+    title: str | None = None
+    released_after: date | None = None
+    released_before: date | None = None
+    min_duration: int | None = None
+    max_duration: int | None = None
+    signal: bool | None = None
+    ai3d: bool | None = None
+    parts: int | None = None
+
+
+class CatalogIndex:
+    """In-memory inverted indexes over a video listing.
+
+    Actresses, genres, flags and part counts are indexed by value, release
+    dates and durations are kept sorted for range lookups and titles are
+    indexed by character bigram, so that queries only touch matching entries.
+    """
+
+    def __init__(self, videos: Iterable["PSListEntry"]) -> None:
+        """Construct an index.
+
+        Arguments:
+            videos: Videos to index.
+        """
+        self.videos: list["PSListEntry"] = list(videos)
+        self._actresses: dict[str, set[int]] = defaultdict(set)
+        self._genres: dict[str, set[int]] = defaultdict(set)
+        self._grams: dict[str, set[int]] = defaultdict(set)
+        self._signal: set[int] = set()
+        self._ai3d: set[int] = set()
+        self._parts: dict[int, set[int]] = defaultdict(set)
+        self._titles: list[str] = []
+        for i, video in enumerate(self.videos):
+            for actress in video.acters:
+                if actress:
+                    self._actresses[normalize(actress)].add(i)
+            for genre in video.categories:
+                if genre:
+                    self._genres[normalize(genre)].add(i)
+            title = normalize(video.title_all)
+            self._titles.append(title)
+            for gram in _bigrams(title):
+                self._grams[gram].add(i)
+            if video.signal:
+                self._signal.add(i)
+            if video.ai3d:
+                self._ai3d.add(i)
+            self._parts[video.num_parts or 1].add(i)
+        by_date = sorted(
+            range(len(self.videos)), key=lambda i: self.videos[i].release_date
+        )
+        self._dates = [self.videos[i].release_date.date() for i in by_date]
+        self._by_date = by_date
+        by_time = sorted(range(len(self.videos)), key=lambda i: self.videos[i].time)
+        self._times = [self.videos[i].time for i in by_time]
+        self._by_time = by_time
+
+    @classmethod
+    async def from_client(
+        cls,
+        client: "BaseLpegClient",
+        lang: Literal["EN", "JP"] = "JP",
+        vr: bool | None = None,
+    ) -> "CatalogIndex":
+        """Return an index of a client's purchase library.
+
+        The client's metadata cache is used when available.
+
+        Arguments:
+            client: Authenticated LPEG client.
+            lang: Metadata language.
+            vr: True to only index VR videos, False to only index 2D videos.
+                Defaults to indexing both. In offline cache mode, listings
+                which have not been cached are skipped.
+
+        Returns:
+            New index.
+
+        Raises:
+            CacheError: No requested listing is cached in offline cache mode.
+        """
+        if vr is not None:
+            return cls(await client.list_videos(lang=lang, vr=vr))
+        videos = []
+        cached = 0
+        for listing_vr in (True, False):
+            try:
+                videos.extend(await client.list_videos(lang=lang, vr=listing_vr))
+            except CacheError:
+                continue
+            cached += 1
+        if not cached:
+            raise CacheError("No cached video listing available offline.")
+        return cls(videos)
+
+    def __len__(self) -> int:
+        return len(self.videos)
+
+    @property
+    def actresses(self) -> list[str]:
+        """Return all indexed (normalized) actress names."""
+        return sorted(self._actresses)
+
+    @property
+    def genres(self) -> list[str]:
+        """Return all indexed (normalized) genre tags."""
+        return sorted(self._genres)
+
+    def search(self, query: SearchQuery) -> list["PSListEntry"]:
+        """Return videos matching `query`.
+
+        Arguments:
+            query: Search query.
+
+        Returns:
+            Matching videos in listing order.
+        """
+        candidates: set[int] | None = None
+        for matches in sorted(self._candidates(query), key=len):
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = set(range(len(self.videos)))
+        if query.title:
+            # bigrams only narrow down candidates, confirm the whole substring
+            title = normalize(query.title)
+            candidates = {i for i in candidates if title in self._titles[i]}
+        return [self.videos[i] for i in sorted(candidates)]
+
+    def _candidates(self, query: SearchQuery) -> Iterator[set[int]]:
+        for actress in query.actresses:
+            yield self._actresses.get(normalize(actress), set())
+        for genre in query.genres:
+            yield self._genres.get(normalize(genre), set())
+        if query.title:
+            for gram in _bigrams(normalize(query.title)):
+                yield self._grams.get(gram, set())
+        if query.released_after is not None or query.released_before is not None:
+            yield self._range(
+                self._dates, self._by_date, query.released_after, query.released_before
+            )
+        if query.min_duration is not None or query.max_duration is not None:
+            yield self._range(
+                self._times, self._by_time, query.min_duration, query.max_duration
+            )
+        if query.signal is not None:
+            yield self._flag(self._signal, query.signal)
+        if query.ai3d is not None:
+            yield self._flag(self._ai3d, query.ai3d)
+        if query.parts is not None:
+            yield self._parts.get(query.parts, set())
+
+    @staticmethod
+    def _range(
+        keys: list[_K], order: list[int], lo: _K | None, hi: _K | None
+    ) -> set[int]:
+        start = 0 if lo is None else bisect_left(keys, lo)
+        end = len(keys) if hi is None else bisect_right(keys, hi)
+        return set(order[start:end])
+
+    def _flag(self, matches: set[int], value: bool) -> set[int]:
+        if value:
+            return matches
+        return set(range(len(self.videos))) - matches
@@ -0,0 +1,107 @@
+"""Request coalescing module."""
+import asyncio
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Request coalescing counters.
+
+    Attributes:
+        hits: Calls answered from a memoized result.
+        shared: Calls which joined an identical in-flight call.
+        misses: Calls which had to be made.
+    """
+
+    hits: int
+    shared: int
+    misses: int
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent identical calls.
+
+    Concurrent calls with the same key share a single in-flight call, and
+    successful results are memoized for `ttl` seconds. Failures are never
+    memoized. Results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, ttl: float = 0.0) -> None:
+        """Construct a coalescer.
+
+        Arguments:
+            ttl: Time in seconds successful results are memoized for. Zero
+                only coalesces in-flight calls.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+        self._memo: dict[Hashable, tuple[float, T]] = {}
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """Return current counters."""
+        return SingleFlightStats(self.hits, self.shared, self.misses)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of `func`, sharing it between identical calls.
+
+        Arguments:
+            key: Call key. Calls with equal keys are considered identical.
+            func: Function making the call.
+
+        Returns:
+            Call result.
+        """
+        memo = self._memo.get(key)
+        if memo is not None:
+            expires, result = memo
+            if time.monotonic() < expires:
+                self.hits += 1
+                return result
+            del self._memo[key]
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+        # cancelling one caller must not cancel the call for other callers
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl > 0:
+            now = time.monotonic()
+            for k in [k for k, (expires, _) in self._memo.items() if expires <= now]:
+                del self._memo[k]
+            self._memo[key] = (now + self.ttl, task.result())
+
+    def forget(self, key: Hashable) -> None:
+        """Drop the memoized result for `key`.
+
+        Arguments:
+            key: Call key.
+        """
+        self._memo.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all memoized results."""
+        self._memo.clear()
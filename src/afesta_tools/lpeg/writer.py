@@ -0,0 +1,150 @@
+"""Background file writer module."""
+import asyncio
+from collections.abc import Callable
+from typing import Any
+from typing import AsyncContextManager
+from typing import BinaryIO
+from typing import cast
+
+from ..types import PathLike
+from ..utils import to_thread
+
+
+class AsyncFileWriter(AsyncContextManager["AsyncFileWriter"]):
+    """Write coalesced buffers to a file from a worker thread.
+
+    Chunks passed to `write` are batched (without copying) until at least
+    `buffer_size` bytes are pending, and each batch is handed to a worker
+    thread through a bounded queue. When `queue_size` batches are already
+    pending, `write` blocks until the worker catches up, applying backpressure
+    to the caller (i.e. a network reader) instead of blocking the event loop on
+    disk I/O.
+
+    Must be used as an async context manager. Pending data is written and the
+    file is closed on exit.
+
+    Attributes:
+        offset: File offset up to which all data has been written to disk.
+    """
+
+    BUFFER_SIZE = 1024 * 1024
+    QUEUE_SIZE = 4
+
+    def __init__(
+        self,
+        path: PathLike,
+        offset: int = 0,
+        buffer_size: int | None = None,
+        queue_size: int | None = None,
+        on_write: Callable[[int, bytes], None] | None = None,
+    ) -> None:
+        """Construct a writer.
+
+        Arguments:
+            path: Path to an existing file.
+            offset: File offset at which to start writing.
+            buffer_size: Minimum batch size. Defaults to `BUFFER_SIZE`.
+            queue_size: Maximum number of pending batches. Defaults to
+                `QUEUE_SIZE`.
+            on_write: Optional callback which is called from the worker thread
+                with the offset and data of each written chunk.
+        """
+        self.path = path
+        self.offset = offset
+        self.buffer_size = buffer_size or self.BUFFER_SIZE
+        self.on_write = on_write
+        self._pos = offset
+        self._chunks: list[bytes] = []
+        self._len = 0
+        self._queue: asyncio.Queue[tuple[int, list[bytes]] | None] = asyncio.Queue(
+            queue_size or self.QUEUE_SIZE
+        )
+        self._fp: BinaryIO | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+
+    async def __aenter__(self) -> "AsyncFileWriter":
+        self._fp = cast(BinaryIO, await to_thread(open, self.path, "r+b", 0))
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *args: Any, **kwargs: Any) -> None:
+        await self.close()
+
+    async def write(self, data: bytes | bytearray | memoryview) -> None:
+        """Queue `data` to be written at the current position.
+
+        Immutable `bytes` chunks are queued as is. Mutable buffers are copied,
+        since the caller may reuse them before they are written.
+
+        Arguments:
+            data: Data to write.
+
+        Raises:
+            OSError: A previous write failed.
+        """
+        self._check()
+        if not data:
+            return
+        chunk = data if isinstance(data, bytes) else bytes(data)
+        self._chunks.append(chunk)
+        self._len += len(chunk)
+        if self._len >= self.buffer_size:
+            await self._submit()
+
+    async def close(self) -> None:
+        """Write any pending data and close the file.
+
+        Raises:
+            OSError: A write failed.
+        """
+        try:
+            if self._task is not None:
+                if self._error is None:
+                    await self._submit()
+                await self._queue.put(None)
+                await self._task
+        finally:
+            self._task = None
+            if self._fp is not None:
+                await to_thread(self._fp.close)
+                self._fp = None
+        self._check()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise OSError(f"Failed to write {self.path}") from self._error
+
+    async def _submit(self) -> None:
+        if not self._chunks:
+            return
+        chunks, self._chunks = self._chunks, []
+        await self._queue.put((self._pos, chunks))
+        self._pos += self._len
+        self._len = 0
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            offset, chunks = item
+            try:
+                await to_thread(self._write_at, offset, chunks)
+                self.offset = offset + sum(len(chunk) for chunk in chunks)
+            except Exception as exc:
+                self._error = exc
+
+    def _write_at(self, offset: int, chunks: list[bytes]) -> None:
+        assert self._fp is not None
+        self._fp.seek(offset)
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                n = self._fp.write(view)
+                view = view[n:]
+            if self.on_write is not None:
+                self.on_write(offset, chunk)
+            offset += len(chunk)
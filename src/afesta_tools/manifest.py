@@ -0,0 +1,399 @@
+"""Download manifest module."""
+import asyncio
+import enum
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import fields
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+
+from loguru import logger
+
+from .types import PathLike
+from .utils import to_thread
+
+
+MANIFEST_FILE = ".afesta-manifest.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def new_hash() -> "hashlib.blake2b":
+    """Return a new hash object for manifest checksums."""
+    return hashlib.blake2b()
+
+
+def hash_file(
+    path: PathLike, offset: int = 0, hasher: "hashlib.blake2b | None" = None
+) -> str:
+    """Return the manifest checksum for a file.
+
+    Arguments:
+        path: File path.
+        offset: Offset to start reading from.
+        hasher: Existing hash state containing data before `offset`.
+
+    Returns:
+        Hex digest.
+    """
+    if hasher is None:
+        hasher = new_hash()
+    with open(path, mode="rb") as f:
+        f.seek(offset)
+        while block := f.read(HASH_BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Manifest record for a downloaded file.
+
+    Attributes:
+        filename: File name relative to the manifest directory.
+        size: File size.
+        blake2b: BLAKE2b hex digest.
+        code: Download key (purchase code or FID).
+        quality: Video quality, if applicable.
+        timestamp: Download completion time (ISO 8601).
+    """
+
+    filename: str
+    size: int
+    blake2b: str
+    code: str
+    quality: str | None = None
+    timestamp: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.timestamp:
+            self.timestamp = datetime.now(timezone.utc).isoformat()
+
+
+_ENTRY_FIELDS = frozenset(f.name for f in fields(ManifestEntry)) - {"filename"}
+
+
+def _load_entry(name: str, d: Any) -> ManifestEntry | None:
+    """Return the manifest entry for a saved record.
+
+    Unknown keys (i.e. written by a newer version) are ignored. Returns None
+    for records which cannot be parsed.
+    """
+    if not isinstance(d, dict):
+        return None
+    try:
+        return ManifestEntry(
+            filename=name, **{k: v for k, v in d.items() if k in _ENTRY_FIELDS}
+        )
+    except TypeError:
+        return None
+
+
+class VerifyStatus(enum.Enum):
+    """File verification result."""
+
+    OK = "OK"
+    MISSING = "MISSING"
+    SIZE_MISMATCH = "SIZE MISMATCH"
+    HASH_MISMATCH = "HASH MISMATCH"
+
+
+class Manifest:
+    """Per-directory manifest of completed downloads.
+
+    Entries are indexed by download key, so `find` does not scan the
+    manifest. Entries should be added with `add` (or `commit`) to keep the
+    index up to date.
+
+    A manifest file which cannot be parsed (or which contains records that
+    cannot be parsed) is never overwritten. It is moved to a `.bak` file
+    before the first save.
+
+    Attributes:
+        corrupt: True if the manifest file could not be fully loaded.
+    """
+
+    def __init__(
+        self, directory: PathLike, entries: dict[str, ManifestEntry] | None = None
+    ) -> None:
+        """Construct a manifest.
+
+        Arguments:
+            directory: Manifest directory.
+            entries: Entries by filename.
+        """
+        self.directory = os.fspath(directory)
+        self.entries: dict[str, ManifestEntry] = {}
+        self.corrupt = False
+        self._index: dict[tuple[str, str | None], ManifestEntry] = {}
+        self._stat: tuple[int, int] | None = None
+        self._version = 0
+        self._saved_version = 0
+        self._save_lock: asyncio.Lock | None = None
+        for entry in (entries or {}).values():
+            self.add(entry)
+
+    @property
+    def path(self) -> str:
+        """Return the manifest file path."""
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @classmethod
+    def load(cls, directory: PathLike | None = None) -> "Manifest":
+        """Load the manifest for a directory.
+
+        Arguments:
+            directory: Manifest directory. Defaults to the current working dir.
+
+        Returns:
+            Loaded manifest. An empty manifest is returned if the directory
+            has no manifest file. Records which cannot be parsed are skipped
+            and the manifest is marked `corrupt`.
+        """
+        manifest = cls(directory or os.curdir)
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                stat = os.fstat(f.fileno())
+                data = json.load(f)
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Failed to load manifest {manifest.path}: {exc}")
+            manifest.corrupt = True
+            return manifest
+        manifest._stat = (stat.st_mtime_ns, stat.st_size)
+        files = data.get("files") if isinstance(data, dict) else None
+        if not isinstance(files, dict):
+            manifest.corrupt = True
+            return manifest
+        for name, d in files.items():
+            entry = _load_entry(name, d)
+            if entry is None:
+                manifest.corrupt = True
+            else:
+                manifest.add(entry)
+        return manifest
+
+    def _file_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def save(self) -> None:
+        """Atomically write this manifest.
+
+        A `corrupt` manifest file is moved to a backup file first.
+        """
+        if self.corrupt:
+            self._backup()
+        files = {}
+        for name, entry in sorted(self.entries.items()):
+            d = asdict(entry)
+            del d["filename"]
+            files[name] = d
+        tmp = f"{self.path}.tmp"
+        with open(tmp, mode="w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": files}, f, indent=1)
+        os.replace(tmp, self.path)
+        self._stat = self._file_stat()
+
+    def _backup(self) -> None:
+        backup = f"{self.path}.bak"
+        try:
+            os.replace(self.path, backup)
+        except FileNotFoundError:
+            pass
+        else:
+            logger.warning(f"Moved unreadable manifest to {backup}")
+        self.corrupt = False
+
+    def _merge_and_save(self) -> None:
+        """Save, keeping entries written to the file by other processes."""
+        if self._file_stat() != self._stat:
+            loaded = Manifest.load(self.directory)
+            self.corrupt = self.corrupt or loaded.corrupt
+            for name, entry in loaded.entries.items():
+                if name not in self.entries:
+                    self.add(entry)
+        self.save()
+
+    def add(self, entry: ManifestEntry) -> None:
+        """Add (or replace) an entry in memory.
+
+        Arguments:
+            entry: Entry to add.
+        """
+        old = self.entries.get(entry.filename)
+        if old is not None and self._index.get((old.code, old.quality)) is old:
+            del self._index[(old.code, old.quality)]
+        self.entries[entry.filename] = entry
+        self._index[(entry.code, entry.quality)] = entry
+
+    async def commit(self, entry: ManifestEntry) -> None:
+        """Add an entry and save this manifest in a worker thread.
+
+        Concurrent commits are batched, an entry added while a save is in
+        progress is written by the next save along with any other entries
+        added in the meantime. Entries added to the file by other processes
+        since it was last loaded or saved are kept.
+
+        Arguments:
+            entry: Entry to add.
+        """
+        self.add(entry)
+        self._version += 1
+        version = self._version
+        if self._save_lock is None:
+            self._save_lock = asyncio.Lock()
+        async with self._save_lock:
+            if self._saved_version >= version:
+                return
+            version = self._version
+            snapshot = Manifest(self.directory, self.entries)
+            snapshot._stat = self._stat
+            snapshot.corrupt = self.corrupt
+            await to_thread(snapshot._merge_and_save)
+            for name, merged in snapshot.entries.items():
+                if name not in self.entries:
+                    self.add(merged)
+            self._stat = snapshot._stat
+            self.corrupt = snapshot.corrupt
+            self._saved_version = version
+
+    @classmethod
+    def record(cls, directory: PathLike | None, entry: ManifestEntry) -> None:
+        """Add an entry to a directory's manifest file.
+
+        The manifest is reloaded before saving so that other writers' entries
+        are not dropped. Use `ManifestStore` to record many entries.
+
+        Arguments:
+            directory: Manifest directory. Defaults to the current working dir.
+            entry: Entry to add.
+        """
+        manifest = cls.load(directory)
+        manifest.add(entry)
+        manifest.save()
+
+    def find(self, code: str, quality: str | None = None) -> ManifestEntry | None:
+        """Return the entry for a download key.
+
+        Arguments:
+            code: Download key (purchase code or FID).
+            quality: Video quality, if applicable.
+
+        Returns:
+            Matching entry or None.
+        """
+        return self._index.get((code, quality))
+
+    def is_present(self, entry: ManifestEntry, size: int | None = None) -> bool:
+        """Return True if `entry` exists on disk with the recorded size.
+
+        Arguments:
+            entry: Manifest entry.
+            size: Expected size (i.e. as reported by the server). Defaults to
+                the recorded size.
+
+        Returns:
+            True if the file is present and intact.
+        """
+        if size is not None and size != entry.size:
+            return False
+        try:
+            return (
+                os.path.getsize(os.path.join(self.directory, entry.filename))
+                == entry.size
+            )
+        except OSError:
+            return False
+
+    def check(self, entry: ManifestEntry) -> VerifyStatus:
+        """Re-hash a file and compare it against its manifest entry.
+
+        Arguments:
+            entry: Manifest entry.
+
+        Returns:
+            Verification result.
+        """
+        path = os.path.join(self.directory, entry.filename)
+        try:
+            if os.path.getsize(path) != entry.size:
+                return VerifyStatus.SIZE_MISMATCH
+            if hash_file(path) != entry.blake2b:
+                return VerifyStatus.HASH_MISMATCH
+        except FileNotFoundError:
+            return VerifyStatus.MISSING
+        return VerifyStatus.OK
+
+    async def verify(
+        self, max_workers: int = 4
+    ) -> list[tuple[ManifestEntry, VerifyStatus]]:
+        """Re-hash all files in this manifest in parallel.
+
+        Arguments:
+            max_workers: Maximum number of files to hash at once.
+
+        Returns:
+            Verification results in filename order.
+        """
+        sem = asyncio.Semaphore(max_workers)
+
+        async def _check(entry: ManifestEntry) -> tuple[ManifestEntry, VerifyStatus]:
+            async with sem:
+                return entry, await to_thread(self.check, entry)
+
+        return await asyncio.gather(
+            *(_check(entry) for _, entry in sorted(self.entries.items()))
+        )
+
+
+class ManifestStore:
+    """Shared in-memory manifests by directory.
+
+    Each directory's manifest is loaded once in a worker thread and kept for
+    the life of the store, so concurrent downloads into one directory share a
+    single manifest and only the (batched) saves touch the disk.
+    """
+
+    def __init__(self) -> None:
+        """Construct a store."""
+        self._manifests: dict[str, Manifest] = {}
+        self._lock: asyncio.Lock | None = None
+
+    async def get(self, directory: PathLike | None = None) -> Manifest:
+        """Return the manifest for a directory.
+
+        Arguments:
+            directory: Manifest directory. Defaults to the current working dir.
+
+        Returns:
+            Shared manifest.
+        """
+        path = os.path.abspath(directory or os.curdir)
+        manifest = self._manifests.get(path)
+        if manifest is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                manifest = self._manifests.get(path)
+                if manifest is None:
+                    manifest = await to_thread(Manifest.load, path)
+                    self._manifests[path] = manifest
+        return manifest
+
+    async def record(self, directory: PathLike | None, entry: ManifestEntry) -> None:
+        """Add an entry to a directory's manifest and save it.
+
+        Arguments:
+            directory: Manifest directory. Defaults to the current working dir.
+            entry: Entry to add.
+        """
+        manifest = await self.get(directory)
+        await manifest.commit(entry)
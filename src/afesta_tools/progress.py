@@ -1,4 +1,5 @@
 """CLI progress module."""
+from collections.abc import Callable
 
 import tqdm.std
 
@@ -29,3 +30,55 @@ class ProgressCallback:
     def update(self, inc: int | float = 1) -> None:
         """Increment pbar progress."""
         self.pbar.update(inc)
+
+    def stalled(self, reason: str) -> None:
+        """Report a stalled transfer."""
+        self.pbar.write(f"Transfer stalled: {reason}")
+
+    def reconnecting(self, offset: int, attempt: int) -> None:
+        """Report a reconnect after a stalled transfer."""
+        self.pbar.write(f"Reconnecting at offset {offset} (attempt {attempt})")
+
+
+class LazyProgressCallback(ProgressCallback):
+    """Progress callback which creates its pbar once progress is reported.
+
+    Queued transfers do not display a pbar until they start. Descriptions set
+    before then are applied when the pbar is created.
+    """
+
+    def __init__(self, factory: Callable[[], tqdm.std.tqdm]) -> None:
+        """Construct a callback.
+
+        Arguments:
+            factory: Callable returning a new pbar.
+        """
+        self._factory = factory
+        self._pbar: tqdm.std.tqdm | None = None
+        self._desc: str | None = None
+
+    @property
+    def started(self) -> bool:
+        """Return True if the pbar has been created."""
+        return self._pbar is not None
+
+    @property
+    def pbar(self) -> tqdm.std.tqdm:
+        """Pbar, created on first access."""
+        if self._pbar is None:
+            self._pbar = self._factory()
+            if self._desc is not None:
+                self._pbar.set_description(self._desc)
+        return self._pbar
+
+    def set_desc(self, desc: str) -> None:
+        """Set pbar description."""
+        if self._pbar is None:
+            self._desc = desc
+        else:
+            super().set_desc(desc)
+
+    def close(self) -> None:
+        """Close the pbar if it has been created."""
+        if self._pbar is not None:
+            self._pbar.close()
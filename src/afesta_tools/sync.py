@@ -0,0 +1,196 @@
+"""Library sync module."""
+import asyncio
+import enum
+from collections.abc import Callable
+from collections.abc import Iterable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Literal
+
+from .lpeg.client import BaseLpegClient
+from .lpeg.client import PSListEntry
+from .lpeg.client import VideoQuality
+from .lpeg.download import DownloadResult
+from .progress import ProgressCallback
+from .types import PathLike
+
+
+class SyncItemType(enum.Enum):
+    """Library sync file type."""
+
+    VIDEO = "video"
+    VCZ = "vcz"
+
+
+@dataclass(frozen=True)
+class SyncItem:
+    """A file to be synced.
+
+    Attributes:
+        typ: File type.
+        key: Download key (purchase code for videos, FID for vcz files).
+        fid: Video FID.
+        title: Video title.
+    """
+
+    typ: SyncItemType
+    key: str
+    fid: str
+    title: str
+
+    def __str__(self) -> str:
+        return f"{self.fid} [{self.typ.value}]: {self.title}"
+
+
+class LibrarySync:
+    """Mirror a purchase library into a local directory.
+
+    The library is listed once (VR and 2D) and compared against the download
+    manifest for the sync directory. Only files which are not recorded in the
+    manifest (or which are missing or truncated on disk) are downloaded, so
+    re-running a sync over an unchanged library makes no file transfer
+    requests. Existing files which are not in the manifest are adopted by the
+    client (see `BaseLpegClient.adopt`) rather than downloaded again. File
+    transfers are bounded by the client's scheduler.
+    """
+
+    def __init__(
+        self,
+        client: BaseLpegClient,
+        directory: PathLike,
+        quality: VideoQuality | None = None,
+        vcz: bool = True,
+        lang: Literal["JP", "EN"] = "JP",
+    ) -> None:
+        """Construct a sync.
+
+        Arguments:
+            client: LPEG client.
+            directory: Sync directory.
+            quality: Video quality. Defaults to the client's default quality.
+            vcz: True if vcz files should be synced for videos which support
+                linked goods.
+            lang: Metadata language for listed videos.
+        """
+        self.client = client
+        self.directory = directory
+        self.quality = quality or client.DEFAULT_VIDEO_QUALITY
+        self.vcz = vcz
+        self.lang = lang
+
+    async def list_library(self) -> list[PSListEntry]:
+        """Return all downloadable VR and 2D videos in the library."""
+        videos = []
+        for vr in (True, False):
+            for video in await self.client.list_videos(vr=vr, lang=self.lang):
+                if video.dl and video.code:
+                    videos.append(video)
+        return videos
+
+    def items(self, videos: Iterable[PSListEntry]) -> list[SyncItem]:
+        """Return all files for the specified videos.
+
+        Arguments:
+            videos: Library videos.
+
+        Returns:
+            Sync items.
+        """
+        items = []
+        for video in videos:
+            for code in video.get_codes():
+                items.append(
+                    SyncItem(SyncItemType.VIDEO, code, video.get_fid(), video.title)
+                )
+            if self.vcz and video.signal:
+                if video.num_parts is None:
+                    fids = [video.get_fid()]
+                else:
+                    fids = [
+                        video.get_fid(part) for part in range(1, video.num_parts + 1)
+                    ]
+                for fid in fids:
+                    items.append(SyncItem(SyncItemType.VCZ, fid, fid, video.title))
+        return items
+
+    async def missing(self, items: Iterable[SyncItem]) -> list[SyncItem]:
+        """Return items which have not been downloaded.
+
+        Arguments:
+            items: Sync items.
+
+        Returns:
+            Items which are not present in the sync directory.
+        """
+        manifest = await self.client.manifests.get(self.directory)
+        missing = []
+        for item in items:
+            quality = self.quality.value if item.typ == SyncItemType.VIDEO else None
+            entry = manifest.find(item.key, quality)
+            if entry is None or not manifest.is_present(entry):
+                missing.append(item)
+        return missing
+
+    async def plan(self) -> list[SyncItem]:
+        """Return all library files which need to be downloaded."""
+        return await self.missing(self.items(await self.list_library()))
+
+    async def run(
+        self,
+        items: Iterable[SyncItem],
+        progress: Callable[[SyncItem], AbstractContextManager[ProgressCallback]]
+        | None = None,
+    ) -> DownloadResult:
+        """Download sync items.
+
+        Arguments:
+            items: Items to download.
+            progress: Optional factory returning a progress callback context
+                for each item. Contexts are entered for all items up front,
+                before transfers are scheduled, so callbacks should only
+                display progress once it is reported (see
+                `LazyProgressCallback`).
+
+        Returns:
+            Download results (by download key).
+        """
+        items = list(items)
+        results = await asyncio.gather(
+            *(self._download(item, progress) for item in items),
+            return_exceptions=True,
+        )
+        result = DownloadResult()
+        for item, r in zip(items, results):
+            if isinstance(r, BaseException):
+                result.failed[item.key] = r
+            else:
+                result.succeeded.append(item.key)
+        return result
+
+    async def _download(
+        self,
+        item: SyncItem,
+        progress: Callable[[SyncItem], AbstractContextManager[ProgressCallback]]
+        | None = None,
+    ) -> None:
+        if progress is None:
+            await self._download_item(item)
+        else:
+            with progress(item) as callback:
+                callback.set_desc(f"Syncing {item}")
+                await self._download_item(item, callback)
+
+    async def _download_item(
+        self, item: SyncItem, progress: ProgressCallback | None = None
+    ) -> None:
+        if item.typ == SyncItemType.VIDEO:
+            await self.client.download_video(
+                code=item.key,
+                download_dir=self.directory,
+                quality=self.quality,
+                progress=progress,
+            )
+        else:
+            await self.client.download_vcz(
+                item.key, download_dir=self.directory, progress=progress
+            )
@@ -117,6 +117,8 @@ async def script_concat(
     dry_run: bool = False,
     force: bool = False,
     output_dir: Path | None = None,
+    cached: bool = False,
+    mmap: bool = False,
 ) -> None:
     from a10sa_script.script import (
         VCSXCycloneScript,
@@ -135,11 +137,9 @@ async def script_concat(
         raise ValueError("Part 1 (-R1) VCZ is required")
     filename = m.group("filename")
     vr_format = m.group("vr_format") if m.group("vr_format") else ""
+    offsets = await chapters.file_offsets(dir=src_dir, cached=cached, mmap=mmap)
     vcz_offsets = {src: 0}
-    vcz_offsets.update(
-        (src_dir / f"{k}.vcz", v)
-        for k, v in (await chapters.file_offsets(dir=src_dir)).items()
-    )
+    vcz_offsets.update((src_dir / f"{k}.vcz", v) for k, v in offsets.items())
     for path in parts:
         if not path.exists():
             raise FileNotFoundError(f"{path} does not exist")
@@ -151,7 +151,7 @@ async def script_concat(
     ):
         script = script_cls()
         for path, offset in vcz_offsets.items():
-            async with VCZArchive(path) as vcz:
+            async with await VCZArchive.open(path, cached=cached, mmap=mmap) as vcz:
                 try:
                     part_script = await vcz.read_script(typ)
                     for cmd in part_script.commands:
@@ -1,7 +1,16 @@
 """VCS video resources module."""
+from .archive import ARCHIVE_CACHE
+from .archive import ArchiveCache
 from .archive import VCZArchive
 from .chapter import ChapterControl, Scene
 from .goods import GoodsType
 
 
-__all__ = ["ChapterControl", "GoodsType", "VCZArchive", "Scene"]
+__all__ = [
+    "ARCHIVE_CACHE",
+    "ArchiveCache",
+    "ChapterControl",
+    "GoodsType",
+    "VCZArchive",
+    "Scene",
+]
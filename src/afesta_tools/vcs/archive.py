@@ -2,14 +2,17 @@
 import os
 import threading
 import zipfile
+from collections import OrderedDict
+from collections.abc import Hashable
 from functools import cached_property
-from tempfile import TemporaryFile
+from functools import partial
 from typing import Any
 from typing import AsyncContextManager
 from typing import Literal, cast
 
 from lxml import etree  # noqa: S410
 
+from ..lpeg.singleflight import SingleFlight
 from ..types import PathLike
 from ..utils import to_thread
 from .chapter import ChapterControl
@@ -18,18 +21,34 @@ from .goods import GoodsType
 from .goods import ScriptFormat
 from .goods import convert_script
 from .goods import load_script
+from .reader import Buffer
+from .reader import MemberReader
+from .reader import MmapMemberReader
+from .reader import open_buffer
+
+
+_UNSET: Any = object()
 
 
 class VCZArchive(AsyncContextManager["VCZArchive"]):
-    """VCZ archive."""
+    """VCZ archive.
 
-    def __init__(self, filename: PathLike, mode: Literal["r", "a"] = "r") -> None:
+    Archives should be opened with `open` from async code, so that reading
+    the zip central directory and params.xml does not block the event loop.
+    """
+
+    def __init__(
+        self, filename: PathLike, mode: Literal["r", "a"] = "r", mmap: bool = False
+    ) -> None:
         """Open a VCZ archive.
 
+        This blocks on file I/O, use `open` from async code.
+
         Arguments:
             filename: Path to VCZ file.
             mode: ``r`` to read an existing file, ``a`` to append (edit) an existing
                 file.
+            mmap: True to memory-map a read-only archive, see `read_buffer`.
 
         Raises:
             ValueError: `filename` is not a valid VCZ archive.
@@ -37,6 +56,16 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
         self.filename = filename
         self._zip = zipfile.ZipFile(self.filename, mode=mode)
         self._lock = threading.Lock()
+        # concurrent lock-free member reads, only safe while not appending
+        self._reader: MemberReader | MmapMemberReader | None = None
+        if mode == "r":
+            reader_cls = MmapMemberReader if mmap else MemberReader
+            self._reader = reader_cls(filename, self._zip.infolist())
+        self._chapters: Any = _UNSET
+        # shared handle state, see ArchiveCache
+        self._cache: ArchiveCache | None = None
+        self._cached = False
+        self._refs = 0
         params = self._load_params()
         sys_params = params.find("system")
         if sys_params is None:
@@ -49,6 +78,35 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
             if element.text in names
         }
 
+    @classmethod
+    async def open(
+        cls,
+        filename: PathLike,
+        mode: Literal["r", "a"] = "r",
+        cached: bool = False,
+        mmap: bool = False,
+    ) -> "VCZArchive":
+        """Open a VCZ archive in a worker thread.
+
+        Arguments:
+            filename: Path to VCZ file.
+            mode: ``r`` to read an existing file, ``a`` to append (edit) an existing
+                file.
+            cached: True to share a read-only handle from `ARCHIVE_CACHE`.
+            mmap: True to memory-map a read-only archive, see `read_buffer`.
+
+        Returns:
+            Opened archive.
+
+        Raises:
+            ValueError: A cached archive was requested in append mode.
+        """
+        if cached:
+            if mode != "r":
+                raise ValueError("Only read-only archives can be cached")
+            return await ARCHIVE_CACHE.open(filename, mmap=mmap)
+        return await to_thread(cls, filename, mode, mmap)
+
     def _load_params(self) -> etree._Element:
         """Return the contents of params.xml."""
         try:
@@ -57,7 +115,7 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
             raise ValueError(f"{self.filename} has no VCS params") from e
         parser = etree.XMLParser(resolve_entities=False)
         return etree.fromstring(  # noqa: S320
-            self._zip_read(params_info), parser=parser
+            self._zip_read_buffer(params_info), parser=parser
         )
 
     @cached_property
@@ -66,18 +124,28 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
         return self._sys_params.findtext("title")
 
     async def chapter_control(self) -> ChapterControl | None:
-        """Chapters."""
-        if "ChapterControl" not in self._name_infos:
-            return None
+        """Chapters.
+
+        The parsed chapters are memoized on this archive.
+        """
+        if self._chapters is _UNSET:
+            if "ChapterControl" in self._name_infos:
+                self._chapters = await to_thread(
+                    self._parse_chapter_control,
+                    await self.read_buffer("ChapterControl"),
+                )
+            else:
+                self._chapters = None
+        return cast(ChapterControl | None, self._chapters)
+
+    @staticmethod
+    def _parse_chapter_control(data: Buffer) -> ChapterControl:
+        # the nested zip is read directly from memory
         parser = etree.XMLParser(resolve_entities=False)
-        with TemporaryFile() as f:
-            f.write(await self.read("ChapterControl"))
-            f.seek(0)
-            zipf = zipfile.ZipFile(f)
-            data = await to_thread(zipf.read, "params.xml")
-        params = etree.fromstring(  # noqa: S320
-            data, parser=parser
-        )
+        with open_buffer(data) as fp, zipfile.ZipFile(fp) as zipf:
+            params = etree.fromstring(  # noqa: S320
+                zipf.read("params.xml"), parser=parser
+            )
         return ChapterControl.from_xml(params)
 
     def namelist(self) -> list[str]:
@@ -88,13 +156,32 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
         await self.close()
 
     async def close(self) -> None:
-        """Close this client."""
-        self._zip.close()
+        """Close this archive.
 
-    def _zip_read(self, name: str | zipfile.ZipInfo) -> bytes:
+        Shared (cached) handles are only closed once they have been released
+        by all users and evicted from the cache.
+        """
+        if self._cache is not None:
+            await self._cache.release(self)
+        else:
+            await self._close()
+
+    async def _close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+        await to_thread(self._zip.close)
+
+    def _zip_read_buffer(self, name: str | zipfile.ZipInfo) -> Buffer:
+        member = name.filename if isinstance(name, zipfile.ZipInfo) else name
+        if self._reader is not None and self._reader.supports(member):
+            return self._reader.read(member)
         with self._lock:
             return self._zip.read(name)
 
+    def _zip_read(self, name: str | zipfile.ZipInfo) -> bytes:
+        data = self._zip_read_buffer(name)
+        return data if isinstance(data, bytes) else data.tobytes()
+
     async def read(self, name: str) -> bytes:
         """Read the specified file from this archive.
 
@@ -109,6 +196,24 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
         """
         return await to_thread(self._zip_read, self._name_infos[name])
 
+    async def read_buffer(self, name: str) -> Buffer:
+        """Read the specified file from this archive without copying it.
+
+        For memory-mapped archives, stored members are returned as read-only
+        views into the mapping, which remain valid after this archive is
+        closed. Otherwise this is equivalent to `read`.
+
+        Arguments:
+            name: File to read.
+
+        Returns:
+            File data.
+
+        Raises:
+            KeyError: `name` does not exist in the archive.
+        """
+        return await to_thread(self._zip_read_buffer, self._name_infos[name])
+
     async def read_script(self, typ: GoodsType) -> GoodsScript:
         """Read the specified interlocking goods script.
 
@@ -121,7 +226,7 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
         Raises:
             KeyError: The specified goods type is not supported for this video.
         """
-        data = await self.read(typ.value)
+        data = await self.read_buffer(typ.value)
         return load_script(typ, data)
 
     async def extract_script(
@@ -167,3 +272,90 @@ class VCZArchive(AsyncContextManager["VCZArchive"]):
             GoodsType.ONARHYTHM: f"{base}_onarhythm",
             GoodsType.PISTON: f"{base}_piston",
         }[typ]
+
+
+class ArchiveCache:
+    """Size-bounded LRU cache of shared read-only VCZArchive handles.
+
+    Archives are keyed by resolved path, modification time and size, so a
+    replaced file is opened again. Handles are reference counted: each `open`
+    must be paired with `VCZArchive.close` (i.e. via ``async with``). Evicted
+    handles are closed once released by all users, and all handles are
+    closed by `close`.
+    """
+
+    MAX_SIZE = 16
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        """Construct a cache.
+
+        Arguments:
+            maxsize: Maximum number of cached archives. Defaults to
+                `MAX_SIZE`.
+        """
+        self.maxsize = maxsize or self.MAX_SIZE
+        self._archives: OrderedDict[Hashable, VCZArchive] = OrderedDict()
+        self._opening: SingleFlight[VCZArchive] = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._archives)
+
+    async def open(self, filename: PathLike, mmap: bool = False) -> VCZArchive:
+        """Return a shared handle for `filename`.
+
+        Arguments:
+            filename: Path to VCZ file.
+            mmap: True to share a memory-mapped handle.
+
+        Returns:
+            Shared archive.
+        """
+        path = os.path.realpath(filename)
+        st = await to_thread(os.stat, path)
+        key = (path, st.st_mtime_ns, st.st_size, mmap)
+        archive = self._archives.get(key)
+        while archive is None:
+            # concurrent opens of the same archive share one open, retry if it
+            # was evicted before this task resumed
+            await self._opening.do(key, partial(self._open, key, path, mmap))
+            archive = self._archives.get(key)
+        self._archives.move_to_end(key)
+        archive._refs += 1
+        return archive
+
+    async def _open(self, key: Hashable, path: str, mmap: bool) -> VCZArchive:
+        archive = await VCZArchive.open(path, mmap=mmap)
+        archive._cache = self
+        archive._cached = True
+        self._archives[key] = archive
+        evicted = []
+        while len(self._archives) > self.maxsize:
+            _, old = self._archives.popitem(last=False)
+            old._cached = False
+            if old._refs == 0:
+                evicted.append(old)
+        for old in evicted:
+            await old._close()
+        return archive
+
+    async def release(self, archive: VCZArchive) -> None:
+        """Release a shared handle.
+
+        Arguments:
+            archive: Archive returned by `open`.
+        """
+        archive._refs -= 1
+        if archive._refs <= 0 and not archive._cached:
+            await archive._close()
+
+    async def close(self) -> None:
+        """Close all unused archives and evict all archives."""
+        archives = list(self._archives.values())
+        self._archives.clear()
+        for archive in archives:
+            archive._cached = False
+            if archive._refs <= 0:
+                await archive._close()
+
+
+ARCHIVE_CACHE = ArchiveCache()
@@ -69,7 +69,9 @@ class ChapterControl:
             )
         f.write(os.linesep.join(lines))
 
-    async def file_offsets(self, dir: str | Path | None = None) -> dict[str, int]:
+    async def file_offsets(
+        self, dir: str | Path | None = None, cached: bool = False, mmap: bool = False
+    ) -> dict[str, int]:
         from .archive import VCZArchive
 
         """Returns relative offsets for external VCZ files."""
@@ -81,7 +83,10 @@ class ChapterControl:
             if scene.file and scene.file not in offsets:
                 if not scene.goto:
                     raise ValueError("external scene with no goto reference")
-                async with VCZArchive(workdir / f"{scene.file}.vcz") as vcz:
+                path = workdir / f"{scene.file}.vcz"
+                async with await VCZArchive.open(
+                    path, cached=cached, mmap=mmap
+                ) as vcz:
                     chapters = await vcz.chapter_control()
                     if not chapters:
                         raise ValueError("external chapters found")
@@ -13,6 +13,8 @@ from a10sa_script.script import VorzeLinearScript
 from a10sa_script.script import VorzeRotateScript
 from a10sa_script.script import VorzeVibrateScript
 
+from .reader import Buffer
+
 
 GoodsScript = Union[
     VCSXCycloneScript,
@@ -43,7 +45,7 @@ class GoodsType(enum.Enum):
     ONARHYTHM = "Vorze_OnaRhythm"
 
 
-def load_script(typ: GoodsType, data: bytes) -> GoodsScript:
+def load_script(typ: GoodsType, data: Buffer) -> GoodsScript:
     """Load interlocking goods script data.
 
     Arguments:
@@ -56,6 +58,8 @@ def load_script(typ: GoodsType, data: bytes) -> GoodsScript:
     Raises:
         ValueError: Invalid goods type.
     """
+    # VCSX is parsed with many small reads, copying a memoryview once into
+    # BytesIO is cheaper than reading it through a Python file object
     with io.BytesIO(data) as f:
         if typ == GoodsType.CYCLONE:
             return cast(VCSXCycloneScript, VCSXCycloneScript.load(f))
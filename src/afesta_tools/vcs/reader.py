@@ -0,0 +1,330 @@
+"""Concurrent zip member reader module."""
+import contextlib
+import io
+import mmap
+import struct
+import threading
+import zipfile
+import zlib
+from collections.abc import Iterable
+from typing import BinaryIO
+from typing import Union
+from typing import cast
+
+from ..types import PathLike
+
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+_FLAG_ENCRYPTED = 0x1
+
+SUPPORTED_COMPRESSION = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+Buffer = Union[bytes, memoryview]
+
+# buffers up to this size are cheaper to copy than to read without copying
+COPY_MAX_SIZE = 1024 * 1024
+
+
+def _supported(info: zipfile.ZipInfo | None) -> bool:
+    return (
+        info is not None
+        and info.compress_type in SUPPORTED_COMPRESSION
+        and not info.flag_bits & _FLAG_ENCRYPTED
+    )
+
+
+def _check(info: zipfile.ZipInfo, data: Buffer) -> None:
+    if len(data) != info.file_size or zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename}")
+
+
+class BufferReader(io.RawIOBase):
+    """Read-only binary file object over a buffer.
+
+    Unlike `io.BytesIO`, which copies any buffer other than `bytes`, the
+    underlying buffer is shared and only the requested ranges are copied on
+    read.
+    """
+
+    def __init__(self, data: Buffer) -> None:
+        """Construct a reader.
+
+        Arguments:
+            data: Buffer to read.
+        """
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        """Return True."""
+        return True
+
+    def seekable(self) -> bool:
+        """Return True."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Change the current position.
+
+        Arguments:
+            offset: Offset relative to `whence`.
+            whence: ``SEEK_SET``, ``SEEK_CUR`` or ``SEEK_END``.
+
+        Returns:
+            New position.
+
+        Raises:
+            ValueError: Invalid `whence` or negative position.
+        """
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Read up to `size` bytes.
+
+        Arguments:
+            size: Number of bytes to read, or -1 to read until EOF.
+
+        Returns:
+            Data read.
+        """
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        data = self._view[self._pos : end].tobytes()
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        """Read bytes into `buffer`.
+
+        Arguments:
+            buffer: Destination buffer.
+
+        Returns:
+            Number of bytes read.
+        """
+        data = self._view[self._pos : self._pos + len(buffer)]
+        n = len(data)
+        buffer[:n] = data
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        """Release the underlying buffer."""
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def open_buffer(data: Buffer) -> BinaryIO:
+    """Return a binary file object for reading `data`.
+
+    Buffers larger than `COPY_MAX_SIZE` are read without copying them.
+
+    Arguments:
+        data: Buffer to read.
+
+    Returns:
+        File object.
+    """
+    if isinstance(data, bytes) or data.nbytes <= COPY_MAX_SIZE:
+        # BytesIO shares bytes objects until written to
+        return io.BytesIO(data)
+    return cast(BinaryIO, BufferReader(data))
+
+
+class MemberReader:
+    """Thread-safe zip member reader.
+
+    Members are located from a central directory which has already been
+    parsed (i.e. by `zipfile.ZipFile`) and read with positional reads through
+    one file handle per thread, so that concurrent reads of the same archive
+    do not serialize on a shared file position. Only unencrypted stored and
+    deflated members are supported (see `supports`).
+    """
+
+    def __init__(self, filename: PathLike, infos: Iterable[zipfile.ZipInfo]) -> None:
+        """Construct a reader.
+
+        Arguments:
+            filename: Path to zip file.
+            infos: Central directory entries.
+        """
+        self.filename = filename
+        self._infos = {info.filename: info for info in infos}
+        self._local = threading.local()
+        self._files: list[BinaryIO] = []
+        self._files_lock = threading.Lock()
+        self._closed = False
+
+    def supports(self, name: str) -> bool:
+        """Return True if `name` can be read by this reader.
+
+        Arguments:
+            name: Member name.
+
+        Returns:
+            True if `name` is an unencrypted stored or deflated member.
+        """
+        return _supported(self._infos.get(name))
+
+    def _file(self) -> BinaryIO:
+        f: BinaryIO | None = getattr(self._local, "file", None)
+        if f is None:
+            with self._files_lock:
+                if self._closed:
+                    raise ValueError("I/O operation on closed reader")
+                f = open(self.filename, "rb")
+                self._files.append(f)
+            self._local.file = f
+        return f
+
+    def _read_raw(self, info: zipfile.ZipInfo) -> bytes:
+        f = self._file()
+        f.seek(info.header_offset)
+        signature, name_len, extra_len = _LOCAL_HEADER.unpack(
+            f.read(_LOCAL_HEADER.size)
+        )
+        if signature != _LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+        f.seek(name_len + extra_len, 1)
+        return f.read(info.compress_size)
+
+    def read(self, name: str) -> bytes:
+        """Return the contents of a member.
+
+        Arguments:
+            name: Member name.
+
+        Returns:
+            Member data.
+
+        Raises:
+            BadZipFile: Member data is corrupt.
+            KeyError: `name` is not a supported member.
+        """
+        if not self.supports(name):
+            raise KeyError(name)
+        info = self._infos[name]
+        data = self._read_raw(info)
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+        _check(info, data)
+        return data
+
+    def close(self) -> None:
+        """Close all file handles."""
+        with self._files_lock:
+            self._closed = True
+            files, self._files = self._files, []
+        for f in files:
+            f.close()
+
+
+class MmapMemberReader:
+    """Memory-mapped zip member reader.
+
+    The archive is mapped once and members are located from an already
+    parsed central directory. Stored members are returned as zero-copy
+    `memoryview` slices of the mapping and only deflated members are
+    decompressed. Reads are thread-safe. Only unencrypted stored and deflated
+    members are supported (see `supports`).
+
+    Returned views remain valid after `close`, the mapping is released once
+    all views have been released.
+    """
+
+    def __init__(self, filename: PathLike, infos: Iterable[zipfile.ZipInfo]) -> None:
+        """Construct a reader.
+
+        Arguments:
+            filename: Path to zip file.
+            infos: Central directory entries.
+        """
+        self.filename = filename
+        self._infos = {info.filename: info for info in infos}
+        with open(filename, "rb") as f:
+            self._mmap: mmap.mmap | None = mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self._view: memoryview | None = memoryview(self._mmap)
+        # stored members with a valid CRC, so that repeated reads do not touch
+        # every page of the member again
+        self._verified: set[str] = set()
+
+    def supports(self, name: str) -> bool:
+        """Return True if `name` can be read by this reader.
+
+        Arguments:
+            name: Member name.
+
+        Returns:
+            True if `name` is an unencrypted stored or deflated member.
+        """
+        return _supported(self._infos.get(name))
+
+    def read(self, name: str) -> Buffer:
+        """Return the contents of a member.
+
+        Arguments:
+            name: Member name.
+
+        Returns:
+            Member data, a view into the mapping for stored members.
+
+        Raises:
+            BadZipFile: Member data is corrupt.
+            KeyError: `name` is not a supported member.
+            ValueError: This reader has been closed.
+        """
+        if not self.supports(name):
+            raise KeyError(name)
+        view = self._view
+        if view is None:
+            raise ValueError("I/O operation on closed reader")
+        info = self._infos[name]
+        try:
+            signature, name_len, extra_len = _LOCAL_HEADER.unpack_from(
+                view, info.header_offset
+            )
+        except struct.error as e:
+            raise zipfile.BadZipFile(f"Truncated file header for {name}") from e
+        if signature != _LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local file header for {name}")
+        start = info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+        data: Buffer = view[start : start + info.compress_size]
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+            _check(info, data)
+        elif name not in self._verified:
+            _check(info, data)
+            self._verified.add(name)
+        return data
+
+    def close(self) -> None:
+        """Release the mapping.
+
+        The mapping is only unmapped once all views returned by `read` have
+        been released.
+        """
+        view, self._view = self._view, None
+        mapping, self._mmap = self._mmap, None
+        if view is not None:
+            view.release()
+        if mapping is not None:
+            # while still exported, unmapped when the last view is released
+            with contextlib.suppress(BufferError):
+                mapping.close()
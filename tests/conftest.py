@@ -1,11 +1,148 @@
-"""Global test fixtures."""
+"""Global test fixtures and helpers."""
+import io
 import os
-from pathlib import Path
+import zipfile
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from collections.abc import Callable
 from collections.abc import Generator
+from pathlib import Path
+from typing import Any
 
 import pytest
+import pytest_asyncio
 from pytest_mock import MockerFixture
 
+from afesta_tools.lpeg import FourDClient
+from afesta_tools.lpeg.client import BaseLpegClient
+from afesta_tools.lpeg.client import PSListEntry
+
+from .lpeg.test_credentials import TEST_CREDENTIALS
+
+
+TEST_PARAMS_XML = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<params>
+  <system>
+    <title>Title</title>
+    <image>image.jpg</image>
+    <HeadKey ext="1d+">HeadKey1d+.bin</HeadKey>
+    <ChapterControl>ChapterControl.bin</ChapterControl>
+    <Vorze_CycloneSA>Vorze_CycloneSA.bin</Vorze_CycloneSA>
+    <Vorze_Piston>Vorze_Piston.bin</Vorze_Piston>
+    <Vorze_OnaRhythm>Vorze_OnaRhythm.bin</Vorze_OnaRhythm>
+    <projection>FishEye</projection>
+    <DomeAngle>180</DomeAngle>
+    <stereo>1</stereo>
+  </system>
+</params>
+"""
+TEST_CHAPTERS_XML = b"""<?xml version="1.0" encoding="UTF-8" ?>
+<params>
+  <scene time="0" duration="1000" name="Scene 1" />
+  <scene time="1000" duration="2000" file="FOO-002-R2" goto="1" />
+</params>
+"""
+
+
+def list_entry(
+    code: str,
+    file_name: str,
+    id: int = 0,
+    set_num: str = "0",
+    signal: int = 0,
+    **fields: Any,
+) -> dict[str, Any]:
+    """Return a ps_get_list JSON entry."""
+    return {
+        "acters": "",
+        "big_img": "",
+        "categories": "",
+        "code": code,
+        "comment": "",
+        "dl": 1,
+        "favorite": 0,
+        "file_name": file_name,
+        "id": id,
+        "img": "",
+        "maker": "",
+        "quality": "",
+        "release_date": "2023-01-01 00:00:00",
+        "set_num": set_num,
+        "signal": signal,
+        "time": 0,
+        "title": code,
+        "title_all": code,
+        "item_id": "",
+        "ai3d": 0,
+        **fields,
+    }
+
+
+def video(code: str, file_name: str, **fields: Any) -> PSListEntry:
+    """Return a `PSListEntry` parsed from `list_entry` fields."""
+    return PSListEntry.from_dict(list_entry(code, file_name, **fields))
+
+
+def make_vcz(path: Path) -> None:
+    """Write a VCZ archive with nested chapters."""
+    nested = io.BytesIO()
+    with zipfile.ZipFile(nested, "w") as zipf:
+        zipf.writestr("params.xml", TEST_CHAPTERS_XML)
+    with zipfile.ZipFile(path, "w") as zipf:
+        zipf.writestr("params.xml", TEST_PARAMS_XML)
+        zipf.writestr("ChapterControl.bin", nested.getvalue())
+
+
+class FakeLibrary:
+    """Mocked purchase library.
+
+    Attributes:
+        videos: Listed videos (by VR flag).
+        fetched: Number of videos yielded by `get_videos`.
+        limits: `limit` passed to each `get_videos` call.
+    """
+
+    def __init__(
+        self,
+        vr: list[PSListEntry] | None = None,
+        tv: list[PSListEntry] | None = None,
+    ) -> None:
+        """Construct a library."""
+        self.videos = {True: vr or [], False: tv or []}
+        self.fetched = 0
+        self.limits: list[int | None] = []
+
+    async def get_videos(
+        self,
+        vr: bool = True,
+        limit: int | None = None,
+        on_count: Callable[[int], None] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[PSListEntry]:
+        """Yield listed videos like `BaseLpegClient.get_videos`."""
+        self.limits.append(limit)
+        if on_count is not None:
+            on_count(len(self.videos[vr]))
+        for entry in self.videos[vr][:limit]:
+            self.fetched += 1
+            yield entry
+
+
+@pytest.fixture
+def library() -> FakeLibrary:
+    """Fixture for an empty mocked purchase library."""
+    return FakeLibrary()
+
+
+@pytest_asyncio.fixture
+async def library_client(
+    mocker: MockerFixture, library: FakeLibrary
+) -> AsyncGenerator[BaseLpegClient, None]:
+    """Fixture to generate a 4D client listing the mocked `library`."""
+    async with FourDClient(TEST_CREDENTIALS) as client:
+        mocker.patch.object(client, "get_videos", library.get_videos)
+        yield client
+
 
 @pytest.fixture
 def config_dir(tmp_path: Path, mocker: MockerFixture) -> Path:
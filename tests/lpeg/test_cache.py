@@ -0,0 +1,147 @@
+"""Test cases for the metadata cache module."""
+from pathlib import Path
+
+import pytest
+
+from pytest_mock import MockerFixture
+
+from afesta_tools.exceptions import CacheError
+from afesta_tools.lpeg.cache import CacheMode
+from afesta_tools.lpeg.cache import MetadataCache
+from afesta_tools.lpeg.client import BaseLpegClient
+from afesta_tools.lpeg.client import PSListEntry
+from afesta_tools.lpeg.client import PSListType
+
+from ..conftest import FakeLibrary
+from ..conftest import video
+
+
+def _video(i: int) -> PSListEntry:
+    return video(f"st{i}", f"FOO-{i:03}_st.mp4")
+
+
+@pytest.fixture
+def library() -> FakeLibrary:
+    """Fixture for a mocked purchase library."""
+    return FakeLibrary([_video(i) for i in range(3, 0, -1)])
+
+
+def test_store_load(tmp_path: Path) -> None:
+    """Stored listings should round-trip."""
+    cache = MetadataCache(tmp_path / "cache" / "metadata.sqlite3")
+    videos = [_video(i) for i in range(3)]
+    assert cache.load("uid", PSListType.PURCHASES, "JP", True) is None
+    cache.store("uid", PSListType.PURCHASES, "JP", True, videos)
+    cached = cache.load("uid", PSListType.PURCHASES, "JP", True)
+    assert cached is not None
+    assert cached[0] == videos
+    assert cache.load("uid", PSListType.PURCHASES, "JP", False) is None
+    assert cache.load("other", PSListType.PURCHASES, "JP", True) is None
+    cache.clear()
+    assert cache.load("uid", PSListType.PURCHASES, "JP", True) is None
+
+
+async def test_get_videos(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """Fresh listings should be served from the cache."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3", ttl=60)
+    typ = PSListType.PURCHASES
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.fetched == 3
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.fetched == 3
+    assert await cache.get_videos(library_client, typ, mode=CacheMode.REFRESH) == (
+        library.videos[True]
+    )
+    assert library.fetched == 6
+
+
+async def test_get_videos_incremental(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """Expired listings should only fetch new entries."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3", ttl=0)
+    typ = PSListType.PURCHASES
+    await cache.get_videos(library_client, typ)
+    library.videos[True].insert(0, _video(4))
+    library.fetched = 0
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.fetched == 2
+
+
+async def test_get_videos_default(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """Default mode should always check for new entries."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    typ = PSListType.PURCHASES
+    await cache.get_videos(library_client, typ)
+    library.fetched = 0
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.fetched == 1
+    library.videos[True].insert(0, _video(4))
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.fetched == 3
+    page = library_client.LIST_PAGE_SIZE
+    assert library.limits == [None, page, page]
+
+
+async def test_get_videos_default_many_new(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """New entries which do not fit a small page should be fully fetched."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    typ = PSListType.PURCHASES
+    await cache.get_videos(library_client, typ)
+    library.videos[True][:0] = [_video(i) for i in range(6, 3, -1)]
+    library_client.LIST_PAGE_SIZE = 2
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    assert library.limits == [None, 2, None]
+
+
+async def test_get_videos_count_mismatch(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """Listings should be fully re-fetched when entries were removed."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    typ = PSListType.PURCHASES
+    await cache.get_videos(library_client, typ)
+    del library.videos[True][1]
+    library.videos[True].insert(0, _video(4))
+    library.fetched = 0
+    assert await cache.get_videos(library_client, typ) == library.videos[True]
+    # incremental refresh up to the first known entry, then a full listing
+    assert library.fetched == 2 + 3
+
+
+async def test_get_videos_offline(
+    tmp_path: Path, library_client: BaseLpegClient, library: FakeLibrary
+) -> None:
+    """Offline mode should never fetch listings."""
+    cache = MetadataCache(tmp_path / "metadata.sqlite3", ttl=0)
+    typ = PSListType.PURCHASES
+    with pytest.raises(CacheError):
+        await cache.get_videos(library_client, typ, mode=CacheMode.OFFLINE)
+    await cache.get_videos(library_client, typ)
+    library.fetched = 0
+    assert await cache.get_videos(library_client, typ, mode=CacheMode.OFFLINE) == (
+        library.videos[True]
+    )
+    assert library.fetched == 0
+
+
+async def test_find_videos_cached(
+    tmp_path: Path, mocker: MockerFixture, library_client: BaseLpegClient
+) -> None:
+    """FID lookups should use the cache when available."""
+    library_client.cache = MetadataCache(tmp_path / "metadata.sqlite3")
+    list_videos = mocker.spy(library_client, "list_videos")
+    resolved = await library_client._resolve_fid("foo-002")
+    assert resolved.video.code == "st2"
+    assert (await library_client._resolve_fid("foo-003")).video.code == "st3"
+    list_videos.assert_called_once()
+    # a new listing snapshot replaces the resolver
+    await library_client.list_videos()
+    await library_client._resolve_fid("foo-001")
+    assert list_videos.call_count == 3
@@ -1,28 +1,51 @@
 """Test cases for LPEG client module."""
+import asyncio
+import hashlib
 import os
+from dataclasses import fields
 from pathlib import Path
+from typing import Any
+from typing import cast
 from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
 from unittest.mock import ANY
+from unittest.mock import call
 
+import aiohttp
 import pytest
 import pytest_asyncio
+from aioresponses import CallbackResult
 from aioresponses import aioresponses
 from aioresponses.compat import merge_params
 from aioresponses.compat import normalize_url
 from pytest_mock import MockerFixture
 
 from afesta_tools.exceptions import AuthenticationError
+from afesta_tools.exceptions import DownloadError
+from afesta_tools.exceptions import StallError
 from afesta_tools.lpeg import FourDClient
 from afesta_tools.lpeg import VideoQuality
 from afesta_tools.lpeg.client import AP_LOGIN_URL
 from afesta_tools.lpeg.client import AP_REG_URL
 from afesta_tools.lpeg.client import AP_STATUS_CHK_URL
 from afesta_tools.lpeg.client import DL_URL
+from afesta_tools.lpeg.client import PS_GET_LIST_URL
+from afesta_tools.lpeg.client import PSListEntry
 from afesta_tools.lpeg.client import VCS_DL_URL
 from afesta_tools.lpeg.client import BaseLpegClient
 from afesta_tools.lpeg.credentials import BaseCredentials
+from afesta_tools.lpeg.download import ByteRange
+from afesta_tools.lpeg.download import DownloadJournal
+from afesta_tools.lpeg.download import PartFile
+from afesta_tools.lpeg.resolver import FIDResolver
+from afesta_tools.lpeg.retry import RetryPolicy
+from afesta_tools.lpeg.singleflight import SingleFlightStats
+from afesta_tools.manifest import MANIFEST_FILE
+from afesta_tools.manifest import Manifest
+from afesta_tools.manifest import ManifestStore
 from afesta_tools.progress import ProgressCallback
 
+from ..conftest import list_entry
 from .test_credentials import TEST_CREDENTIALS
 
 
@@ -70,6 +93,75 @@ async def test_status_chk(mocker: MockerFixture, client: BaseLpegClient) -> None
     )
 
 
+async def test_status_chk_coalesce(client: BaseLpegClient) -> None:
+    """Identical concurrent requests should be coalesced and memoized."""
+    with aioresponses() as m:
+        m.post(
+            AP_STATUS_CHK_URL,
+            status=200,
+            payload={"data": {}, "reg": 1, "result": 1},
+        )
+        results = await asyncio.gather(*(client.status_chk() for _ in range(3)))
+        assert await client.status_chk() is results[0]
+    assert all(result is results[0] for result in results)
+    assert client.singleflight.stats == SingleFlightStats(hits=1, shared=2, misses=1)
+
+
+async def test_status_chk_retry(client: BaseLpegClient) -> None:
+    """Transient errors should be retried."""
+    client.retry_policy = RetryPolicy(base_delay=0)
+    with aioresponses() as m:
+        m.post(AP_STATUS_CHK_URL, status=503)
+        m.post(
+            AP_STATUS_CHK_URL,
+            status=200,
+            payload={"data": {}, "reg": 1, "result": 1},
+        )
+        assert (await client.status_chk())["reg"] == 1
+    client.singleflight.clear()
+    with aioresponses() as m:
+        m.post(AP_STATUS_CHK_URL, status=403)
+        with pytest.raises(aiohttp.ClientResponseError):
+            await client.status_chk()
+
+
+async def test_download_video_partial_failure(
+    mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Failed parts should not discard successful ones."""
+    video = mocker.Mock(code="abc", set_num=2, num_parts=3, title="Title")
+    video.get_fid.return_value = "FOO"
+    video.get_codes.return_value = ["abc", "abc_1", "abc_2"]
+
+    async def _get_videos(**kwargs: Any) -> AsyncIterator[Any]:
+        yield video
+
+    mocker.patch.object(client, "get_videos", _get_videos)
+    error = OSError("disk full")
+    download_code = mocker.patch.object(
+        client, "_download_code", side_effect=[None, error, None]
+    )
+    with pytest.raises(DownloadError) as excinfo:
+        await client.download_video(fid="FOO")
+    assert download_code.call_count == 3
+    assert excinfo.value.result.succeeded == ["abc", "abc_2"]
+    assert excinfo.value.result.failed == {"abc_1": error}
+
+
+async def test_download_video_resolved(
+    mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Pre-resolved FIDs should not be searched for."""
+    video = PSListEntry.from_dict(list_entry("abc", "FOO-R1_st.mp4", set_num="2"))
+    get_videos = mocker.patch.object(client, "get_videos")
+    download_code = mocker.patch.object(client, "_download_code")
+    resolved = FIDResolver([video]).resolve_all(["foo-r2"])
+    result = await client.download_video(fid="foo-r2", resolved=resolved)
+    get_videos.assert_not_called()
+    download_code.assert_called_once()
+    assert result.succeeded == ["abc_1"]
+
+
 @pytest.mark.parametrize("quality", [None, VideoQuality.H265])
 @pytest.mark.parametrize("with_progress", [True, False])
 async def test_download_video(
@@ -120,6 +212,408 @@ async def test_download_video(
         update.assert_called_with(10)
 
 
+async def test_download_video_segmented(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Large downloads should be split into parallel byte range requests."""
+    mocker.patch.object(client, "MIN_SEGMENT_SIZE", 4)
+    data = bytes(range(32))
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    headers = {
+        "Content-Disposition": 'attachment; filename="foo.mp4"',
+        "Accept-Ranges": "bytes",
+    }
+    ranges = []
+
+    def _range(url: str, **kwargs: Any) -> CallbackResult:
+        value = kwargs.get("headers", {}).get("Range")
+        if value is None:
+            return CallbackResult(
+                status=200,
+                headers={**headers, "Content-Length": str(len(data))},
+                body=data,
+            )
+        ranges.append(value)
+        start, end = (int(x) for x in value[len("bytes=") :].split("-"))
+        body = data[start : end + 1]
+        return CallbackResult(
+            status=206,
+            headers={**headers, "Content-Length": str(len(body))},
+            body=body,
+        )
+
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(redirect, callback=_range, repeat=True)
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir, segments=4)
+    assert sorted(ranges) == ["bytes=16-23", "bytes=24-31", "bytes=8-15"]
+    assert (Path(tmpdir) / "foo.mp4").read_bytes() == data
+    entry = Manifest.load(tmpdir).find(TEST_VIDEO_CODE, VideoQuality.PC_SBS.value)
+    assert entry is not None
+    assert entry.filename == "foo.mp4"
+    assert entry.size == len(data)
+    assert entry.blake2b == hashlib.blake2b(data).hexdigest()
+
+
+async def test_download_video_manifest_skip(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Files recorded in the manifest should not be downloaded again."""
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    get = mocker.spy(client._session, "get")
+    load = mocker.spy(Manifest, "load")
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(
+            redirect,
+            status=200,
+            headers={
+                "Content-Disposition": 'attachment; filename="foo.mp4"',
+                "Content-Length": "10",
+            },
+            body=b"1234567890",
+        )
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+    get.assert_called_once()
+    load.assert_called_once()
+    entry = Manifest.load(tmpdir).find(TEST_VIDEO_CODE, VideoQuality.PC_SBS.value)
+    assert entry is not None
+    assert entry.blake2b == hashlib.blake2b(b"1234567890").hexdigest()
+
+
+async def test_download_video_adopt(tmpdir: Path, client: BaseLpegClient) -> None:
+    """Existing files with the expected size should be adopted."""
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    path = Path(tmpdir) / "foo.mp4"
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect}, repeat=True)
+        m.get(
+            redirect,
+            status=200,
+            headers={
+                "Content-Disposition": 'attachment; filename="foo.mp4"',
+                "Content-Length": "10",
+            },
+            body=b"1234567890",
+            repeat=True,
+        )
+        client.adopt = False
+        path.write_bytes(b"0000000000")
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+        assert path.read_bytes() == b"1234567890"
+        client.manifests = ManifestStore()
+        client.adopt = True
+        path.write_bytes(b"000000000")
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+        assert path.read_bytes() == b"1234567890"
+        client.manifests = ManifestStore()
+        (Path(tmpdir) / MANIFEST_FILE).unlink()
+        path.write_bytes(b"0000000000")
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+    assert path.read_bytes() == b"0000000000"
+    entry = Manifest.load(tmpdir).find(TEST_VIDEO_CODE, VideoQuality.PC_SBS.value)
+    assert entry is not None
+    assert entry.blake2b == hashlib.blake2b(b"0000000000").hexdigest()
+
+
+async def test_download_video_resume(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Interrupted downloads should be resumed with a range request."""
+    data = bytes(range(32))
+    part = Path(tmpdir) / "foo.mp4.part"
+    part.write_bytes(data[:8] + bytes(24))
+    DownloadJournal(
+        key=TEST_VIDEO_CODE,
+        quality=VideoQuality.PC_SBS.value,
+        length=len(data),
+        validator='"abc"',
+        completed=[ByteRange(0, 8)],
+    ).dump(f"{part}.json")
+    headers = {
+        "Content-Disposition": 'attachment; filename="foo.mp4"',
+        "Accept-Ranges": "bytes",
+        "ETag": '"abc"',
+    }
+    ranges = []
+
+    def _range(url: str, **kwargs: Any) -> CallbackResult:
+        value = kwargs.get("headers", {}).get("Range")
+        if value is None:
+            return CallbackResult(
+                status=200,
+                headers={**headers, "Content-Length": str(len(data))},
+                body=data,
+            )
+        assert kwargs["headers"]["If-Range"] == '"abc"'
+        ranges.append(value)
+        return CallbackResult(
+            status=206,
+            headers={**headers, "Content-Length": "24"},
+            body=data[8:],
+        )
+
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(redirect, callback=_range, repeat=True)
+        await client.download_video(TEST_VIDEO_CODE, download_dir=tmpdir)
+    assert ranges == ["bytes=8-31"]
+    assert (Path(tmpdir) / "foo.mp4").read_bytes() == data
+    assert not part.exists()
+    assert not Path(f"{part}.json").exists()
+
+
+async def test_download_video_stall(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Stalled transfers should be resumed with a new range request."""
+    data = bytes(range(32))
+    headers = {
+        "Content-Disposition": 'attachment; filename="foo.mp4"',
+        "Accept-Ranges": "bytes",
+    }
+    ranges = []
+
+    def _range(url: str, **kwargs: Any) -> CallbackResult:
+        value = kwargs.get("headers", {}).get("Range")
+        if value is None:
+            return CallbackResult(
+                status=200,
+                headers={**headers, "Content-Length": str(len(data))},
+                body=data,
+            )
+        ranges.append(value)
+        return CallbackResult(
+            status=206,
+            headers={**headers, "Content-Length": "22"},
+            body=data[10:],
+        )
+
+    write_range = PartFile.write_range
+
+    async def _stall(
+        part: PartFile, content: Any, byte_range: ByteRange, **kwargs: Any
+    ) -> None:
+        if byte_range.start == 0:
+            part.journal.add(ByteRange(0, 10))
+            raise StallError("stalled")
+        await write_range(part, content, byte_range, **kwargs)
+
+    mocker.patch.object(PartFile, "write_range", _stall)
+    progress = ProgressCallback(mocker.MagicMock())
+    stalled = mocker.spy(progress, "stalled")
+    reconnecting = mocker.spy(progress, "reconnecting")
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(redirect, callback=_range, repeat=True)
+        await client.download_video(
+            TEST_VIDEO_CODE, download_dir=tmpdir, progress=progress
+        )
+    assert ranges == ["bytes=10-31"]
+    stalled.assert_called_once_with("stalled")
+    reconnecting.assert_called_once_with(10, 1)
+
+
+class _TruncatedContent:
+    """Response content which fails with a payload error after `limit` bytes."""
+
+    def __init__(self, content: Any, limit: int) -> None:
+        self.content = content
+        self.remaining = limit
+
+    async def read(self, n: int = -1) -> bytes:
+        if self.remaining <= 0:
+            raise aiohttp.ClientPayloadError("Response payload is not completed")
+        data = cast(bytes, await self.content.read(min(n, self.remaining)))
+        self.remaining -= len(data)
+        return data
+
+
+async def test_download_video_payload_error(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Interrupted transfers should be retried from the last written offset."""
+    data = bytes(range(32))
+    headers = {
+        "Content-Disposition": 'attachment; filename="foo.mp4"',
+        "Accept-Ranges": "bytes",
+        "ETag": '"abc"',
+    }
+    ranges = []
+
+    def _range(url: str, **kwargs: Any) -> CallbackResult:
+        value = kwargs.get("headers", {}).get("Range")
+        if value is None:
+            return CallbackResult(
+                status=200,
+                headers={**headers, "Content-Length": str(len(data))},
+                body=data,
+            )
+        ranges.append(value)
+        if len(ranges) == 1:
+            return CallbackResult(status=503, reason="Service Unavailable")
+        start = int(value[len("bytes=") : value.index("-")])
+        return CallbackResult(
+            status=206,
+            headers={**headers, "Content-Length": str(len(data) - start)},
+            body=data[start:],
+        )
+
+    write_range = PartFile.write_range
+
+    async def _truncate(
+        part: PartFile, content: Any, byte_range: ByteRange, **kwargs: Any
+    ) -> None:
+        if byte_range.start == 0:
+            content = _TruncatedContent(content, 12)
+        await write_range(part, content, byte_range, **kwargs)
+
+    mocker.patch.object(PartFile, "write_range", _truncate)
+    client.retry_policy = RetryPolicy(base_delay=0)
+    delay = mocker.spy(RetryPolicy, "delay")
+    progress = ProgressCallback(mocker.MagicMock())
+    reconnecting = mocker.spy(progress, "reconnecting")
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(redirect, callback=_range, repeat=True)
+        await client.download_video(
+            TEST_VIDEO_CODE, download_dir=tmpdir, progress=progress
+        )
+    assert ranges == ["bytes=12-31", "bytes=12-31"]
+    assert [c.args[-1] for c in delay.call_args_list] == [1, 2]
+    reconnecting.assert_has_calls([call(12, 1), call(12, 2)])
+    assert (Path(tmpdir) / "foo.mp4").read_bytes() == data
+    entry = Manifest.load(tmpdir).find(TEST_VIDEO_CODE, VideoQuality.PC_SBS.value)
+    assert entry is not None
+    assert entry.blake2b == hashlib.blake2b(data).hexdigest()
+
+
+class _TrickleContent:
+    """Response content which returns one byte every `interval` seconds."""
+
+    def __init__(self, content: Any, interval: float) -> None:
+        self.content = content
+        self.interval = interval
+        self.sent = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        await asyncio.sleep(self.interval)
+        data = cast(bytes, await self.content.read(1))
+        self.sent += len(data)
+        return data
+
+
+async def test_download_video_min_rate(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Transfers slower than min_rate should be resumed with a new request."""
+    data = bytes(range(32))
+    headers = {
+        "Content-Disposition": 'attachment; filename="foo.mp4"',
+        "Accept-Ranges": "bytes",
+    }
+    ranges = []
+
+    def _range(url: str, **kwargs: Any) -> CallbackResult:
+        value = kwargs.get("headers", {}).get("Range")
+        if value is None:
+            return CallbackResult(
+                status=200,
+                headers={**headers, "Content-Length": str(len(data))},
+                body=data,
+            )
+        ranges.append(value)
+        start = int(value[len("bytes=") : value.index("-")])
+        return CallbackResult(
+            status=206,
+            headers={**headers, "Content-Length": str(len(data) - start)},
+            body=data[start:],
+        )
+
+    write_range = PartFile.write_range
+    trickles = []
+
+    async def _trickle(
+        part: PartFile, content: Any, byte_range: ByteRange, **kwargs: Any
+    ) -> None:
+        if byte_range.start == 0:
+            content = _TrickleContent(content, 0.01)
+            trickles.append(content)
+        await write_range(part, content, byte_range, **kwargs)
+
+    mocker.patch.object(PartFile, "write_range", _trickle)
+    client.min_rate = 1000
+    client.stall_timeout = 0.05
+    progress = ProgressCallback(mocker.MagicMock())
+    stalled = mocker.spy(progress, "stalled")
+    params = {
+        "op": 1,
+        "type": VideoQuality.PC_SBS.value,
+        "code": TEST_VIDEO_CODE,
+        "pid": TEST_CREDENTIALS.pid,
+    }
+    with aioresponses() as m:
+        redirect = "http://vr00.lpeg.jp/mp4sbs_dl.php?fid=abc123&status=123"
+        url = normalize_url(merge_params(DL_URL, params=params))
+        m.get(url, status=303, headers={"Location": redirect})
+        m.get(redirect, callback=_range, repeat=True)
+        await client.download_video(
+            TEST_VIDEO_CODE, download_dir=tmpdir, progress=progress
+        )
+    sent = trickles[0].sent
+    assert 0 < sent < len(data)
+    assert ranges == [f"bytes={sent}-31"]
+    stalled.assert_called_once()
+    assert stalled.call_args.args[0].startswith("Transfer rate fell to")
+    assert (Path(tmpdir) / "foo.mp4").read_bytes() == data
+
+
 async def test_download_vcz(
     tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
 ) -> None:
@@ -158,6 +652,88 @@ async def test_download_vcz(
     update.assert_called_with(10)
 
 
+async def test_download_vcz_gzip(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Content-encoded downloads should not be truncated to Content-Length."""
+    progress = ProgressCallback(mocker.MagicMock())
+    set_total = mocker.spy(progress, "set_total")
+    params = {"pid": TEST_CREDENTIALS.pid, "fid": "foo_sbs"}
+    # aiohttp decodes the body, Content-Length is the encoded size
+    body = b"1234567890" * 100
+    with aioresponses() as m:
+        url = normalize_url(merge_params(VCS_DL_URL, params=params))
+        m.post(
+            AP_STATUS_CHK_URL,
+            status=200,
+            payload={"data": {}, "reg": 0, "result": 1},
+        )
+        m.get(
+            url,
+            status=200,
+            headers={
+                "Content-Disposition": 'attachment; filename="foo.vcz"',
+                "Content-Encoding": "gzip",
+                "Content-Length": "30",
+                "Accept-Ranges": "bytes",
+            },
+            body=body,
+        )
+        await client.download_vcz("foo_sbs", download_dir=tmpdir, progress=progress)
+    assert (Path(tmpdir) / "foo.vcz").read_bytes() == body
+    set_total.assert_not_called()
+    entry = Manifest.load(tmpdir).find("foo_sbs")
+    assert entry is not None
+    assert entry.size == len(body)
+
+
+async def test_download_vcz_status_reuse(
+    tmpdir: Path, mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Player status should be checked once and re-checked on auth errors."""
+    status = []
+
+    def _status(url: str, **kwargs: Any) -> CallbackResult:
+        status.append(url)
+        return CallbackResult(payload={"data": {}, "reg": 0, "result": 1})
+
+    def _url(fid: str) -> str:
+        params = {"pid": TEST_CREDENTIALS.pid, "fid": fid}
+        return str(normalize_url(merge_params(VCS_DL_URL, params=params)))
+
+    headers = {"Content-Length": "3"}
+    with aioresponses() as m:
+        m.post(AP_STATUS_CHK_URL, callback=_status, repeat=True)
+        for fid in ("foo", "bar", "baz"):
+            m.get(
+                _url(fid),
+                headers={
+                    "Content-Disposition": f'attachment; filename="{fid}.vcz"',
+                    **headers,
+                },
+                body=b"vcz",
+            )
+        await asyncio.gather(
+            *(client.download_vcz(fid, download_dir=tmpdir) for fid in ("foo", "bar"))
+        )
+        client.singleflight.clear()
+        await client.download_vcz("baz", download_dir=tmpdir)
+        assert len(status) == 1
+
+        m.get(_url("qux"), status=403, reason="Forbidden")
+        m.get(
+            _url("qux"),
+            headers={
+                "Content-Disposition": 'attachment; filename="qux.vcz"',
+                **headers,
+            },
+            body=b"vcz",
+        )
+        await client.download_vcz("qux", download_dir=tmpdir)
+        assert len(status) == 2
+    assert (Path(tmpdir) / "qux.vcz").read_bytes() == b"vcz"
+
+
 async def test_register_player(
     mocker: MockerFixture, client_noauth: BaseLpegClient
 ) -> None:
@@ -201,3 +777,226 @@ async def test_register_player(
     post.assert_called_once_with(AP_LOGIN_URL, data=login_payload)
     assert creds == TEST_CREDENTIALS
     assert client_noauth.creds == TEST_CREDENTIALS
+
+
+@pytest.mark.parametrize("limit", [None, 50, 10])
+async def test_get_videos(
+    mocker: MockerFixture, client: BaseLpegClient, limit: int | None
+) -> None:
+    """Pages should be fetched concurrently and yielded in order."""
+    mocker.patch.object(client, "LIST_PAGE_SIZE", 8)
+    mocker.patch.object(client, "LIST_MAX_PAGE_SIZES", ())
+    mocker.patch.object(client, "LIST_WINDOW", 2)
+    count = 30
+    active = max_active = 0
+    pages = []
+
+    async def _page(url: str, **kwargs: Any) -> CallbackResult:
+        nonlocal active, max_active
+        page = kwargs["data"]["page"]
+        num = kwargs["data"]["num"]
+        pages.append(page)
+        active += 1
+        max_active = max(active, max_active)
+        # later pages respond faster
+        await asyncio.sleep(0.01 * (4 - page))
+        active -= 1
+        data = [
+            list_entry(f"st{i}", f"FOO-{i:03}_st.mp4", id=i - page * num)
+            for i in range(page * num, min((page + 1) * num, count))
+        ]
+        return CallbackResult(
+            payload={
+                "page": {"count": count, "pagecount": 3, "pageindex": page},
+                "data": data,
+            }
+        )
+
+    with aioresponses() as m:
+        m.post(PS_GET_LIST_URL, callback=_page, repeat=True)
+        counts: list[int] = []
+        videos = client.get_videos(limit=limit, on_count=counts.append)
+        codes = [video.code async for video in videos]
+    n = count if limit is None else min(count, limit)
+    assert codes == [f"st{i}" for i in range(n)]
+    assert counts == [count]
+    assert sorted(pages) == list(range(-(-n // 8)))
+    if n > 16:
+        assert max_active == 2
+
+
+def test_pslist_entry() -> None:
+    """Entries should be compact and compute derived values once."""
+    d = list_entry("abc", "FOO-001-R1_st.mp4", set_num="2")
+    d.update(
+        acters="Foo, Bar",
+        categories="Baz",
+        comment="a &amp; b<BR>c",
+        title_all="【4K匠】ＦＯＯ",
+    )
+    video = PSListEntry.from_dict(d)
+    other = PSListEntry.from_dict(list_entry("def", "BAR.mp4") | {"acters": "Foo"})
+    assert not hasattr(video, "__dict__")
+    assert video.acters == ("Foo", "Bar")
+    assert video.acters[0] is other.acters[0]
+    assert video.categories == ("Baz",)
+    assert video.comment == "a & b\nc"
+    listed = PSListEntry(
+        **{
+            **{f.name: getattr(video, f.name) for f in fields(video) if f.init},
+            "acters": ["Foo", "Bar"],
+            "categories": ["Baz"],
+        }
+    )
+    assert listed == video
+    assert video.title_clean == "FOO"
+    assert video.title_clean is video.title_clean
+    assert video.get_fid() == "FOO-001"
+    assert video.get_fid(2) == "FOO-001-R2"
+    assert other.get_fid() == "BAR"
+    with pytest.raises(ValueError):
+        video.get_fid(4)
+
+
+def test_pslist_entry_compat() -> None:
+    """Entries should still be constructed with a decoded comment."""
+    video = PSListEntry.from_dict(
+        list_entry("abc", "FOO_st.mp4", acters="Foo", comment="a &amp; b<BR>c")
+    )
+    d = {f.name: getattr(video, f.name) for f in fields(video) if f.init}
+    del d["comment_html"]
+    old = PSListEntry(**d, comment="a & b\nc")
+    assert old == video
+    assert old.comment == "a & b\nc"
+    args = (d.pop("acters"), d.pop("big_img"), d.pop("categories"), d.pop("code"))
+    assert PSListEntry(*args, "a &amp; b<BR>c", **d) == video
+    with pytest.raises(TypeError):
+        PSListEntry(*args, **d)
+
+
+@pytest.mark.parametrize(
+    "server_max, reject, consistent, expected",
+    [
+        (1000, False, True, 64),
+        (20, False, True, 20),
+        (8, True, True, 8),
+        (20, False, False, 8),
+    ],
+)
+async def test_get_videos_page_size(
+    mocker: MockerFixture,
+    client: BaseLpegClient,
+    server_max: int,
+    reject: bool,
+    consistent: bool,
+    expected: int,
+) -> None:
+    """Larger page sizes should be negotiated and remembered."""
+    mocker.patch.object(client, "LIST_PAGE_SIZE", 8)
+    mocker.patch.object(client, "LIST_MAX_PAGE_SIZES", (64, 16))
+    count = 100
+    requests = []
+
+    def _page(url: str, **kwargs: Any) -> CallbackResult:
+        page = kwargs["data"]["page"]
+        num = kwargs["data"]["num"]
+        requests.append((page, num))
+        if num > server_max and reject:
+            return CallbackResult(status=400, reason="Bad Request")
+        num = min(num, server_max)
+        data = [
+            list_entry(f"st{i}", f"FOO-{i:03}_st.mp4", id=i - page * num)
+            for i in range(page * num, min((page + 1) * num, count))
+        ]
+        pagecount = -(-count // (num if consistent else 8)) - 1
+        return CallbackResult(
+            payload={
+                "page": {"count": count, "pagecount": pagecount, "pageindex": page},
+                "data": data,
+            }
+        )
+
+    with aioresponses() as m:
+        m.post(PS_GET_LIST_URL, callback=_page, repeat=True)
+        codes = [video.code async for video in client.get_videos()]
+        assert codes == [f"st{i}" for i in range(count)]
+        requests.clear()
+        client.singleflight.clear()
+        codes = [video.code async for video in client.get_videos()]
+        assert codes == [f"st{i}" for i in range(count)]
+    assert {num for _, num in requests} == {expected}
+    assert sorted(page for page, _ in requests) == list(range(-(-count // expected)))
+
+
+async def test_get_videos_page_size_probe_error(
+    mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Page size probes should not be retried."""
+    mocker.patch.object(client, "LIST_PAGE_SIZE", 8)
+    mocker.patch.object(client, "LIST_MAX_PAGE_SIZES", (64, 16))
+    sleep = mocker.patch("asyncio.sleep")
+    requests = []
+
+    def _page(url: str, **kwargs: Any) -> CallbackResult:
+        num = kwargs["data"]["num"]
+        requests.append(num)
+        if num > 8 or len(requests) == 3:
+            return CallbackResult(status=503, reason="Service Unavailable")
+        data = [list_entry(f"st{i}", f"FOO-{i:03}_st.mp4", id=i) for i in range(4)]
+        return CallbackResult(
+            payload={
+                "page": {"count": 4, "pagecount": 0, "pageindex": 0},
+                "data": data,
+            }
+        )
+
+    with aioresponses() as m:
+        m.post(PS_GET_LIST_URL, callback=_page, repeat=True)
+        codes = [video.code async for video in client.get_videos()]
+    assert codes == [f"st{i}" for i in range(4)]
+    # only the fallback page size request is retried
+    assert requests == [64, 16, 8, 8]
+    sleep.assert_called_once()
+
+
+async def test_get_videos_page_size_small_listing(
+    mocker: MockerFixture, client: BaseLpegClient
+) -> None:
+    """Page sizes should not be remembered from a listing which fits one page."""
+    mocker.patch.object(client, "LIST_PAGE_SIZE", 8)
+    mocker.patch.object(client, "LIST_MAX_PAGE_SIZES", (64, 16))
+    server_max = 20
+    counts = {"vr": 100, "non": 10}
+
+    def _page(url: str, **kwargs: Any) -> CallbackResult:
+        page = kwargs["data"]["page"]
+        num = min(kwargs["data"]["num"], server_max)
+        count = counts[kwargs["data"]["vr"]]
+        data = [
+            list_entry(f"st{i}", f"FOO-{i:03}_st.mp4", id=i - page * num)
+            for i in range(page * num, min((page + 1) * num, count))
+        ]
+        return CallbackResult(
+            payload={
+                "page": {
+                    "count": count,
+                    "pagecount": -(-count // num) - 1,
+                    "pageindex": page,
+                },
+                "data": data,
+            }
+        )
+
+    with aioresponses() as m:
+        m.post(PS_GET_LIST_URL, callback=_page, repeat=True)
+        codes = [video.code async for video in client.get_videos(vr=False)]
+        assert codes == [f"st{i}" for i in range(10)]
+        assert not client._list_page_size
+        codes = [video.code async for video in client.get_videos(vr=True)]
+        assert codes == [f"st{i}" for i in range(100)]
+        assert client._list_page_size == server_max
+        # small requests (i.e. incremental cache refreshes) use small pages
+        post = mocker.spy(client._session, "post")
+        videos = client.get_videos(vr=True, limit=8)
+        assert [video.code async for video in videos] == [f"st{i}" for i in range(8)]
+        assert post.call_args.kwargs["data"]["num"] == 8
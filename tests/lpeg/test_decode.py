@@ -0,0 +1,17 @@
+"""Test cases for the JSON decoding module."""
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.lpeg import decode
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_loads(mocker: MockerFixture, fast: bool) -> None:
+    """Payloads with raw control characters should be decoded."""
+    if not fast:
+        mocker.patch.object(decode, "orjson", None)
+    assert decode.loads(b'{"a": [1, "\\u3042"]}') == {"a": [1, "あ"]}
+    assert decode.loads('{"a": "b\tc\nd"}') == {"a": "b\tc\nd"}
+    assert decode.loads('{"a": "b\tc\nd"}'.encode()) == {"a": "b\tc\nd"}
+    with pytest.raises(ValueError):
+        decode.loads(b"{")
@@ -0,0 +1,102 @@
+"""Test cases for the LPEG download module."""
+import asyncio
+from pathlib import Path
+
+import aiohttp
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.exceptions import StallError
+
+from afesta_tools.lpeg.download import ByteRange
+from afesta_tools.lpeg.download import DownloadJournal
+from afesta_tools.lpeg.download import StallWatchdog
+from afesta_tools.lpeg.download import iter_adaptive
+from afesta_tools.lpeg.download import split_ranges
+
+
+def test_split_ranges() -> None:
+    """Ranges should be contiguous and evenly sized."""
+    assert split_ranges(0, 10, 3) == [
+        ByteRange(0, 4),
+        ByteRange(4, 7),
+        ByteRange(7, 10),
+    ]
+    assert split_ranges(5, 7, 4) == [ByteRange(5, 6), ByteRange(6, 7)]
+    assert ByteRange(8, 16).header == "bytes=8-15"
+
+
+def test_journal_ranges() -> None:
+    """Completed ranges should be merged."""
+    journal = DownloadJournal(key="foo", length=100)
+    journal.add(ByteRange(50, 60))
+    journal.add(ByteRange(0, 10))
+    journal.add(ByteRange(10, 20))
+    journal.add(ByteRange(55, 70))
+    assert journal.completed == [ByteRange(0, 20), ByteRange(50, 70)]
+    assert journal.bytes_completed == 40
+    assert journal.remaining() == [ByteRange(20, 50), ByteRange(70, 100)]
+
+
+def test_journal_dump_load(tmp_path: Path) -> None:
+    """Journal should round-trip through disk."""
+    path = tmp_path / "foo.mp4.part.json"
+    assert DownloadJournal.load(path) is None
+    journal = DownloadJournal(
+        key="foo", quality="h264", length=100, validator='"etag"'
+    )
+    journal.add(ByteRange(0, 10))
+    journal.dump(path)
+    loaded = DownloadJournal.load(path)
+    assert loaded == journal
+    assert loaded is not None and loaded.matches(journal)
+    assert not loaded.matches(DownloadJournal(key="foo", quality="h264", length=10))
+
+
+async def test_iter_adaptive(mocker: MockerFixture) -> None:
+    """Read size should grow while reads are filled."""
+    content = aiohttp.StreamReader(
+        mocker.Mock(_reading_paused=False), 2**16, loop=asyncio.get_running_loop()
+    )
+    content.feed_data(bytes(100))
+    content.feed_eof()
+    sizes = [len(chunk) async for chunk in iter_adaptive(content, 4, 32, limit=90)]
+    assert sizes == [4, 8, 16, 32, 30]
+
+
+async def test_watchdog(mocker: MockerFixture) -> None:
+    """Stalled reads should raise StallError."""
+    content = aiohttp.StreamReader(
+        mocker.Mock(_reading_paused=False), 2**16, loop=asyncio.get_running_loop()
+    )
+    content.feed_data(bytes(10))
+    watchdog = StallWatchdog(min_rate=1, period=0.05)
+    assert len(await watchdog.read(content, 100)) == 10
+    with pytest.raises(StallError):
+        await watchdog.read(content, 100)
+
+
+async def test_watchdog_min_rate(mocker: MockerFixture) -> None:
+    """Reads below min_rate should raise StallError once the period ends."""
+    content = aiohttp.StreamReader(
+        mocker.Mock(_reading_paused=False), 2**16, loop=asyncio.get_running_loop()
+    )
+    loop = asyncio.get_running_loop()
+    for i in range(1, 20):
+        loop.call_later(i * 0.01, content.feed_data, b"x")
+    watchdog = StallWatchdog(min_rate=1000, period=0.05)
+    with pytest.raises(StallError, match="Transfer rate fell to"):
+        while True:
+            await watchdog.read(content, 100)
+
+
+async def test_watchdog_period_end(mocker: MockerFixture) -> None:
+    """Waiting past the end of a period should not stall a fast transfer."""
+    content = aiohttp.StreamReader(
+        mocker.Mock(_reading_paused=False), 2**16, loop=asyncio.get_running_loop()
+    )
+    content.feed_data(bytes(1000))
+    asyncio.get_running_loop().call_later(0.08, content.feed_data, bytes(10))
+    watchdog = StallWatchdog(min_rate=100, period=0.05)
+    assert len(await watchdog.read(content, 1000)) == 1000
+    assert len(await watchdog.read(content, 1000)) == 10
@@ -0,0 +1,68 @@
+"""Test cases for the rate limiting module."""
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from afesta_tools.lpeg.ratelimit import RateLimiter
+from afesta_tools.lpeg.ratelimit import parse_rate
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", None),
+        ("0", None),
+        ("100", 100),
+        ("500K", 500 * 1024),
+        ("10m", 10 * 1024**2),
+        ("1.5GiB", 1.5 * 1024**3),
+    ],
+)
+def test_parse_rate(value: str, expected: float | None) -> None:
+    """Rates should be parsed with binary units."""
+    assert parse_rate(value) == expected
+
+
+def test_parse_rate_invalid() -> None:
+    """Invalid rates should raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_rate("fast")
+
+
+async def test_unlimited() -> None:
+    """Unlimited acquire should not wait."""
+    limiter = RateLimiter()
+    start = time.monotonic()
+    await limiter.acquire(1024**3)
+    assert time.monotonic() - start < 0.1
+
+
+async def test_acquire() -> None:
+    """Concurrent acquires should share the configured rate fairly."""
+    limiter = RateLimiter(RateLimiter.MIN_BURST * 10)
+    done: list[int] = []
+
+    async def _transfer(i: int) -> None:
+        for _ in range(2):
+            await limiter.acquire(RateLimiter.MIN_BURST)
+        done.append(i)
+
+    start = time.monotonic()
+    await asyncio.gather(*(_transfer(i) for i in range(2)))
+    assert 0.3 < time.monotonic() - start < 1
+    assert sorted(done) == [0, 1]
+
+
+async def test_watch(tmp_path: Path) -> None:
+    """Rate should follow the control file."""
+    path = tmp_path / "rate"
+    limiter = RateLimiter(1024)
+    task = asyncio.create_task(limiter.watch(path, interval=0.01))
+    await asyncio.sleep(0.02)
+    assert limiter.rate == 1024
+    path.write_text("10M")
+    await asyncio.sleep(0.05)
+    assert limiter.rate == 10 * 1024**2
+    task.cancel()
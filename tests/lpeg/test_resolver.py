@@ -0,0 +1,37 @@
+"""Test cases for the FID resolver module."""
+import pytest
+
+from afesta_tools.exceptions import BadFIDError
+from afesta_tools.lpeg.client import PSListEntry
+from afesta_tools.lpeg.resolver import FIDResolver
+from afesta_tools.lpeg.resolver import ResolvedFID
+
+from ..conftest import list_entry
+
+
+SINGLE = PSListEntry.from_dict(list_entry("st1", "FOO-001_st.mp4"))
+MULTI = PSListEntry.from_dict(list_entry("st2", "BAR-002-R1_st.mp4", set_num="2"))
+DUPLICATE = PSListEntry.from_dict(list_entry("st3", "FOO-001_st.mp4"))
+
+
+def test_resolve() -> None:
+    """Videos and parts should be resolved by FID."""
+    resolver = FIDResolver([SINGLE, MULTI])
+    assert resolver.resolve("FOO-001") == ResolvedFID(SINGLE)
+    assert resolver.resolve("bar-002") == ResolvedFID(MULTI)
+    assert resolver.resolve("BAR-002").codes == ["st2", "st2_1", "st2_2"]
+    assert resolver.resolve("BAR-002-R2") == ResolvedFID(MULTI, (2,))
+    assert resolver.resolve("BAR-002-Part3").codes == ["st2_2"]
+    with pytest.raises(BadFIDError):
+        resolver.resolve("BAZ-003")
+
+
+def test_resolve_ambiguous() -> None:
+    """Ambiguous FIDs should not be resolved."""
+    resolver = FIDResolver([SINGLE, DUPLICATE, MULTI])
+    assert "FOO-001" not in resolver
+    with pytest.raises(BadFIDError):
+        resolver.resolve("FOO-001")
+    assert resolver.resolve_all(["FOO-001", "BAR-002", "BAZ-003"]) == {
+        "BAR-002": ResolvedFID(MULTI)
+    }
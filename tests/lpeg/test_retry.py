@@ -0,0 +1,60 @@
+"""Test cases for the request retry module."""
+import asyncio
+
+import aiohttp
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.exceptions import AuthenticationError
+from afesta_tools.exceptions import StallError
+from afesta_tools.lpeg.retry import RetryPolicy
+
+
+def _response_error(status: int) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    "exc, retryable",
+    [
+        (_response_error(503), True),
+        (_response_error(429), True),
+        (_response_error(403), False),
+        (aiohttp.ClientPayloadError(), True),
+        (aiohttp.ServerDisconnectedError(), True),
+        (ConnectionResetError(), True),
+        (asyncio.TimeoutError(), True),
+        (StallError(), True),
+        (AuthenticationError(), False),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable(exc: BaseException, retryable: bool) -> None:
+    """Errors should be classified as retryable or fatal."""
+    assert RetryPolicy.is_retryable(exc) == retryable
+
+
+def test_delay() -> None:
+    """Delays should back off exponentially up to max_delay."""
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+    assert [policy.delay(i) for i in range(1, 5)] == [1, 2, 4, 5]
+    policy = RetryPolicy(base_delay=1, jitter=0.5)
+    assert 0.5 <= policy.delay(1) <= 1
+
+
+async def test_call(mocker: MockerFixture) -> None:
+    """Retryable errors should be retried up to max_attempts."""
+    policy = RetryPolicy(max_attempts=3, base_delay=0)
+    func = mocker.AsyncMock(side_effect=[ConnectionResetError(), "ok"])
+    assert await policy.call(func) == "ok"
+    assert func.call_count == 2
+
+    func = mocker.AsyncMock(side_effect=ConnectionResetError())
+    with pytest.raises(ConnectionResetError):
+        await policy.call(func)
+    assert func.call_count == 3
+
+    func = mocker.AsyncMock(side_effect=ValueError())
+    with pytest.raises(ValueError):
+        await policy.call(func)
+    assert func.call_count == 1
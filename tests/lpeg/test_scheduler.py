@@ -0,0 +1,92 @@
+"""Test cases for the download scheduler module."""
+import asyncio
+from functools import partial
+
+import pytest
+
+from afesta_tools.lpeg.scheduler import DownloadScheduler
+
+
+async def test_max_jobs() -> None:
+    """Active jobs should not exceed the global cap."""
+    scheduler = DownloadScheduler(max_jobs=2)
+    peak = 0
+
+    async def _job(i: int) -> int:
+        nonlocal peak
+        peak = max(peak, scheduler.active)
+        await asyncio.sleep(0.01)
+        return i
+
+    results = await asyncio.gather(
+        *(scheduler.submit(partial(_job, i)) for i in range(6))
+    )
+    assert results == list(range(6))
+    assert peak == 2
+    assert scheduler.active == 0
+
+
+async def test_priority() -> None:
+    """Queued jobs should start in priority order."""
+    scheduler = DownloadScheduler(max_jobs=1)
+    started = []
+    gate = asyncio.Event()
+
+    async def _job(name: str) -> None:
+        started.append(name)
+        await gate.wait()
+
+    first = asyncio.create_task(scheduler.submit(lambda: _job("first")))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(scheduler.submit(lambda: _job("low"), priority=1)),
+        asyncio.create_task(scheduler.submit(lambda: _job("high"), priority=0)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.pending == 2
+    gate.set()
+    await asyncio.gather(first, *tasks)
+    assert started == ["first", "high", "low"]
+
+
+async def test_per_host() -> None:
+    """Jobs for a busy host should not block other hosts."""
+    scheduler = DownloadScheduler(max_jobs=2, max_jobs_per_host=1)
+    gate = asyncio.Event()
+    started = []
+
+    async def _job(name: str) -> None:
+        started.append(name)
+        await gate.wait()
+
+    tasks = [
+        asyncio.create_task(scheduler.submit(lambda: _job("a1"), host="a")),
+        asyncio.create_task(scheduler.submit(lambda: _job("a2"), host="a")),
+        asyncio.create_task(scheduler.submit(lambda: _job("b1"), host="b")),
+    ]
+    await asyncio.sleep(0.01)
+    assert started == ["a1", "b1"]
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert started == ["a1", "b1", "a2"]
+
+
+async def test_cancel_pending() -> None:
+    """Cancelled queued jobs should be dropped."""
+    scheduler = DownloadScheduler(max_jobs=1)
+    gate = asyncio.Event()
+
+    async def _job() -> None:
+        await gate.wait()
+
+    running = asyncio.create_task(scheduler.submit(_job))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(scheduler.submit(_job))
+    await asyncio.sleep(0)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    gate.set()
+    await running
+    assert scheduler.active == 0
+    assert scheduler.pending == 0
@@ -0,0 +1,115 @@
+"""Test cases for the catalog search module."""
+from datetime import date
+
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.exceptions import CacheError
+from afesta_tools.lpeg.client import PSListEntry
+from afesta_tools.lpeg.search import CatalogIndex
+from afesta_tools.lpeg.search import SearchQuery
+
+from ..conftest import video
+
+
+FOO = video(
+    "st1",
+    "FOO-001_st.mp4",
+    acters="女優A, 女優B",
+    categories="主観, 美少女",
+    title_all="【8KVR】ＦＯＯ タイトル",
+    release_date="2023-01-01 10:00:00",
+    time=3600,
+    signal=1,
+)
+BAR = video(
+    "st2",
+    "BAR-002-R1_st.mp4",
+    acters="女優B",
+    categories="主観",
+    title_all="Bar タイトル",
+    release_date="2023-06-01 10:00:00",
+    time=7200,
+    set_num="2",
+)
+BAZ = video(
+    "st3",
+    "BAZ-003_st.mp4",
+    title_all="baz",
+    release_date="2024-01-01 10:00:00",
+    time=1800,
+    ai3d=1,
+)
+
+
+@pytest.fixture
+def index() -> CatalogIndex:
+    """Return an index of test videos."""
+    return CatalogIndex([FOO, BAR, BAZ])
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (SearchQuery(), [FOO, BAR, BAZ]),
+        (SearchQuery(actresses=["女優B"]), [FOO, BAR]),
+        (SearchQuery(actresses=["女優A", "女優B"]), [FOO]),
+        (SearchQuery(actresses=["女優C"]), []),
+        (SearchQuery(genres=["主観"]), [FOO, BAR]),
+        (SearchQuery(genres=["主観"], parts=3), [BAR]),
+        (SearchQuery(parts=1), [FOO, BAZ]),
+        (SearchQuery(title="foo"), [FOO]),
+        (SearchQuery(title="8kvr"), [FOO]),
+        (SearchQuery(title="タイトル"), [FOO, BAR]),
+        (SearchQuery(title="イト"), [FOO, BAR]),
+        (SearchQuery(title="a"), [BAR, BAZ]),
+        (SearchQuery(title="bar タイトル"), [BAR]),
+        (SearchQuery(title="baz タイトル"), []),
+        (SearchQuery(released_after=date(2023, 6, 1)), [BAR, BAZ]),
+        (SearchQuery(released_before=date(2023, 6, 1)), [FOO, BAR]),
+        (
+            SearchQuery(
+                released_after=date(2023, 1, 2), released_before=date(2023, 12, 31)
+            ),
+            [BAR],
+        ),
+        (SearchQuery(min_duration=3600), [FOO, BAR]),
+        (SearchQuery(max_duration=3600), [FOO, BAZ]),
+        (SearchQuery(signal=True), [FOO]),
+        (SearchQuery(signal=False), [BAR, BAZ]),
+        (SearchQuery(ai3d=True), [BAZ]),
+        (SearchQuery(ai3d=False, signal=False), [BAR]),
+    ],
+)
+def test_search(
+    index: CatalogIndex, query: SearchQuery, expected: list[PSListEntry]
+) -> None:
+    """Videos matching all criteria should be returned in listing order."""
+    assert index.search(query) == expected
+
+
+def test_index(index: CatalogIndex) -> None:
+    """Indexed values should be normalized."""
+    assert len(index) == 3
+    assert index.actresses == ["女優a", "女優b"]
+    assert index.genres == ["主観", "美少女"]
+
+
+async def test_from_client(mocker: MockerFixture) -> None:
+    """Listings which are not cached should be skipped when indexing both."""
+    client = mocker.Mock()
+
+    async def _list_videos(lang: str, vr: bool) -> list[PSListEntry]:
+        if not vr:
+            raise CacheError
+        return [FOO]
+
+    client.list_videos = _list_videos
+    index = await CatalogIndex.from_client(client)
+    assert index.videos == [FOO]
+    with pytest.raises(CacheError):
+        await CatalogIndex.from_client(client, vr=False)
+
+    client.list_videos = mocker.AsyncMock(side_effect=CacheError)
+    with pytest.raises(CacheError):
+        await CatalogIndex.from_client(client)
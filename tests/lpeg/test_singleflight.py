@@ -0,0 +1,91 @@
+"""Test cases for the request coalescing module."""
+import asyncio
+from functools import partial
+
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.lpeg.singleflight import SingleFlight
+from afesta_tools.lpeg.singleflight import SingleFlightStats
+
+
+async def test_coalesce() -> None:
+    """Concurrent identical calls should share one call."""
+    calls = []
+    event = asyncio.Event()
+
+    async def _call(value: int) -> int:
+        calls.append(value)
+        await event.wait()
+        return value
+
+    flight: SingleFlight[int] = SingleFlight()
+    tasks = [
+        asyncio.create_task(flight.do(key, partial(_call, key)))
+        for key in (1, 1, 2, 1)
+    ]
+    await asyncio.sleep(0)
+    event.set()
+    assert await asyncio.gather(*tasks) == [1, 1, 2, 1]
+    assert calls == [1, 2]
+    assert flight.stats == SingleFlightStats(hits=0, shared=2, misses=2)
+
+    # not memoized without a ttl
+    assert await flight.do(1, lambda: _call(3)) == 3
+
+
+async def test_memoize(mocker: MockerFixture) -> None:
+    """Successful results should be memoized until they expire."""
+    monotonic = mocker.patch("time.monotonic", return_value=0.0)
+    flight: SingleFlight[int] = SingleFlight(ttl=5)
+
+    async def _call(value: int) -> int:
+        return value
+
+    assert await flight.do("foo", lambda: _call(1)) == 1
+    monotonic.return_value = 4.0
+    assert await flight.do("foo", lambda: _call(2)) == 1
+    monotonic.return_value = 5.0
+    assert await flight.do("foo", lambda: _call(3)) == 3
+    flight.forget("foo")
+    assert await flight.do("foo", lambda: _call(4)) == 4
+    assert flight.stats == SingleFlightStats(hits=1, shared=0, misses=3)
+
+
+async def test_failure() -> None:
+    """Failures should be shared but not memoized."""
+    event = asyncio.Event()
+
+    async def _fail() -> int:
+        await event.wait()
+        raise ValueError
+
+    async def _ok() -> int:
+        return 1
+
+    flight: SingleFlight[int] = SingleFlight(ttl=60)
+    tasks = [asyncio.create_task(flight.do("foo", _fail)) for _ in range(2)]
+    await asyncio.sleep(0)
+    event.set()
+    for task in tasks:
+        with pytest.raises(ValueError):
+            await task
+    assert await flight.do("foo", _ok) == 1
+
+
+async def test_cancel() -> None:
+    """Cancelling one caller should not cancel the shared call."""
+    event = asyncio.Event()
+
+    async def _call() -> int:
+        await event.wait()
+        return 1
+
+    flight: SingleFlight[int] = SingleFlight()
+    first = asyncio.create_task(flight.do("foo", _call))
+    second = asyncio.create_task(flight.do("foo", _call))
+    await asyncio.sleep(0)
+    first.cancel()
+    event.set()
+    assert await second == 1
+    assert first.cancelled()
@@ -0,0 +1,50 @@
+"""Test cases for the background file writer module."""
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.lpeg.writer import AsyncFileWriter
+
+
+async def test_write(tmp_path: Path) -> None:
+    """Coalesced buffers should be written at the requested offset."""
+    path = tmp_path / "foo.bin"
+    path.write_bytes(bytes(16))
+    async with AsyncFileWriter(path, offset=4, buffer_size=3, queue_size=1) as w:
+        for i in range(1, 9):
+            await w.write(bytes([i]))
+    assert w.offset == 12
+    assert path.read_bytes() == bytes(4) + bytes(range(1, 9)) + bytes(4)
+
+
+async def test_write_error(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Worker errors should be raised to the writer."""
+    path = tmp_path / "foo.bin"
+    path.write_bytes(b"")
+    writer = AsyncFileWriter(path, buffer_size=1)
+    mocker.patch.object(writer, "_write_at", side_effect=OSError)
+    with pytest.raises(OSError):
+        async with writer:
+            for _ in range(8):
+                await writer.write(b"a")
+    assert writer.offset == 0
+
+
+async def test_write_no_copy(tmp_path: Path) -> None:
+    """Bytes chunks should be written without being copied."""
+    path = tmp_path / "foo.bin"
+    path.write_bytes(b"")
+    chunks: list[bytes | bytearray] = [b"foo", b"bar", bytearray(b"baz")]
+    written: list[tuple[int, bytes]] = []
+    writer = AsyncFileWriter(
+        path, buffer_size=4, on_write=lambda o, d: written.append((o, d))
+    )
+    async with writer:
+        for chunk in chunks:
+            await writer.write(chunk)
+    assert path.read_bytes() == b"foobarbaz"
+    assert [offset for offset, _ in written] == [0, 3, 6]
+    assert written[0][1] is chunks[0]
+    assert written[1][1] is chunks[1]
+    assert written[2][1] == b"baz"
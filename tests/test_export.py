@@ -0,0 +1,102 @@
+"""Test cases for the export module."""
+import asyncio
+import io
+import json
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+
+import pytest
+
+from afesta_tools.export import ExportFormat
+from afesta_tools.export import export_entries
+from afesta_tools.lpeg.client import PSListEntry
+
+from .conftest import video
+
+
+FOO = video("st1", "FOO-001_st.mp4", acters="女優A, 女優B", signal=1)
+BAR = video("st2", "BAR-002-R1_st.mp4", set_num="1", title="Bar,\t2")
+
+
+class _Stream(io.StringIO):
+    """Records stream contents on each flush."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.flushed: list[str] = []
+
+    def flush(self) -> None:
+        self.flushed.append(self.getvalue())
+
+
+async def _pages(*pages: Iterable[PSListEntry]) -> AsyncIterator[PSListEntry]:
+    for page in pages:
+        # simulate waiting on the next page response
+        await asyncio.sleep(0)
+        for entry in page:
+            yield entry
+
+
+async def test_export_jsonl() -> None:
+    """Entries should be written as JSON lines."""
+    stream = _Stream()
+    count = await export_entries(
+        _pages([FOO, BAR]), stream, fields=["fid", "acters", "signal", "release_date"]
+    )
+    assert count == 2
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {
+            "fid": "FOO-001",
+            "acters": ["女優A", "女優B"],
+            "signal": True,
+            "release_date": "2023-01-01T00:00:00+09:00",
+        },
+        {
+            "fid": "BAR-002",
+            "acters": [],
+            "signal": False,
+            "release_date": "2023-01-01T00:00:00+09:00",
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    "fmt, expected",
+    [
+        (
+            ExportFormat.CSV,
+            'fid,code,title,num_parts,acters,signal\n'
+            'FOO-001,st1,st1,,"女優A, 女優B",1\n'
+            'BAR-002,st2,"Bar,\t2",2,,0\n',
+        ),
+        (
+            ExportFormat.TSV,
+            "fid\tcode\ttitle\tnum_parts\tacters\tsignal\n"
+            "FOO-001\tst1\tst1\t\t女優A, 女優B\t1\n"
+            'BAR-002\tst2\t"Bar,\t2"\t2\t\t0\n',
+        ),
+    ],
+)
+async def test_export_csv(fmt: ExportFormat, expected: str) -> None:
+    """Entries should be written as delimited rows with a header."""
+    stream = _Stream()
+    await export_entries(
+        _pages([FOO, BAR]),
+        stream,
+        fmt=fmt,
+        fields=["fid", "code", "title", "num_parts", "acters", "signal"],
+    )
+    assert stream.getvalue() == expected
+
+
+async def test_export_flush() -> None:
+    """The stream should be flushed after each page."""
+    stream = _Stream()
+    await export_entries(_pages([FOO, BAR], [FOO], [BAR]), stream, fields=["code"])
+    assert [value.count("\n") for value in stream.flushed] == [2, 3, 4]
+
+
+async def test_export_unknown_field() -> None:
+    """Unknown fields should be rejected."""
+    with pytest.raises(ValueError):
+        await export_entries(_pages([FOO]), _Stream(), fields=["fid", "foo"])
@@ -1,16 +1,34 @@
 """Test cases for the __main__ module."""
+import asyncio
+from collections.abc import AsyncIterator
+import io
+import zipfile
 from pathlib import Path
+from typing import Any
+from typing import cast
 from unittest.mock import ANY
 from unittest.mock import call
 
 import pytest
+from a10sa_script.script import VCSXCycloneScript
 from click.testing import CliRunner
 from pytest_mock import MockerFixture
 
 from afesta_tools import __main__
 from afesta_tools.config import dump_credentials
+from afesta_tools.exceptions import CacheError
 from afesta_tools.lpeg.client import FourDClient
+from afesta_tools.lpeg.client import PSListEntry
+from afesta_tools.lpeg.ratelimit import RateLimiter
+from afesta_tools.lpeg.resolver import ResolvedFID
+from afesta_tools.manifest import Manifest
+from afesta_tools.manifest import ManifestEntry
+from afesta_tools.manifest import hash_file
+from afesta_tools.progress import ProgressCallback
+from afesta_tools.vcs import VCZArchive
 
+from .conftest import list_entry
+from .conftest import make_vcz
 from .lpeg.test_credentials import TEST_CREDENTIALS
 
 
@@ -73,15 +91,173 @@ def test_dl(
 ) -> None:
     """Should download specified videos."""
     download_video = mocker.patch.object(FourDClient, "download_video")
+    foo = PSListEntry.from_dict(list_entry("st1", "FOO-001_st.mp4"))
+    list_videos = mocker.patch.object(
+        FourDClient, "list_videos", side_effect=[[foo], []]
+    )
+    dump_credentials(TEST_CREDENTIALS)
+    runner.invoke(__main__.dl, ["foo-001", "bar"])
+    assert list_videos.call_count == 2
+    resolved = {"foo-001": ResolvedFID(foo)}
+    download_video.assert_has_calls(
+        [
+            call(fid="foo-001", lang="JP", resolved=resolved, progress=ANY),
+            call(fid="bar", lang="JP", resolved=resolved, progress=ANY),
+        ],
+        any_order=True,
+    )
+
+
+def test_dl_host_jobs(
+    runner: CliRunner, mocker: MockerFixture, config_dir: Path, wdir: Path
+) -> None:
+    """Per-endpoint transfer cap should be passed to the client."""
+    download_video = mocker.patch.object(FourDClient, "download_video", autospec=True)
+    dump_credentials(TEST_CREDENTIALS)
+    runner.invoke(__main__.dl, ["-c", "--jobs", "4", "--host-jobs", "2", "st1"])
+    client = download_video.call_args.args[0]
+    assert client.scheduler.max_jobs == 4
+    assert client.scheduler.max_jobs_per_host == 2
+    assert client.adopt
+    runner.invoke(__main__.dl, ["-c", "--no-adopt", "st1"])
+    assert not download_video.call_args.args[0].adopt
+
+
+def test_dl_progress(
+    runner: CliRunner, mocker: MockerFixture, config_dir: Path, wdir: Path
+) -> None:
+    """Pbars should only be created once a transfer reports progress."""
+    tqdm = mocker.patch.object(__main__, "tqdm")
+
+    async def _download_video(
+        code: str, progress: ProgressCallback, **kwargs: Any
+    ) -> None:
+        progress.set_desc(code)
+        if code == "st2":
+            progress.update(1)
+
+    mocker.patch.object(FourDClient, "download_video", side_effect=_download_video)
+    dump_credentials(TEST_CREDENTIALS)
+    result = runner.invoke(__main__.dl, ["-c", "st1", "st2"])
+    assert result.exit_code == 0
+    tqdm.assert_called_once()
+    pbar = tqdm.return_value
+    pbar.set_description.assert_called_once_with("st2")
+    pbar.update.assert_called_once_with(1)
+    pbar.close.assert_called_once()
+
+
+def test_dl_rate_limit(
+    runner: CliRunner, mocker: MockerFixture, config_dir: Path, wdir: Path
+) -> None:
+    """Rate options should be parsed and the rate file watched during transfers."""
+    rates: list[tuple[float | None, float | None]] = []
+    watchers: list[asyncio.Task[Any]] = []
+    watch = RateLimiter.watch
+
+    async def _watch(self: RateLimiter, path: Path, interval: float = 1) -> None:
+        watchers.append(cast(asyncio.Task[Any], asyncio.current_task()))
+        await watch(self, path, interval)
+
+    async def _download_video(client: FourDClient, **kwargs: Any) -> None:
+        # let the rate file watcher run
+        await asyncio.sleep(0)
+        rates.append((client.rate_limiter.rate, client.transfer_rate_limit))
+
+    mocker.patch.object(RateLimiter, "watch", _watch)
+    mocker.patch.object(
+        FourDClient, "download_video", autospec=True, side_effect=_download_video
+    )
+    dump_credentials(TEST_CREDENTIALS)
+    args = ["-c", "--limit-rate", "2M", "--file-limit-rate", "500K", "st1"]
+    result = runner.invoke(__main__.dl, args)
+    assert result.exit_code == 0
+    assert rates == [(2 * 1024**2, 500 * 1024)]
+    assert not watchers
+
+    (wdir / "rate").write_text("1M", encoding="utf-8")
+    rates.clear()
+    result = runner.invoke(__main__.dl, [*args, "--rate-file", "rate"])
+    assert result.exit_code == 0
+    assert rates == [(1024**2, 500 * 1024)]
+    assert len(watchers) == 1
+    assert watchers[0].cancelled()
+
+    result = runner.invoke(__main__.dl, ["-c", "--limit-rate", "2X", "st1"])
+    assert result.exit_code == 2
+    assert "Invalid rate: 2X" in result.output
+
+
+def test_dl_stdin(
+    runner: CliRunner, mocker: MockerFixture, config_dir: Path, wdir: Path
+) -> None:
+    """Should download videos read from stdin."""
+    download_video = mocker.patch.object(FourDClient, "download_video")
     dump_credentials(TEST_CREDENTIALS)
-    runner.invoke(__main__.dl, ["foo", "bar"])
+    runner.invoke(
+        __main__.dl,
+        ["-c", "-"],
+        input="st1: Foo\n  Parts: 2\n\nst2: Bar\nst1: Foo\n",
+    )
     download_video.assert_has_calls(
         [
-            call(fid="foo", lang="JP", progress=ANY),
-            call(fid="bar", lang="JP", progress=ANY),
+            call(code="st1", lang="JP", progress=ANY),
+            call(code="st2", lang="JP", progress=ANY),
         ],
         any_order=True,
     )
+    assert download_video.call_count == 2
+
+
+def test_list_format(
+    runner: CliRunner, mocker: MockerFixture, config_dir: Path
+) -> None:
+    """Should stream machine-readable records."""
+    foo = PSListEntry.from_dict(list_entry("st1", "FOO-001_st.mp4"))
+
+    async def get_videos(*args: Any, **kwargs: Any) -> AsyncIterator[PSListEntry]:
+        yield foo
+
+    mocker.patch.object(FourDClient, "get_videos", side_effect=get_videos)
+    list_videos = mocker.patch.object(FourDClient, "list_videos", return_value=[foo])
+    dump_credentials(TEST_CREDENTIALS)
+    result = runner.invoke(__main__.list, ["-f", "csv", "--fields", "fid,code"])
+    assert result.output == "fid,code\nFOO-001,st1\n"
+    list_videos.assert_not_called()
+
+    result = runner.invoke(
+        __main__.list, ["-f", "jsonl", "--fields", "code", "--offline"]
+    )
+    assert result.output == '{"code": "st1"}\n'
+    list_videos.assert_called_once()
+
+    result = runner.invoke(__main__.list, ["-f", "jsonl", "--fields", "code,foo"])
+    assert result.exit_code != 0
+    assert "unknown field(s): foo" in result.output
+
+
+def test_search(runner: CliRunner, mocker: MockerFixture, config_dir: Path) -> None:
+    """Should search the cached listing."""
+    foo = PSListEntry.from_dict(list_entry("st1", "FOO-001_st.mp4"))
+    bar = PSListEntry.from_dict(list_entry("st2", "BAR-002_st.mp4", signal=1))
+    list_videos = mocker.patch.object(
+        FourDClient, "list_videos", side_effect=[[foo], [bar]]
+    )
+    new_client = mocker.spy(__main__, "_new_client")
+    dump_credentials(TEST_CREDENTIALS)
+    result = runner.invoke(__main__.search, ["--goods"])
+    assert result.output == "BAR-002: st2\n"
+    assert list_videos.call_count == 2
+    new_client.assert_called_once_with(ANY, cache_mode="offline")
+
+    # only the VR listing cached by 'afesta list'
+    list_videos.side_effect = [[bar], CacheError]
+    result = runner.invoke(__main__.search, ["--goods"])
+    assert result.output == "BAR-002: st2\n"
+
+    list_videos.side_effect = CacheError
+    result = runner.invoke(__main__.search, ["--tv"])
+    assert "run with --refresh" in result.output
 
 
 def test_dl_no_login(
@@ -92,3 +268,37 @@ def test_dl_no_login(
     result = runner.invoke(__main__.dl)
     assert "No credentials found" in result.output
     download_video.assert_not_called()
+
+
+def test_extract_script(
+    runner: CliRunner,
+    mocker: MockerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """It should extract scripts from memory-mapped archives."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "FOO-001.vcz"
+    make_vcz(path)
+    script = io.BytesIO()
+    VCSXCycloneScript([]).dump(script)
+    with zipfile.ZipFile(path, "a") as zipf:
+        zipf.writestr("Vorze_CycloneSA.bin", script.getvalue())
+    vcz_open = mocker.spy(VCZArchive, "open")
+    result = runner.invoke(__main__.cli, ["extract-script", str(path)])
+    assert result.exit_code == 0
+    assert (tmp_path / "FOO-001_cyclone.csv").exists()
+    vcz_open.assert_called_once_with(str(path), mmap=True)
+
+
+def test_verify(runner: CliRunner, tmp_path: Path) -> None:
+    """It should report files which do not match the manifest."""
+    (tmp_path / "foo.mp4").write_bytes(b"foo")
+    Manifest.record(
+        tmp_path, ManifestEntry("foo.mp4", 3, hash_file(tmp_path / "foo.mp4"), "st1")
+    )
+    result = runner.invoke(__main__.cli, ["verify", str(tmp_path)])
+    assert f"OK: {tmp_path / 'foo.mp4'}" in result.output
+    (tmp_path / "foo.mp4").write_bytes(b"bar")
+    result = runner.invoke(__main__.cli, ["verify", str(tmp_path)])
+    assert "HASH MISMATCH" in result.output
@@ -0,0 +1,153 @@
+"""Test cases for the manifest module."""
+import asyncio
+import hashlib
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from afesta_tools.manifest import MANIFEST_FILE
+from afesta_tools.manifest import Manifest
+from afesta_tools.manifest import ManifestEntry
+from afesta_tools.manifest import ManifestStore
+from afesta_tools.manifest import VerifyStatus
+from afesta_tools.manifest import hash_file
+
+
+def _entry(path: Path, data: bytes, code: str) -> ManifestEntry:
+    path.write_bytes(data)
+    return ManifestEntry(
+        filename=path.name,
+        size=len(data),
+        blake2b=hashlib.blake2b(data).hexdigest(),
+        code=code,
+    )
+
+
+def test_hash_file(tmp_path: Path) -> None:
+    """Partial hashes should resume from an existing hash state."""
+    path = tmp_path / "foo"
+    path.write_bytes(b"1234567890")
+    assert hash_file(path) == hashlib.blake2b(b"1234567890").hexdigest()
+    hasher = hashlib.blake2b(b"1234")
+    assert hash_file(path, 4, hasher) == hashlib.blake2b(b"1234567890").hexdigest()
+
+
+def test_manifest_record(tmp_path: Path) -> None:
+    """Recorded entries should be saved and reloaded."""
+    assert not Manifest.load(tmp_path).entries
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    bar = _entry(tmp_path / "bar.vcz", b"bar", "fid1")
+    Manifest.record(tmp_path, foo)
+    Manifest.record(tmp_path, bar)
+    assert (tmp_path / MANIFEST_FILE).exists()
+    manifest = Manifest.load(tmp_path)
+    assert manifest.entries == {"foo.mp4": foo, "bar.vcz": bar}
+    assert manifest.find("st1") == foo
+    assert manifest.find("st1", "h265") is None
+    assert manifest.is_present(foo)
+    assert not manifest.is_present(foo, size=4)
+    (tmp_path / "foo.mp4").unlink()
+    assert not manifest.is_present(foo)
+
+
+def test_manifest_load_invalid(tmp_path: Path) -> None:
+    """Invalid manifest files should be backed up instead of overwritten."""
+    path = tmp_path / MANIFEST_FILE
+    path.write_text("{", encoding="utf-8")
+    manifest = Manifest.load(tmp_path)
+    assert not manifest.entries
+    assert manifest.corrupt
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    Manifest.record(tmp_path, foo)
+    assert (tmp_path / f"{MANIFEST_FILE}.bak").read_text(encoding="utf-8") == "{"
+    manifest = Manifest.load(tmp_path)
+    assert manifest.entries == {"foo.mp4": foo}
+    assert not manifest.corrupt
+
+    path.write_text("[]", encoding="utf-8")
+    assert Manifest.load(tmp_path).corrupt
+
+
+def test_manifest_load_entries(tmp_path: Path) -> None:
+    """Unknown keys should be ignored and invalid records skipped."""
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    d = asdict(foo)
+    del d["filename"]
+    files = {"foo.mp4": {**d, "new_field": 1}, "bar.mp4": {"size": 3}, "baz.mp4": 1}
+    (tmp_path / MANIFEST_FILE).write_text(
+        json.dumps({"version": 1, "files": files}), encoding="utf-8"
+    )
+    manifest = Manifest.load(tmp_path)
+    assert manifest.entries == {"foo.mp4": foo}
+    assert manifest.corrupt
+
+
+async def test_manifest_commit_corrupt(tmp_path: Path) -> None:
+    """Files corrupted by other writers should be backed up on commit."""
+    manifest = Manifest.load(tmp_path)
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    await manifest.commit(foo)
+    (tmp_path / MANIFEST_FILE).write_text("{", encoding="utf-8")
+    bar = _entry(tmp_path / "bar.mp4", b"bar", "st2")
+    await manifest.commit(bar)
+    assert (tmp_path / f"{MANIFEST_FILE}.bak").exists()
+    assert Manifest.load(tmp_path).entries == {"foo.mp4": foo, "bar.mp4": bar}
+
+
+async def test_manifest_verify(tmp_path: Path) -> None:
+    """Files should be re-hashed and compared against the manifest."""
+    manifest = Manifest(tmp_path)
+    for name in ("ok", "missing", "size", "hash"):
+        manifest.entries[name] = _entry(tmp_path / name, b"1234", name)
+    (tmp_path / "missing").unlink()
+    (tmp_path / "size").write_bytes(b"12345")
+    (tmp_path / "hash").write_bytes(b"4321")
+    results = {
+        entry.filename: status
+        for entry, status in await manifest.verify(max_workers=2)
+    }
+    assert results == {
+        "ok": VerifyStatus.OK,
+        "missing": VerifyStatus.MISSING,
+        "size": VerifyStatus.SIZE_MISMATCH,
+        "hash": VerifyStatus.HASH_MISMATCH,
+    }
+
+
+def test_manifest_add(tmp_path: Path) -> None:
+    """Replaced entries should be re-indexed."""
+    manifest = Manifest(tmp_path)
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    manifest.add(foo)
+    bar = _entry(tmp_path / "foo.mp4", b"bar", "st2")
+    manifest.add(bar)
+    assert manifest.entries == {"foo.mp4": bar}
+    assert manifest.find("st1") is None
+    assert manifest.find("st2") is bar
+
+
+async def test_manifest_store(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Manifests should be loaded once and concurrent commits batched."""
+    store = ManifestStore()
+    load = mocker.spy(Manifest, "load")
+    save = mocker.spy(Manifest, "save")
+    manifest = await store.get(tmp_path)
+    assert await store.get(tmp_path) is manifest
+    entries = [_entry(tmp_path / f"{i}.mp4", b"foo", f"st{i}") for i in range(4)]
+    await asyncio.gather(*(store.record(tmp_path, entry) for entry in entries))
+    load.assert_called_once()
+    assert save.call_count == 2
+    assert Manifest.load(tmp_path).entries == {e.filename: e for e in entries}
+
+
+async def test_manifest_commit_merge(tmp_path: Path) -> None:
+    """Entries saved by other writers should not be dropped."""
+    manifest = Manifest.load(tmp_path)
+    foo = _entry(tmp_path / "foo.mp4", b"foo", "st1")
+    bar = _entry(tmp_path / "bar.mp4", b"bar", "st2")
+    Manifest.record(tmp_path, foo)
+    await manifest.commit(bar)
+    assert manifest.find("st1") == foo
+    assert Manifest.load(tmp_path).entries == {"foo.mp4": foo, "bar.mp4": bar}
@@ -2,8 +2,10 @@
 from collections.abc import Generator
 
 import pytest
+from pytest_mock import MockerFixture
 from tqdm import tqdm
 
+from afesta_tools.progress import LazyProgressCallback
 from afesta_tools.progress import ProgressCallback
 
 
@@ -40,3 +42,21 @@ def test_update(pbar: PbarFixture, n: int | float) -> None:
     assert pbar.n == n  # type: ignore[attr-defined]
     progress.update(n)
     assert pbar.n == 2 * n  # type: ignore[attr-defined]
+
+
+def test_lazy(mocker: MockerFixture) -> None:
+    """Lazy callback should only create its pbar once progress is reported."""
+    factory = mocker.Mock(side_effect=tqdm)
+    progress = LazyProgressCallback(factory)
+    progress.set_desc("foo")
+    progress.close()
+    factory.assert_not_called()
+    started = progress.started
+    progress.update(1)
+    factory.assert_called_once_with()
+    assert (started, progress.started) == (False, True)
+    assert progress.pbar.desc == "foo: "
+    assert progress.pbar.n == 1
+    progress.set_desc("bar")
+    assert progress.pbar.desc == "bar: "
+    progress.close()
@@ -0,0 +1,72 @@
+"""Test cases for the sync module."""
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from afesta_tools.lpeg import VideoQuality
+from afesta_tools.lpeg.client import BaseLpegClient
+from afesta_tools.manifest import Manifest
+from afesta_tools.manifest import ManifestEntry
+from afesta_tools.sync import LibrarySync
+from afesta_tools.sync import SyncItem
+from afesta_tools.sync import SyncItemType
+
+from .conftest import FakeLibrary
+from .conftest import video
+
+
+@pytest.fixture
+def library() -> FakeLibrary:
+    """Fixture for a mocked purchase library."""
+    return FakeLibrary(
+        vr=[
+            video("vr1", "FOO-001-R1_st.mp4", set_num="1", signal=1),
+            video("vr2", "BAR-002_st.mp4"),
+        ],
+        tv=[video("tv1", "BAZ-003_st.mp4")],
+    )
+
+
+async def test_sync_plan(tmp_path: Path, library_client: BaseLpegClient) -> None:
+    """Only files missing from the manifest should be planned."""
+    (tmp_path / "bar.mp4").write_bytes(b"bar")
+    Manifest.record(
+        tmp_path,
+        ManifestEntry("bar.mp4", 3, "", "vr2", quality=VideoQuality.PC_SBS.value),
+    )
+    sync = LibrarySync(library_client, tmp_path)
+    items = await sync.plan()
+    assert [(item.typ, item.key) for item in items] == [
+        (SyncItemType.VIDEO, "vr1"),
+        (SyncItemType.VIDEO, "vr1_1"),
+        (SyncItemType.VCZ, "FOO-001-R1"),
+        (SyncItemType.VCZ, "FOO-001-R2"),
+        (SyncItemType.VIDEO, "tv1"),
+    ]
+    sync = LibrarySync(library_client, tmp_path, quality=VideoQuality.H265, vcz=False)
+    assert [item.key for item in await sync.plan()] == ["vr1", "vr1_1", "vr2", "tv1"]
+
+
+async def test_sync_run(
+    tmp_path: Path, mocker: MockerFixture, library_client: BaseLpegClient
+) -> None:
+    """Items should be downloaded and failures collected."""
+    error = OSError("disk full")
+    download_video = mocker.patch.object(
+        library_client, "download_video", side_effect=[None, error]
+    )
+    download_vcz = mocker.patch.object(library_client, "download_vcz")
+    sync = LibrarySync(library_client, tmp_path)
+    items = [
+        SyncItem(SyncItemType.VIDEO, "vr1", "FOO-001", "vr1"),
+        SyncItem(SyncItemType.VIDEO, "vr1_1", "FOO-001", "vr1"),
+        SyncItem(SyncItemType.VCZ, "FOO-001-R1", "FOO-001-R1", "vr1"),
+    ]
+    result = await sync.run(items)
+    assert result.succeeded == ["vr1", "FOO-001-R1"]
+    assert result.failed == {"vr1_1": error}
+    assert download_video.call_count == 2
+    download_vcz.assert_called_once_with(
+        "FOO-001-R1", download_dir=tmp_path, progress=None
+    )
@@ -1,33 +1,31 @@
 """Tests for the VCS archive module."""
+import asyncio
+import io
+import zipfile
 from collections.abc import AsyncGenerator
+from pathlib import Path
+from threading import get_ident
 from typing import cast
 from unittest.mock import MagicMock
 
 import pytest
 import pytest_asyncio
+from a10sa_script.script import VCSXCycloneScript
 from lxml import etree  # noqa: S410
 from pytest_mock import MockerFixture
 
+from afesta_tools.vcs import ARCHIVE_CACHE
+from afesta_tools.vcs import ArchiveCache
+from afesta_tools.vcs import ChapterControl
 from afesta_tools.vcs import GoodsType
+from afesta_tools.vcs import Scene
 from afesta_tools.vcs import VCZArchive
+from afesta_tools.vcs import archive
+from afesta_tools.vcs.reader import MmapMemberReader
 
-
-TEST_PARAMS_XML = b"""<?xml version="1.0" encoding="UTF-8" ?>
-<params>
-  <system>
-    <title>Title</title>
-    <image>image.jpg</image>
-    <HeadKey ext="1d+">HeadKey1d+.bin</HeadKey>
-    <ChapterControl>ChapterControl.bin</ChapterControl>
-    <Vorze_CycloneSA>Vorze_CycloneSA.bin</Vorze_CycloneSA>
-    <Vorze_Piston>Vorze_Piston.bin</Vorze_Piston>
-    <Vorze_OnaRhythm>Vorze_OnaRhythm.bin</Vorze_OnaRhythm>
-    <projection>FishEye</projection>
-    <DomeAngle>180</DomeAngle>
-    <stereo>1</stereo>
-  </system>
-</params>
-"""
+from ..conftest import TEST_CHAPTERS_XML
+from ..conftest import TEST_PARAMS_XML
+from ..conftest import make_vcz
 
 
 @pytest.fixture
@@ -60,7 +58,7 @@ async def vcz(
             "Vorze_OnaRhythm.bin",
         ]
     )
-    async with VCZArchive("foo.vcz") as vcz:
+    async with await VCZArchive.open("foo.vcz") as vcz:
         yield vcz
 
 
@@ -78,6 +76,31 @@ def test_invalid_no_system(mocker: MockerFixture, zmock: MagicMock) -> None:
         VCZArchive("foo.vcz")
 
 
+async def test_open_invalid(mocker: MockerFixture, zmock: MagicMock) -> None:
+    """Async open should fail."""
+    zmock.getinfo = mocker.Mock(side_effect=KeyError)
+    with pytest.raises(ValueError):
+        await VCZArchive.open("foo.vcz")
+
+
+async def test_open_thread(mocker: MockerFixture, zmock: MagicMock) -> None:
+    """Archive should be opened and closed outside of the event loop thread."""
+    threads = []
+    params = etree.fromstring(TEST_PARAMS_XML)  # noqa: S320
+    zmock.getinfo = mocker.Mock(side_effect=lambda name: threads.append(get_ident()))
+    zmock.close = mocker.Mock(side_effect=lambda: threads.append(get_ident()))
+    fromstring = mocker.patch(
+        "lxml.etree.fromstring", return_value=etree.Element("params")
+    )
+    with pytest.raises(ValueError):
+        await VCZArchive.open("foo.vcz")
+    fromstring.return_value = params
+    vcz = await VCZArchive.open("foo.vcz")
+    await vcz.close()
+    assert len(threads) == 3
+    assert get_ident() not in threads
+
+
 async def test_init(vcz: VCZArchive) -> None:
     """Params should be initialized."""
     assert vcz.title == "Title"
@@ -112,3 +135,162 @@ async def test_read_script(
     load_script = mocker.patch("afesta_tools.vcs.archive.load_script")
     await vcz.read_script(typ)
     load_script.assert_called_with(typ, b"data")
+
+
+async def test_chapter_control(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Nested chapters should be parsed in memory and memoized."""
+    path = tmp_path / "FOO-002-R1.vcz"
+    make_vcz(path)
+    temp_file = mocker.patch("tempfile.TemporaryFile")
+    async with await VCZArchive.open(path) as vcz:
+        read = mocker.spy(vcz, "read_buffer")
+        chapters = await vcz.chapter_control()
+        assert await vcz.chapter_control() is chapters
+    assert chapters == ChapterControl(
+        [
+            Scene(time=0, duration=1000, name="Scene 1", file=None, goto=None),
+            Scene(time=1000, duration=2000, name=None, file="FOO-002-R2", goto="1"),
+        ]
+    )
+    read.assert_called_once_with("ChapterControl")
+    temp_file.assert_not_called()
+
+
+def test_chapter_control_buffer(mocker: MockerFixture) -> None:
+    """Nested chapter buffers should be released after parsing."""
+    mocker.patch("afesta_tools.vcs.reader.COPY_MAX_SIZE", 0)
+    nested = io.BytesIO()
+    with zipfile.ZipFile(nested, "w") as zipf:
+        zipf.writestr("params.xml", TEST_CHAPTERS_XML)
+    open_buffer = mocker.spy(archive, "open_buffer")
+    data = memoryview(bytearray(nested.getvalue()))
+    chapters = VCZArchive._parse_chapter_control(data)
+    assert len(chapters.scenes) == 2
+    assert open_buffer.spy_return.closed
+
+
+async def test_file_offsets(mocker: MockerFixture, tmp_path: Path) -> None:
+    """External part offsets should only use the shared cache when requested."""
+    for part in ("R1", "R2"):
+        make_vcz(tmp_path / f"FOO-002-{part}.vcz")
+    async with await VCZArchive.open(tmp_path / "FOO-002-R1.vcz") as vcz:
+        chapters = await vcz.chapter_control()
+    assert chapters is not None
+    cache_open = mocker.spy(ARCHIVE_CACHE, "open")
+    assert await chapters.file_offsets(dir=tmp_path) == {"FOO-002-R2": 0}
+    cache_open.assert_not_called()
+    assert not ARCHIVE_CACHE
+    try:
+        await chapters.file_offsets(dir=tmp_path, cached=True)
+        cache_open.assert_called_once_with(tmp_path / "FOO-002-R2.vcz", mmap=False)
+        assert len(ARCHIVE_CACHE) == 1
+    finally:
+        await ARCHIVE_CACHE.close()
+
+
+async def test_chapter_control_missing(vcz: VCZArchive) -> None:
+    """Single part archives should have no chapters."""
+    vcz._name_infos.pop("ChapterControl")
+    assert await vcz.chapter_control() is None
+
+
+async def test_read_unlocked(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Members should be read without the archive lock."""
+    path = tmp_path / "foo.vcz"
+    make_vcz(path)
+    async with await VCZArchive.open(path) as vcz:
+        read = mocker.spy(vcz._zip, "read")
+        assert await vcz.read("ChapterControl")
+        read.assert_not_called()
+    async with await VCZArchive.open(path, mode="a") as vcz:
+        read = mocker.spy(vcz._zip, "read")
+        assert await vcz.read("ChapterControl")
+        read.assert_called_once()
+
+
+async def test_open_mmap(tmp_path: Path) -> None:
+    """Stored members of mapped archives should be read without copying."""
+    path = tmp_path / "foo.vcz"
+    make_vcz(path)
+    script = io.BytesIO()
+    VCSXCycloneScript([]).dump(script)
+    with zipfile.ZipFile(path, "a") as zipf:
+        zipf.writestr("Vorze_CycloneSA.bin", script.getvalue())
+        zipf.writestr(
+            "Vorze_Piston.bin", b"deflated", compress_type=zipfile.ZIP_DEFLATED
+        )
+    async with await VCZArchive.open(path, mmap=True) as vcz:
+        assert isinstance(vcz._reader, MmapMemberReader)
+        data = await vcz.read_buffer("Vorze_CycloneSA")
+        assert isinstance(data, memoryview)
+        assert await vcz.read("Vorze_CycloneSA") == script.getvalue()
+        assert await vcz.read_buffer("Vorze_Piston") == b"deflated"
+        assert isinstance(await vcz.read_script(GoodsType.CYCLONE), VCSXCycloneScript)
+        assert await vcz.chapter_control()
+    # views outlive the archive
+    assert data == script.getvalue()
+    data.release()
+
+
+def _is_open(vcz: VCZArchive) -> bool:
+    return vcz._zip.fp is not None
+
+
+async def test_archive_cache(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Handles should be shared, reference counted and evicted LRU first."""
+    foo, bar = tmp_path / "foo.vcz", tmp_path / "bar.vcz"
+    make_vcz(foo)
+    make_vcz(bar)
+    load_params = mocker.spy(VCZArchive, "_load_params")
+    cache = ArchiveCache(maxsize=1)
+    first, second = await asyncio.gather(cache.open(foo), cache.open(foo))
+    assert first is second
+    assert load_params.call_count == 1
+    async with first:
+        pass
+    assert _is_open(first)
+
+    # evicted while in use
+    other = await cache.open(bar)
+    assert len(cache) == 1
+    assert _is_open(first)
+    await second.close()
+    assert not _is_open(first)
+
+    # evicted when unused
+    await other.close()
+    assert _is_open(other)
+    async with await cache.open(foo):
+        pass
+    assert not _is_open(other)
+
+    await cache.close()
+    assert len(cache) == 0
+
+
+async def test_archive_cache_modified(tmp_path: Path) -> None:
+    """Modified files should be opened again."""
+    path = tmp_path / "foo.vcz"
+    make_vcz(path)
+    cache = ArchiveCache()
+    async with await cache.open(path) as first:
+        pass
+    with zipfile.ZipFile(path, "a") as zipf:
+        zipf.writestr("foo.bin", b"foo")
+    async with await cache.open(path) as second:
+        assert second is not first
+    assert len(cache) == 2
+    await cache.close()
+    assert not _is_open(first)
+    assert not _is_open(second)
+
+
+async def test_open_cached(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Cached opens should use the shared cache."""
+    path = tmp_path / "foo.vcz"
+    make_vcz(path)
+    cache_open = mocker.patch.object(ARCHIVE_CACHE, "open")
+    await VCZArchive.open(path, cached=True)
+    cache_open.assert_called_once_with(path, mmap=False)
+    with pytest.raises(ValueError):
+        await VCZArchive.open(path, mode="a", cached=True)
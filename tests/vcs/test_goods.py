@@ -1,4 +1,5 @@
 """Tests for the VCS goods module."""
+import io
 from typing import TypeVar
 
 import pytest
@@ -32,3 +33,11 @@ def test_load_script(
     mocker.patch.object(cls, "load", return_value=cls([]))
     script: GoodsScript = load_script(typ, b"foo")
     assert isinstance(script, cls)
+
+
+def test_load_script_buffer() -> None:
+    """Scripts should be loaded from buffers."""
+    f = io.BytesIO()
+    VCSXPistonScript([]).dump(f)
+    script = load_script(GoodsType.PISTON, memoryview(f.getvalue()))
+    assert isinstance(script, VCSXPistonScript)
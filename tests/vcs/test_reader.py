@@ -0,0 +1,130 @@
+"""Tests for the zip member reader module."""
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from afesta_tools.vcs.reader import COPY_MAX_SIZE
+from afesta_tools.vcs.reader import BufferReader
+from afesta_tools.vcs.reader import MemberReader
+from afesta_tools.vcs.reader import MmapMemberReader
+from afesta_tools.vcs.reader import open_buffer
+
+
+MEMBERS = {
+    "stored.bin": (b"stored" * 1000, zipfile.ZIP_STORED),
+    "deflated.bin": (b"deflated" * 1000, zipfile.ZIP_DEFLATED),
+    "bzip2.bin": (b"bzip2" * 1000, zipfile.ZIP_BZIP2),
+}
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    """Fixture to generate a test zip."""
+    path = tmp_path / "foo.zip"
+    with zipfile.ZipFile(path, "w") as zipf:
+        for name, (data, compression) in MEMBERS.items():
+            zipf.writestr(name, data, compress_type=compression)
+    return path
+
+
+def _reader(path: Path) -> MemberReader:
+    with zipfile.ZipFile(path) as zipf:
+        return MemberReader(path, zipf.infolist())
+
+
+def test_read(path: Path) -> None:
+    """Stored and deflated members should be read."""
+    reader = _reader(path)
+    assert reader.supports("stored.bin")
+    assert reader.supports("deflated.bin")
+    assert not reader.supports("bzip2.bin")
+    assert not reader.supports("missing.bin")
+    assert reader.read("stored.bin") == MEMBERS["stored.bin"][0]
+    assert reader.read("deflated.bin") == MEMBERS["deflated.bin"][0]
+    with pytest.raises(KeyError):
+        reader.read("bzip2.bin")
+    reader.close()
+    with pytest.raises(ValueError):
+        reader.read("stored.bin")
+
+
+def test_read_concurrent(path: Path) -> None:
+    """Concurrent reads should use one file handle per thread."""
+    reader = _reader(path)
+    names = ["stored.bin", "deflated.bin"] * 50
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(reader.read, names))
+    assert results == [MEMBERS[name][0] for name in names]
+    files = list(reader._files)
+    assert 1 <= len(files) <= 4
+    reader.close()
+    assert all(f.closed for f in files)
+
+
+def test_read_corrupt(path: Path) -> None:
+    """Corrupt members should be rejected."""
+    reader = _reader(path)
+    data = path.read_bytes()
+    offset = data.index(b"stored" * 10)
+    path.write_bytes(data[:offset] + b"x" + data[offset + 1 :])
+    with pytest.raises(zipfile.BadZipFile):
+        reader.read("stored.bin")
+    reader.close()
+
+
+def test_mmap_read(path: Path) -> None:
+    """Stored members should be returned as views into the mapping."""
+    with zipfile.ZipFile(path) as zipf:
+        reader = MmapMemberReader(path, zipf.infolist())
+    assert not reader.supports("bzip2.bin")
+    stored = reader.read("stored.bin")
+    assert isinstance(stored, memoryview)
+    assert stored == MEMBERS["stored.bin"][0]
+    deflated = reader.read("deflated.bin")
+    assert isinstance(deflated, bytes)
+    assert deflated == MEMBERS["deflated.bin"][0]
+    with pytest.raises(KeyError):
+        reader.read("bzip2.bin")
+    reader.close()
+    assert stored == MEMBERS["stored.bin"][0]
+    stored.release()
+    with pytest.raises(ValueError):
+        reader.read("stored.bin")
+
+
+def test_mmap_read_corrupt(path: Path) -> None:
+    """Corrupt members should be rejected."""
+    data = path.read_bytes()
+    offset = data.index(b"stored" * 10)
+    with zipfile.ZipFile(path) as zipf:
+        infos = zipf.infolist()
+    path.write_bytes(data[:offset] + b"x" + data[offset + 1 :])
+    reader = MmapMemberReader(path, infos)
+    with pytest.raises(zipfile.BadZipFile):
+        reader.read("stored.bin")
+    reader.close()
+
+
+def test_buffer_reader(path: Path) -> None:
+    """Buffers should be readable and seekable as files."""
+    assert isinstance(open_buffer(b"foo"), io.BytesIO)
+    assert isinstance(open_buffer(memoryview(b"foo")), io.BytesIO)
+    large = memoryview(bytes(COPY_MAX_SIZE + 1))
+    assert isinstance(open_buffer(large), BufferReader)
+    with BufferReader(memoryview(b"foobar")) as f:
+        assert f.read(3) == b"foo"
+        assert f.tell() == 3
+        assert f.seek(-1, io.SEEK_END) == 5
+        assert f.read() == b"r"
+        assert f.read(1) == b""
+        f.seek(1)
+        buf = bytearray(2)
+        assert f.readinto(buf) == 2
+        assert buf == b"oo"
+        with pytest.raises(ValueError):
+            f.seek(-1)
+    with zipfile.ZipFile(BufferReader(memoryview(path.read_bytes()))) as zipf:
+        assert zipf.read("deflated.bin") == MEMBERS["deflated.bin"][0]